@@ -4,6 +4,7 @@ from tensorflow.keras import datasets, layers, models
 import numpy as np
 
 from model_to_json import export_model_json
+from model_to_binary import export_model_binary
 
 # -----------------------------
 # 1. Load and preprocess data
@@ -65,6 +66,7 @@ print(f"\nTest accuracy: {test_acc:.4f}")
 # 6. Create json of file
 # -----------------------------
 export_model_json(model)
+export_model_binary(model, compress="gzip")
 
 
 
@@ -0,0 +1,73 @@
+/**
+ * Load a model written by model_to_binary.py: a JSON manifest plus one
+ * little-endian blob holding every tensor. Each tensor entry in the manifest
+ * has { offset, length, shape, dtype } describing where it lives in the blob.
+ * float32 tensors are returned as Float32Array views with no copying.
+ */
+
+function float16ToFloat32(h) {
+  const sign = h & 0x8000 ? -1 : 1;
+  const exponent = (h >> 10) & 0x1f;
+  const fraction = h & 0x03ff;
+  if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+}
+
+export function tensorView(buffer, entry) {
+  if (entry.dtype === "float32") {
+    return new Float32Array(buffer, entry.offset, entry.length);
+  }
+  const halves = new Uint16Array(buffer, entry.offset, entry.length);
+  const values = new Float32Array(entry.length);
+  for (let i = 0; i < entry.length; i++) values[i] = float16ToFloat32(halves[i]);
+  return values;
+}
+
+/**
+ * Fetch a manifest (e.g. "data/model_bin/model.json") and its blob.
+ * Pre-compressed .gz/.br files are meant to be served with a
+ * Content-Encoding header, so the browser decompresses them transparently.
+ */
+export async function loadBinaryModel(manifestUrl) {
+  const manifest = await (await fetch(manifestUrl)).json();
+  const dataUrl = new URL(manifest.data, new URL(manifestUrl, window.location.href));
+  const buffer = await (await fetch(dataUrl)).arrayBuffer();
+
+  const resolve = (tensors) => Object.fromEntries(
+    Object.entries(tensors).map(([name, entry]) => [name, tensorView(buffer, entry)])
+  );
+
+  if (Array.isArray(manifest.weights)) {
+    // layer-size format: weights[i] is an (in, out) matrix flattened row-major
+    return { ...manifest, weights: manifest.weights.map((entry) => tensorView(buffer, entry)) };
+  }
+  return {
+    ...manifest,
+    layers: manifest.layers.map((layer) => (
+      layer.tensors ? { ...layer, tensors: resolve(layer.tensors) } : layer
+    )),
+  };
+}
+
+/**
+ * Rebuild the layers/weights shape used by makeEdgesFromWeights
+ * from the dense layers of a loaded binary model.
+ */
+export function weightsFromBinaryModel(model) {
+  const layers = [];
+  const weights = [];
+  model.layers.filter((layer) => layer.type === "dense").forEach((layer, i) => {
+    const inputs = layer.in_features;
+    const outputs = layer.out_features;
+    if (i === 0) layers.push(inputs);
+    layers.push(outputs);
+
+    const matrix = [];
+    for (let src = 0; src < inputs; src++) {
+      matrix.push(Array.from(layer.tensors.weights.subarray(src * outputs, (src + 1) * outputs)));
+    }
+    weights.push(matrix);
+  });
+  return { layers, weights };
+}
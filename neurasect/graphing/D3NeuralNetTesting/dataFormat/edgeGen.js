@@ -28,4 +28,25 @@ export function makeEdgesFromWeights(layers, weights) {
 
   // Returns list of edges
   return edges;
-}
\ No newline at end of file
+}
+
+/**
+ * Generate edges from the pruned edge set returned by
+ * GET /api/train/{session_id}/graph. Each layer's edges come as
+ * parallel source/target/weight arrays.
+ */
+export function makeEdgesFromLayout(layout) {
+  const edges = [];
+
+  for (const { layer, source, target, weight } of layout.edges) {
+    for (let i = 0; i < source.length; i++) {
+      edges.push({
+        source: `L${layer}-N${source[i]}`,
+        target: `L${layer + 1}-N${target[i]}`,
+        weight: weight[i]
+      });
+    }
+  }
+
+  return edges;
+}
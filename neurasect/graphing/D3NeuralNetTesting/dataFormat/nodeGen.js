@@ -36,4 +36,29 @@ export function formatNodes(layers, width = 960, height = 500) {
 
   // Return formatted nodes
   return nodes;
-}
\ No newline at end of file
+}
+
+/**
+ * Generate node objects from the positions precomputed by
+ * GET /api/train/{session_id}/graph.
+ */
+export function formatNodesFromLayout(layout, r = 15) {
+  const nodes = [];
+
+  for (const { layer, size, columns, cx, cy } of layout.nodes) {
+    for (let i = 0; i < size; i++) {
+      nodes.push({
+        id: `L${layer}-N${i}`,
+        layer,
+        index: i,
+        cx: cx[i],
+        cy: cy[i],
+        r: columns > 1 ? Math.max(2, r / columns) : r,
+        fill: '#7ba9ea',
+        activation: 0
+      });
+    }
+  }
+
+  return nodes;
+}
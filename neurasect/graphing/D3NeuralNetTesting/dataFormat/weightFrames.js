@@ -0,0 +1,70 @@
+/**
+ * Decode binary weight snapshot frames streamed by the training WebSocket
+ * (connect with ?weights=1). The server first sends a JSON "weights_manifest"
+ * message describing where each layer's kernel and bias live in a flat array,
+ * then one binary frame per streamed epoch.
+ *
+ * Frame layout (little-endian):
+ *   magic "NSW1" | kind u8 (0 = keyframe, 1 = delta) | dtype u8 (1 = float16, 2 = int8)
+ *   | reserved u16 | epoch u32 | count u32 | scale f32 | payload
+ */
+const HEADER_BYTES = 20;
+
+function float16ToFloat32(h) {
+  const sign = h & 0x8000 ? -1 : 1;
+  const exponent = (h >> 10) & 0x1f;
+  const fraction = h & 0x03ff;
+  if (exponent === 0) return sign * Math.pow(2, -14) * (fraction / 1024);
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity;
+  return sign * Math.pow(2, exponent - 15) * (1 + fraction / 1024);
+}
+
+/**
+ * Apply one frame to the current flat weights and return the new flat weights.
+ * Pass null as `current` until the first keyframe arrives.
+ */
+export function applyWeightFrame(buffer, current) {
+  const view = new DataView(buffer);
+  const magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+  if (magic !== "NSW1") throw new Error("Not a weight snapshot frame");
+
+  const kind = view.getUint8(4);
+  const dtype = view.getUint8(5);
+  const epoch = view.getUint32(8, true);
+  const count = view.getUint32(12, true);
+  const scale = view.getFloat32(16, true);
+
+  const values = new Float32Array(count);
+  for (let i = 0; i < count; i++) {
+    values[i] = dtype === 1
+      ? float16ToFloat32(view.getUint16(HEADER_BYTES + i * 2, true))
+      : view.getInt8(HEADER_BYTES + i) * scale;
+  }
+
+  if (kind === 0) return { epoch, weights: values };
+  if (!current) throw new Error("Delta frame received before a keyframe");
+  for (let i = 0; i < count; i++) values[i] += current[i];
+  return { epoch, weights: values };
+}
+
+/**
+ * Rebuild the layers/weights shape used by makeEdgesFromWeights
+ * from a manifest and a flat weight array.
+ */
+export function weightsFromFrame(manifest, flat) {
+  const layers = [];
+  const weights = [];
+  manifest.layers.forEach((layer, i) => {
+    const [inputs, outputs] = layer.kernel_shape;
+    if (i === 0) layers.push(inputs);
+    layers.push(outputs);
+
+    const matrix = [];
+    for (let src = 0; src < inputs; src++) {
+      const start = layer.kernel_offset + src * outputs;
+      matrix.push(Array.from(flat.subarray(start, start + outputs)));
+    }
+    weights.push(matrix);
+  });
+  return { layers, weights };
+}
@@ -4,6 +4,7 @@ import random
 
 from graphDataGen import vizualize
 from model_to_json import export_model_json
+from model_to_binary import export_model_binary
 # -----------------------------
 # 1. Choose random layer sizes
 # -----------------------------
@@ -46,3 +47,4 @@ print("\n")
 
 vizualize(model)
 export_model_json(model)
+export_model_binary(model, compress="gzip")
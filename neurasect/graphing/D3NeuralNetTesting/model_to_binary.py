@@ -0,0 +1,193 @@
+import argparse
+import gzip
+import json
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras import Model
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Typed array views need their byte offset to be a multiple of the element size
+ALIGNMENT = 8
+
+
+class TensorWriter:
+    def __init__(self, dtype="float32"):
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.chunks = []
+        self.size = 0
+
+    def add(self, array):
+        data = np.ascontiguousarray(array, dtype=self.dtype)
+        padding = (-self.size) % ALIGNMENT
+        if padding:
+            self.chunks.append(b"\0" * padding)
+            self.size += padding
+        entry = {
+            "offset": self.size,
+            "length": int(data.size),
+            "shape": [int(d) for d in data.shape],
+            "dtype": self.dtype.name,
+        }
+        self.chunks.append(data.tobytes())
+        self.size += data.nbytes
+        return entry
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+def layer_manifest(layer, writer):
+    cfg = {"name": layer.name, "class": layer.__class__.__name__}
+
+    # ---- Dense ----
+    if isinstance(layer, tf.keras.layers.Dense):
+        W, b = layer.get_weights()  # W: (in, out), b: (out,)
+        cfg.update({
+            "type": "dense",
+            "in_features": int(W.shape[0]),
+            "out_features": int(W.shape[1]),
+            "tensors": {"weights": writer.add(W), "bias": writer.add(b)},
+        })
+        return cfg
+
+    # ---- Conv2D ----
+    if isinstance(layer, tf.keras.layers.Conv2D):
+        weights = layer.get_weights()
+        K = weights[0]  # K: (kh, kw, in_ch, out_ch), stored as-is; filter i is K[..., i]
+        kh, kw, in_ch, out_ch = K.shape
+        tensors = {"kernel": writer.add(K)}
+        if layer.use_bias:
+            tensors["bias"] = writer.add(weights[1])
+        cfg.update({
+            "type": "conv2d",
+            "kernel_shape": [int(kh), int(kw), int(in_ch), int(out_ch)],
+            "strides": list(layer.strides),
+            "padding": layer.padding,
+            "dilation_rate": list(layer.dilation_rate),
+            "use_bias": bool(layer.use_bias),
+            "activation": tf.keras.activations.serialize(layer.activation),
+            "tensors": tensors,
+        })
+        return cfg
+
+    if isinstance(layer, tf.keras.layers.MaxPooling2D):
+        cfg.update({
+            "type": "maxpool2d",
+            "pool_size": list(layer.pool_size),
+            "strides": list(layer.strides) if layer.strides is not None else None,
+            "padding": layer.padding,
+        })
+        return cfg
+
+    if isinstance(layer, tf.keras.layers.Flatten):
+        cfg.update({"type": "flatten"})
+        return cfg
+
+    cfg.update({"type": "other", "config": layer.get_config()})
+    return cfg
+
+
+def write_bundle(manifest, writer, out_dir, name="model", compress=None):
+    os.makedirs(out_dir, exist_ok=True)
+    blob = writer.getvalue()
+    bin_name = f"{name}.bin"
+    manifest.update({
+        "format": "neurasect-binary",
+        "version": 1,
+        "byte_order": "little",
+        "dtype": writer.dtype.name,
+        "alignment": ALIGNMENT,
+        "data": bin_name,
+        "byte_length": len(blob),
+        "compressed": [],
+    })
+
+    with open(os.path.join(out_dir, bin_name), "wb") as f:
+        f.write(blob)
+    if compress in ("gzip", "all"):
+        with open(os.path.join(out_dir, f"{bin_name}.gz"), "wb") as f:
+            f.write(gzip.compress(blob, compresslevel=9))
+        manifest["compressed"].append("gzip")
+    if compress in ("brotli", "all"):
+        if brotli is None:
+            print("brotli is not installed, skipping .br output (pip install brotli)")
+        else:
+            with open(os.path.join(out_dir, f"{bin_name}.br"), "wb") as f:
+                f.write(brotli.compress(blob))
+            manifest["compressed"].append("brotli")
+
+    with open(os.path.join(out_dir, f"{name}.json"), "w") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def export_model_binary(model: Model, out_dir="public/data/model_bin", dtype="float32", compress=None):
+    if not model.built:
+        raise ValueError("Model is not built yet. Call model.build(...) or run a forward pass first.")
+
+    writer = TensorWriter(dtype)
+    manifest = {
+        "model_name": model.name,
+        "layers": [layer_manifest(layer, writer) for layer in model.layers],
+    }
+    return write_bundle(manifest, writer, out_dir, compress=compress)
+
+
+def convert_json(path, out_dir, dtype="float32", compress=None):
+    with open(path) as f:
+        data = json.load(f)
+    writer = TensorWriter(dtype)
+
+    # graphDataGen.vizualize format: {"layers": [sizes], "weights": [matrix per layer]}
+    if data.get("layers") and all(isinstance(n, int) for n in data["layers"]):
+        manifest = {
+            "layers": data["layers"],
+            "weights": [writer.add(np.asarray(W)) for W in data.get("weights", [])],
+        }
+        return write_bundle(manifest, writer, out_dir, compress=compress)
+
+    # model_to_json.export_model_json format: {"model_name", "layers": [layer dicts]}
+    layers = []
+    for layer in data.get("layers", []):
+        layer = dict(layer)
+        tensors = {}
+        if "weights" in layer:
+            tensors["weights"] = writer.add(np.asarray(layer.pop("weights")))
+        if "kernels" in layer:
+            # per-filter (kh, kw, in_ch) lists back into one (kh, kw, in_ch, out_ch) tensor
+            tensors["kernel"] = writer.add(np.stack([np.asarray(k) for k in layer.pop("kernels")], axis=-1))
+        if layer.get("bias") is not None:
+            tensors["bias"] = writer.add(np.asarray(layer.pop("bias")))
+        else:
+            layer.pop("bias", None)
+        if tensors:
+            layer["tensors"] = tensors
+        layers.append(layer)
+    manifest = {"model_name": data.get("model_name"), "layers": layers}
+    return write_bundle(manifest, writer, out_dir, compress=compress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a Keras model or an exported model JSON to the binary format")
+    parser.add_argument("source", help="path to a .keras/.h5 model or a model JSON file")
+    parser.add_argument("--out", default="public/data/model_bin", help="output directory")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16"])
+    parser.add_argument("--compress", default=None, choices=["gzip", "brotli", "all"])
+    args = parser.parse_args()
+
+    if args.source.endswith(".json"):
+        manifest = convert_json(args.source, args.out, args.dtype, args.compress)
+    else:
+        model = tf.keras.models.load_model(args.source)
+        manifest = export_model_binary(model, args.out, args.dtype, args.compress)
+    print(f"Wrote {manifest['byte_length']} bytes of {manifest['dtype']} tensors to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,52 +1,79 @@
+import os
+import sys
+
+import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend"))
+from surgery import widen_dense, insert_dense
+
 def safety_check(model):
-  if not isinstance(model, models.Sequential):
+    if not isinstance(model, models.Sequential):
         raise ValueError("add_neuron currently only supports Sequential models")
-    
-def add_neuron(model, activation="relu", name=None,layer_number):
-     
-    return
 
-def add_layers(model,neuron=2,activaton='relu'):
+# layer_number counts hidden Dense layers from 1; the new neurons copy existing
+# ones (Net2Net) so the model's outputs stay the same and training can continue
+def add_neuron(model, layer_number, neurons=1, noise=0.0):
     safety_check(model)
-    model.add(layers.Dense(neurons,activation=activation))
-    return model
-    
-# Example usage
-model = models.Sequential([
-    layers.Input(shape=(4,)),
-    layers.Dense(3, activation="relu")
-])
-
-# Add one more neuron (a Dense layer with 1 unit)
-model = add_neuron(model, activation="sigmoid", name="extra_neuron")
-model.summary()
+    return widen_dense(model, layer_number - 1, neurons, noise=noise)
+
+# inserts a Dense layer after hidden layer layer_number, initialized as an identity
+def add_layers(model, layer_number, neurons=None, activation=None):
+    safety_check(model)
+    return insert_dense(model, layer_number - 1, neurons, activation)
 
-import numpy as np
 
 class MLP:
-    def __init__(self, input_, target_values, num_of_layers, num_of_neurons_per_layer):
+    def __init__(self, input_, target_values, num_of_layers, num_of_neurons_per_layer, activation='relu'):
         self.input = input_
         self.target_values = target_values
         self.num_of_layers = num_of_layers
-        self.num_of_neurons_per_layer = np.array(num_of_neurons_per_layer)
-    
-    def add_layer(self,layer_number,neurons='2',activation='relu'):
-        self.num_of_neurons_per_layer[layer_number-1] = neurons
-        self.num_of_layer +=1
-        model.add(layers.Dense(neurons,activation)))
-    def edit_layer(self,layer_number,neurons,activation='relu'):
-        if layer_number !=1:
-            new_model = model.Sequential([
-                old_model.layers[:layer_number],
-                layers.Dense(neurons,activation),
-                old_model.layers[layer_number:]
-            ])    
-    def add_Neurons(self,nuerons=1,layer_number):    
-        l_i = layer_number-1 # layer index
-        total_nuerons = self.num_of_neurons_per_layer[l_i] + neurons
-        editlayer(total_neurons)
-     
+        self.num_of_neurons_per_layer = list(num_of_neurons_per_layer)
+        num_classes = len(np.unique(target_values))
+        self.model = models.Sequential(
+            [layers.Input(shape=(input_.shape[1],))]
+            + [layers.Dense(n, activation=activation) for n in self.num_of_neurons_per_layer]
+            + [layers.Dense(num_classes, activation='softmax')]
+        )
+        self.compile()
+
+    def compile(self):
+        self.model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+
+    def fit(self, epochs=10):
+        return self.model.fit(self.input, self.target_values, epochs=epochs, verbose=0)
+
+    def add_layer(self, layer_number, neurons=None, activation=None):
+        self.model = add_layers(self.model, layer_number, neurons, activation)
+        self.num_of_neurons_per_layer.insert(layer_number, neurons or self.num_of_neurons_per_layer[layer_number - 1])
+        self.num_of_layers += 1
+        self.compile()
+
+    def add_Neurons(self, layer_number, neurons=1):
+        self.model = add_neuron(self.model, layer_number, neurons)
+        self.num_of_neurons_per_layer[layer_number - 1] += neurons
+        self.compile()
+
+
+if __name__ == "__main__":
+    # Example usage
+    model = models.Sequential([
+        layers.Input(shape=(4,)),
+        layers.Dense(3, activation="relu"),
+        layers.Dense(2, activation="softmax")
+    ])
+    x = np.random.rand(8, 4).astype("float32")
+    before = model(x)
+
+    # Add one more neuron to the first hidden layer
+    model = add_neuron(model, layer_number=1)
+    model.summary()
+    print("max output change:", float(tf.reduce_max(tf.abs(model(x) - before))))
 
+    mlp = MLP(x, np.array([0, 1] * 4), num_of_layers=2, num_of_neurons_per_layer=[4, 4])
+    mlp.fit(epochs=5)
+    mlp.add_Neurons(layer_number=2, neurons=3)
+    mlp.add_layer(layer_number=1)
+    mlp.fit(epochs=5)
+    mlp.model.summary()
@@ -24,11 +24,13 @@ export interface TrainingResponse {
   model_summary: string;
   input_shape: number[];
   output_shape: number[];
+  engine?: 'keras' | 'numpy' | null;
 }
 
 export interface EpochUpdate {
-  type: 'epoch_update' | 'training_started' | 'training_complete' | 'error';
+  type: 'epoch_update' | 'batch_update' | 'training_started' | 'training_complete' | 'training_cancelled' | 'queue_position' | 'error';
   epoch?: number;
+  elapsed?: number;
   loss?: number;
   accuracy?: number;
   val_loss?: number;
@@ -38,6 +40,12 @@ export interface EpochUpdate {
   message?: string;
   final_metrics?: any;
   epochs?: number;
+  queue_position?: number | null;
+  position?: number;
+  epochs_completed?: number;
+  batch?: number;
+  batches?: number;
+  coalesced?: number;
 }
 
 export interface UploadResponse {
@@ -108,6 +116,29 @@ export function connectTrainingWebSocket(
   return ws;
 }
 
+export interface ResumeRequest {
+  epochs: number;
+  learning_rate?: number;
+  optimizer?: string;
+  batch_size?: number;
+}
+
+export async function resumeTraining(sessionId: string, request: ResumeRequest) {
+  const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/resume`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to resume training');
+  }
+  return response.json();
+}
+
 export async function getTrainingStatus(sessionId: string) {
   const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/status`);
 
@@ -117,7 +148,27 @@ export async function getTrainingStatus(sessionId: string) {
   return response.json();
 }
 
-export async function makePredictions(sessionId: string, data: number[][]) {
+export async function getTrainingQueue() {
+  const response = await fetch(`${API_BASE_URL}/api/train/queue`);
+
+  if (!response.ok) {
+    throw new Error('Failed to get training queue');
+  }
+  return response.json();
+}
+
+export async function cancelTraining(sessionId: string) {
+  const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/cancel`, {
+    method: 'POST',
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to cancel training');
+  }
+  return response.json();
+}
+
+export async function makePredictions(sessionId: string, data: Array<Array<number | string>>) {
   const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/predict`, {
     method: 'POST',
     headers: {
@@ -133,6 +184,88 @@ export async function makePredictions(sessionId: string, data: number[][]) {
   return response.json();
 }
 
+export interface ExplainRequest {
+  inputs: Array<Array<number | string>>;
+  steps?: number;
+  baseline?: 'mean' | 'zeros' | number[] | number[][];
+  target?: 'predicted' | number | number[];
+}
+
+export interface ExplainResponse {
+  session_id: string;
+  attributions: number[][];
+  targets: number[];
+  labels?: string[];
+  outputs: number[];
+  baseline_outputs: number[];
+  convergence_delta: number[];
+  feature_names: string[] | null;
+  steps: number;
+  cached: boolean;
+}
+
+export async function explainPredictions(sessionId: string, request: ExplainRequest): Promise<ExplainResponse> {
+  const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/explain`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to explain predictions');
+  }
+  return response.json();
+}
+
+export interface GrowRequest {
+  operation: 'widen' | 'deepen';
+  layer: number;
+  neurons?: number;
+  activation?: string;
+  noise?: number;
+}
+
+export async function growModel(sessionId: string, request: GrowRequest) {
+  const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/grow`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to change the network');
+  }
+  return response.json();
+}
+
+export interface GraphLayoutOptions {
+  top_k?: number;
+  threshold?: number;
+  per?: 'source' | 'target';
+  width?: number;
+  height?: number;
+}
+
+export async function getGraphLayout(sessionId: string, options: GraphLayoutOptions = {}) {
+  const params = new URLSearchParams(
+    Object.entries(options)
+      .filter(([, value]) => value !== undefined)
+      .map(([key, value]) => [key, String(value)])
+  );
+  const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}/graph?${params}`);
+
+  if (!response.ok) {
+    throw new Error('Failed to get graph layout');
+  }
+  return response.json();
+}
+
 export async function deleteSession(sessionId: string) {
   const response = await fetch(`${API_BASE_URL}/api/train/${sessionId}`, {
     method: 'DELETE',
@@ -144,6 +277,91 @@ export async function deleteSession(sessionId: string) {
   return response.json();
 }
 
+export type SweepValues = Array<string | number> | { min: number; max: number; log?: boolean };
+
+export interface SweepRequest {
+  base: TrainingConfig;
+  space: Partial<Record<
+    'num_layers' | 'num_neurons' | 'learning_rate' | 'regularizer' |
+    'regularization_rate' | 'optimizer' | 'activation' | 'batch_size',
+    SweepValues
+  >>;
+  search?: 'grid' | 'random';
+  n_trials?: number;
+  seed?: number;
+  metric?: string;
+  strategy?: 'halving' | 'none';
+  min_epochs?: number;
+  reduction_factor?: number;
+  early_stopping_patience?: number;
+}
+
+export interface SweepTrial {
+  trial_id: number;
+  params: Record<string, string | number>;
+  status: 'pending' | 'running' | 'promoted' | 'stopped' | 'completed' | 'failed' | 'cancelled';
+  epochs: number;
+  score: number | null;
+  metrics: Record<string, number>;
+  seconds: number;
+}
+
+export interface SweepUpdate {
+  type: 'sweep_leaderboard' | 'sweep_complete';
+  sweep_id: string;
+  status: string;
+  metric: string;
+  mode: 'min' | 'max';
+  rungs: number[];
+  rung: number;
+  trials: number;
+  finished_trials: number;
+  best: SweepTrial | null;
+  leaderboard: SweepTrial[];
+}
+
+export async function startSweep(request: SweepRequest) {
+  const response = await fetch(`${API_BASE_URL}/api/sweep`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  if (!response.ok) {
+    const error = await response.json();
+    throw new Error(error.detail || 'Failed to start sweep');
+  }
+  return response.json();
+}
+
+export function connectSweepWebSocket(
+  sweepId: string,
+  onMessage: (data: SweepUpdate) => void,
+  onClose?: () => void
+): WebSocket {
+  const wsUrl = API_BASE_URL.replace('http', 'ws');
+  const ws = new WebSocket(`${wsUrl}/ws/sweep/${sweepId}`);
+
+  ws.onmessage = (event) => onMessage(JSON.parse(event.data));
+  ws.onclose = () => {
+    if (onClose) onClose();
+  };
+  return ws;
+}
+
+export async function cancelSweep(sweepId: string) {
+  const response = await fetch(`${API_BASE_URL}/api/sweep/${sweepId}/cancel`, {
+    method: 'POST',
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to cancel sweep');
+  }
+  return response.json();
+}
+
 export async function checkHealth() {
   const response = await fetch(`${API_BASE_URL}/api/health`);
   return response.json();
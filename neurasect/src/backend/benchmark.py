@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+ENGINES = ["keras", "numpy"]
+DEFAULT_OUTPUT_DIR = os.path.join(BACKEND_DIR, "data", "benchmarks")
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return usage / 1024 ** 2 if sys.platform == "darwin" else usage / 1024
+
+
+def percentile_ms(samples: List[float], q: float) -> float:
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def synthetic_csv(rows: int, features: int, classes: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(0, 3, (classes, features))
+    labels = rng.integers(0, classes, rows)
+    X = centers[labels] + rng.normal(0, 1, (rows, features))
+    header = ",".join([f"f{i}" for i in range(features)] + ["label"])
+    body = "\n".join(
+        ",".join(f"{v:.5f}" for v in row) + f",c{label}" for row, label in zip(X, labels)
+    )
+    return (header + "\n" + body + "\n").encode("utf-8")
+
+
+class Benchmark:
+
+    def __init__(self, args):
+        self.args = args
+        # keep uploads, checkpoints and sweeps out of the real data directory
+        self.workdir = tempfile.mkdtemp(prefix="neurasect-bench-")
+        for name in ("DATASET_STORE_DIR", "CHECKPOINT_DIR", "SWEEP_DIR"):
+            os.environ[name] = os.path.join(self.workdir, name.lower())
+        sys.path.insert(0, BACKEND_DIR)
+
+        start = time.perf_counter()
+        import main
+        from fastapi.testclient import TestClient
+        self.import_seconds = time.perf_counter() - start
+        self.main = main
+        self.client = TestClient(main.app)
+        import tensorflow as tf
+        tf.keras.utils.set_random_seed(args.seed)
+        self.tf_version = tf.__version__
+
+        # small MLPs go to the NumPy engine on their own, so each engine is asked for by name
+        self.engines = ENGINES if args.engine == "both" else [args.engine]
+
+    def __repr__(self):
+        return f"Benchmark(sizes={self.args.sizes}, epochs={self.args.epochs}, engines={self.engines})"
+
+    def config(self, dataset_id: str, engine: str) -> Dict[str, Any]:
+        return {
+            "dataset_id": dataset_id,
+            "model_type": "mlp" if engine == "auto" else engine,
+            "num_layers": self.args.layers,
+            "num_neurons": self.args.neurons,
+            "learning_rate": 0.01,
+            "regularization_rate": 0.001,
+            "train_test_split": 0.8,
+            "regularizer": "l2",
+            "optimizer": "adam",
+            "activation": "relu",
+            "epochs": self.args.epochs,
+            "batch_size": self.args.batch_size,
+        }
+
+    def upload(self, name: str, payload: bytes) -> Dict[str, Any]:
+        start = time.perf_counter()
+        response = self.client.post(
+            "/api/upload/dataset", files={"file": (f"{name}.csv", payload, "text/csv")}
+        )
+        seconds = time.perf_counter() - start
+        response.raise_for_status()
+        mb = len(payload) / 1024 ** 2
+        return {
+            "bytes": len(payload),
+            "seconds": round(seconds, 4),
+            "mb_per_second": round(mb / seconds, 3),
+            "rows_per_second": round(response.json()["shape"][0] / seconds, 1),
+        }
+
+    def start_session(self, dataset_id: str, engine: str) -> Dict[str, Any]:
+        timings = []
+        session_ids = []
+        # the first start loads and prepares the dataset, later ones hit the dataset cache
+        for _ in range(self.args.start_repeats):
+            start = time.perf_counter()
+            response = self.client.post("/api/train/start", json=self.config(dataset_id, engine))
+            timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+            session_ids.append(response.json()["session_id"])
+        for session_id in session_ids[1:]:
+            self.client.delete(f"/api/train/{session_id}")
+        return {
+            "session_id": session_ids[0],
+            "cold_ms": round(timings[0] * 1000, 3),
+            "warm_p50_ms": percentile_ms(timings[1:], 50) if len(timings) > 1 else None,
+        }
+
+    def train(self, session_id: str) -> Dict[str, Any]:
+        # epoch updates can be coalesced into one message, so epochs are timed from the server's
+        # elapsed clock and the epoch numbers rather than from when messages arrive
+        first_epoch = None
+        epoch_times = []
+        last_epoch, last_elapsed, coalesced = 0, 0.0, 0
+        with self.client.websocket_connect(f"/ws/train/{session_id}?max_rate=0") as ws:
+            start = time.perf_counter()
+            while True:
+                message = ws.receive_json()
+                if message.get("type") == "epoch_update":
+                    epoch, elapsed = message["epoch"], message["elapsed"]
+                    per_epoch = (elapsed - last_elapsed) / (epoch - last_epoch)
+                    if last_epoch == 0:
+                        first_epoch = per_epoch if epoch == 1 else None
+                    else:
+                        epoch_times.extend([per_epoch] * (epoch - last_epoch))
+                    last_epoch, last_elapsed = epoch, elapsed
+                    coalesced += message.get("coalesced", 0)
+                elif message.get("type") in ("training_complete", "error", "training_cancelled"):
+                    break
+            seconds = time.perf_counter() - start
+        if message.get("type") != "training_complete":
+            raise RuntimeError(f"Training did not complete: {message}")
+        epochs = self.args.epochs
+        return {
+            "epochs": epochs,
+            "seconds": round(seconds, 4),
+            "epochs_per_second": round(epochs / seconds, 3),
+            # the first epoch includes tracing the train step
+            "first_epoch_ms": round(first_epoch * 1000, 3) if first_epoch is not None else None,
+            "steady_epoch_ms": percentile_ms(epoch_times, 50) if epoch_times else None,
+            "coalesced_updates": coalesced,
+        }
+
+    def predict(self, session_id: str, input_dim: int) -> Dict[str, Any]:
+        rng = np.random.default_rng(self.args.seed)
+        results = {}
+        for batch in self.args.predict_batches:
+            data = rng.normal(size=(batch, input_dim)).round(4).tolist()
+            url = f"/api/train/{session_id}/predict"
+            self.client.post(url, json=data).raise_for_status()
+            timings = []
+            for _ in range(self.args.predict_repeats):
+                start = time.perf_counter()
+                response = self.client.post(url, json=data)
+                timings.append(time.perf_counter() - start)
+            response.raise_for_status()
+            results[str(batch)] = {
+                "p50_ms": percentile_ms(timings, 50),
+                "p99_ms": percentile_ms(timings, 99),
+                "rows_per_second": round(batch * len(timings) / sum(timings), 1),
+            }
+        return results
+
+    def run_engine(self, dataset_id: str, engine: str) -> Dict[str, Any]:
+        result = {}
+        start = self.start_session(dataset_id, engine)
+        session_id = start.pop("session_id")
+        session = self.main.training_sessions[session_id]
+        result["engine"] = session.get("engine")
+        result["start_session"] = start
+        result["train"] = self.train(session_id)
+        result["predict"] = self.predict(session_id, session["input_dim"])
+        self.client.delete(f"/api/train/{session_id}")
+        return result
+
+    def run_dataset(self, dataset_id: str, payload: bytes = None) -> Dict[str, Any]:
+        result = {}
+        if payload is not None:
+            result["upload"] = self.upload(dataset_id, payload)
+        for engine in self.engines:
+            result[engine] = self.run_engine(dataset_id, engine)
+        result["peak_rss_mb"] = round(peak_rss_mb(), 1)
+        return result
+
+    def run(self) -> Dict[str, Any]:
+        results = {"iris": self.run_dataset("iris")}
+        print(f"iris: {json.dumps(results['iris'])}")
+        for rows in self.args.sizes:
+            name = f"synthetic_{rows}x{self.args.features}"
+            payload = synthetic_csv(rows, self.args.features, self.args.classes, self.args.seed)
+            results[name] = self.run_dataset(name, payload)
+            print(f"{name}: {json.dumps(results[name])}")
+        return {
+            "meta": {
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "tensorflow": self.tf_version,
+                "cpu_count": os.cpu_count(),
+                "import_seconds": round(self.import_seconds, 3),
+                "args": vars(self.args),
+            },
+            "results": results,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+
+def flatten(value, prefix="") -> Dict[str, float]:
+    if isinstance(value, dict):
+        items = {}
+        for key, inner in value.items():
+            items.update(flatten(inner, f"{prefix}.{key}" if prefix else key))
+        return items
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return {prefix: value}
+    return {}
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]):
+    before, after = flatten(old["results"]), flatten(new["results"])
+    print(f"\n{'metric':60} {old['meta']['commit']:>12} {new['meta']['commit']:>12} {'change':>9}")
+    for key in sorted(set(before) & set(after)):
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+        print(f"{key:60} {before[key]:>12} {after[key]:>12} {change:>+8.1f}%")
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NeuraSect backend training and inference paths")
+    parser.add_argument("--sizes", type=parse_ints, default=[1000, 10000, 100000], help="synthetic dataset row counts")
+    parser.add_argument("--features", type=int, default=20)
+    parser.add_argument("--classes", type=int, default=3)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--layers", type=int, default=2)
+    parser.add_argument("--neurons", type=int, default=64)
+    parser.add_argument("--start-repeats", type=int, default=5)
+    parser.add_argument("--predict-batches", type=parse_ints, default=[1, 32, 256, 1024])
+    parser.add_argument("--predict-repeats", type=int, default=100)
+    parser.add_argument("--engine", choices=ENGINES + ["auto", "both"], default="both",
+                        help="training engine to benchmark; auto lets the server pick by model size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--quick", action="store_true", help="small sizes for a fast smoke run")
+    parser.add_argument("--output", help="result file (default: data/benchmarks/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="earlier result file to diff against")
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.epochs, args.start_repeats, args.predict_repeats = [1000, 10000], 2, 3, 20
+
+    report = Benchmark(args).run()
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"{report['meta']['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+import numpy_engine
+
+SESSION_ID_PATTERN = re.compile(r"\w[\w.\-]*")
+# Keras models are saved as .keras, NumPy engine models as .npz
+MODEL_EXTENSIONS = (".keras", ".npz")
+
+
+def model_extension(model) -> str:
+    return getattr(model, "file_extension", ".keras")
+
+
+def save_model_atomic(model, path: str):
+    tmp_path = f"{path}.tmp-{os.getpid()}{model_extension(model)}"
+    model.save(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def write_json_atomic(data: Dict[str, Any], path: str):
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def to_builtin(value):
+    if isinstance(value, dict):
+        return {k: to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def restore_scaler(mean, scale):
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(mean, dtype=np.float64)
+    scaler.scale_ = np.asarray(scale, dtype=np.float64)
+    scaler.var_ = scaler.scale_ ** 2
+    scaler.n_features_in_ = len(scaler.mean_)
+    return scaler
+
+
+class PeriodicCheckpoint:
+    # mixed into the engine's own Callback class by periodic_checkpoint_class
+
+    def __init__(self, store: "CheckpointStore", session_id: str, every: int,
+                 session: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.store = store
+        self.session_id = session_id
+        self.every = every
+        self.session = session
+        self.history: Optional[Dict[str, list]] = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.history is None:
+            # a resumed fit starts after the epochs already in the session history
+            previous = self.session.get("history") if self.session is not None and epoch > 0 else None
+            self.history = {k: list(v) for k, v in (previous or {}).items()}
+        for key, value in (logs or {}).items():
+            self.history.setdefault(key, []).append(value)
+        if (epoch + 1) % self.every == 0:
+            try:
+                self.store.save_checkpoint(self.session_id, self.model, epoch + 1, self.session, self.history)
+            except Exception as e:
+                print(f"Checkpoint failed for {self.session_id}: {e}")
+
+
+_checkpoint_classes: Dict[str, type] = {}
+
+
+def periodic_checkpoint_class(engine: str) -> type:
+    # NumPy sessions get a numpy_engine.Callback, so checkpointing them never imports TensorFlow
+    cls = _checkpoint_classes.get(engine)
+    if cls is None:
+        if engine == "numpy":
+            base = numpy_engine.Callback
+        else:
+            from tensorflow import keras
+            base = keras.callbacks.Callback
+        cls = _checkpoint_classes[engine] = type("PeriodicCheckpoint", (PeriodicCheckpoint, base), {})
+    return cls
+
+
+class CheckpointStore:
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def __repr__(self):
+        return f"CheckpointStore(root={self.root!r})"
+
+    def session_dir(self, session_id: str) -> Optional[str]:
+        if not SESSION_ID_PATTERN.fullmatch(session_id):
+            return None
+        return os.path.join(self.root, session_id)
+
+    def exists(self, session_id: str) -> bool:
+        path = self.session_dir(session_id)
+        return path is not None and any(
+            os.path.exists(os.path.join(path, name)) for name in ("session.json", "checkpoint.json")
+        )
+
+    def callback(self, session_id: str, every: int,
+                 session: Optional[Dict[str, Any]] = None) -> Optional[PeriodicCheckpoint]:
+        if not every or every < 1 or self.session_dir(session_id) is None:
+            return None
+        engine = session.get("engine", "keras") if session is not None else "keras"
+        return periodic_checkpoint_class(engine)(self, session_id, every, session)
+
+    def save_checkpoint(self, session_id: str, model, epoch: int,
+                        session: Optional[Dict[str, Any]] = None, history: Optional[Dict[str, list]] = None):
+        path = self.session_dir(session_id)
+        os.makedirs(path, exist_ok=True)
+        save_model_atomic(model, os.path.join(path, f"checkpoint{model_extension(model)}"))
+        info = {"epoch": epoch, "saved_at": datetime.now().isoformat()}
+        if session is not None:
+            # enough to rebuild the session if the process dies before export()
+            self._write_preprocessing(session, path)
+            info.update({
+                "session_id": session_id,
+                "config": session["config"].model_dump(),
+                "history": history or {},
+                "num_classes": session["num_classes"],
+                "input_dim": session["input_dim"],
+            })
+        write_json_atomic(to_builtin(info), os.path.join(path, "checkpoint.json"))
+
+    def _write_preprocessing(self, session: Dict[str, Any], path: str):
+        preprocessing = session["preprocessing"]
+        scaler = preprocessing["scaler"]
+        write_json_atomic(to_builtin({
+            "mean": scaler.mean_,
+            "scale": scaler.scale_,
+            "feature_columns": preprocessing.get("feature_columns"),
+            "label_encodings": preprocessing.get("label_encodings"),
+            "class_names": preprocessing.get("class_names"),
+            "num_classes": preprocessing.get("num_classes"),
+        }), os.path.join(path, "preprocessing.json"))
+
+    def export(self, session_id: str, session: Dict[str, Any]) -> str:
+        path = self.session_dir(session_id)
+        if path is None:
+            raise ValueError(f"Invalid session id '{session_id}'")
+        os.makedirs(path, exist_ok=True)
+        model_file = f"model{model_extension(session['model'])}"
+        save_model_atomic(session["model"], os.path.join(path, model_file))
+        self._write_preprocessing(session, path)
+
+        write_json_atomic(to_builtin({
+            "session_id": session_id,
+            "config": session["config"].model_dump(),
+            "status": session["status"],
+            "history": session["history"],
+            "num_classes": session["num_classes"],
+            "input_dim": session["input_dim"],
+            "exported_at": datetime.now().isoformat(),
+        }), os.path.join(path, "session.json"))
+
+        # a grown NumPy session is exported again as Keras, so drop the other format too
+        stale_files = [f"{name}{ext}" for name in ("model", "checkpoint") for ext in MODEL_EXTENSIONS]
+        for stale in [f for f in stale_files if f != model_file] + ["checkpoint.json"]:
+            try:
+                os.remove(os.path.join(path, stale))
+            except OSError:
+                pass
+        return path
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_model(self, path: str, stem: str):
+        if os.path.exists(os.path.join(path, f"{stem}.npz")):
+            return numpy_engine.load_model(os.path.join(path, f"{stem}.npz"))
+        from tensorflow import keras
+        return keras.models.load_model(os.path.join(path, f"{stem}.keras"))
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        path = self.session_dir(session_id)
+        info = self._read_json(os.path.join(path, "session.json"))
+        checkpoint = self._read_json(os.path.join(path, "checkpoint.json"))
+        exported_epochs = len((info.get("history") or {}).get("loss", [])) if info else -1
+        if checkpoint is not None and "config" in checkpoint and checkpoint["epoch"] > exported_epochs:
+            # the process died mid-training: continue from the latest periodic checkpoint
+            info = {k: v for k, v in checkpoint.items() if k not in ("epoch", "saved_at")}
+            info["status"] = "interrupted"
+            info["model"] = self._load_model(path, "checkpoint")
+        elif info is not None:
+            info["model"] = self._load_model(path, "model")
+        else:
+            raise FileNotFoundError(f"No restorable checkpoint for session '{session_id}'")
+        with open(os.path.join(path, "preprocessing.json")) as f:
+            preprocessing = json.load(f)
+        preprocessing["scaler"] = restore_scaler(preprocessing.pop("mean"), preprocessing.pop("scale"))
+        info["preprocessing"] = preprocessing
+        return info
+
+    def delete(self, session_id: str) -> bool:
+        path = self.session_dir(session_id)
+        if path is None or not os.path.isdir(path):
+            return False
+        shutil.rmtree(path, ignore_errors=True)
+        return True
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+def freeze(value):
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    return value
+
+
+def value_bytes(value: Tuple) -> int:
+    return sum(v.nbytes for v in value if isinstance(v, np.ndarray))
+
+
+class DatasetCache:
+
+    def __init__(self, max_bytes: int = 1024 ** 3):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return f"DatasetCache(entries={len(self._entries)}, bytes={self.total_bytes()}, max_bytes={self.max_bytes})"
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key(*parts) -> str:
+        return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
+
+    def get(self, key: str) -> Optional[Tuple]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Tuple) -> Tuple:
+        value = tuple(freeze(v) for v in value)
+        size = value_bytes(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._entries.move_to_end(key)
+            while self.total_bytes() > self.max_bytes:
+                old_key, _ = self._entries.popitem(last=False)
+                self._sizes.pop(old_key, None)
+                self.evictions += 1
+        return value
+
+    def get_or_create(self, key: str, factory: Callable[[], Tuple]) -> Tuple:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                value = self._entries.get(key)
+            if value is None:
+                value = self.put(key, factory())
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self.total_bytes(),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+            }
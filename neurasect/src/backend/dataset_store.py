@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, List
+
+import numpy as np
+
+POINTER_FILE = "current.json"
+
+
+def safe_name(dataset_id: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", dataset_id).lstrip(".")
+    if name != dataset_id or not name:
+        name = f"{name or 'dataset'}-{hashlib.sha1(dataset_id.encode('utf-8')).hexdigest()[:8]}"
+    return name
+
+
+class DatasetStore:
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._open: Dict[str, Tuple[str, np.ndarray, np.ndarray, Dict[str, Any]]] = {}
+
+    def __repr__(self):
+        return f"DatasetStore(root={self.root!r}, open={len(self._open)})"
+
+    def __contains__(self, dataset_id: str) -> bool:
+        return self._pointer(dataset_id) is not None
+
+    def _dir(self, dataset_id: str) -> str:
+        return os.path.join(self.root, safe_name(dataset_id))
+
+    def _pointer(self, dataset_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._dir(dataset_id), POINTER_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def version(self, dataset_id: str) -> Optional[str]:
+        pointer = self._pointer(dataset_id)
+        return pointer["version"] if pointer else None
+
+    def save(self, dataset_id: str, X: np.ndarray, y: np.ndarray, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        dataset_dir = self._dir(dataset_id)
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(X).data)
+        digest.update(np.ascontiguousarray(y).data)
+        version = digest.hexdigest()[:16]
+
+        meta = dict(metadata)
+        meta.update({
+            "dataset_id": dataset_id,
+            "version": version,
+            "shape": list(X.shape),
+            "X_dtype": str(X.dtype),
+            "y_dtype": str(y.dtype),
+            "created_at": datetime.now().isoformat(),
+        })
+
+        version_dir = os.path.join(dataset_dir, version)
+        if not os.path.isdir(version_dir):
+            staging = tempfile.mkdtemp(prefix=".staging-", dir=dataset_dir)
+            np.save(os.path.join(staging, "X.npy"), np.ascontiguousarray(X))
+            np.save(os.path.join(staging, "y.npy"), np.ascontiguousarray(y))
+            with open(os.path.join(staging, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            try:
+                os.rename(staging, version_dir)
+            except OSError:
+                shutil.rmtree(staging, ignore_errors=True)
+
+        pointer_tmp = os.path.join(dataset_dir, f".{POINTER_FILE}.{os.getpid()}")
+        with open(pointer_tmp, "w") as f:
+            json.dump({"version": version}, f)
+        os.replace(pointer_tmp, os.path.join(dataset_dir, POINTER_FILE))
+
+        for entry in os.listdir(dataset_dir):
+            if entry not in (version, POINTER_FILE) and not entry.startswith("."):
+                shutil.rmtree(os.path.join(dataset_dir, entry), ignore_errors=True)
+
+        with self._lock:
+            self._open.pop(dataset_id, None)
+        return meta
+
+    def load(self, dataset_id: str) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        pointer = self._pointer(dataset_id)
+        if pointer is None:
+            raise KeyError(dataset_id)
+        version = pointer["version"]
+        with self._lock:
+            cached = self._open.get(dataset_id)
+            if cached and cached[0] == version:
+                return cached[1], cached[2], cached[3]
+
+        version_dir = os.path.join(self._dir(dataset_id), version)
+        X = np.load(os.path.join(version_dir, "X.npy"), mmap_mode="r")
+        y = np.load(os.path.join(version_dir, "y.npy"), mmap_mode="r")
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            meta = json.load(f)
+
+        with self._lock:
+            self._open[dataset_id] = (version, X, y, meta)
+        return X, y, meta
+
+    def metadata(self, dataset_id: str) -> Dict[str, Any]:
+        return self.load(dataset_id)[2]
+
+    def list(self) -> List[Dict[str, Any]]:
+        datasets = []
+        for entry in sorted(os.listdir(self.root)):
+            pointer_path = os.path.join(self.root, entry, POINTER_FILE)
+            if not os.path.exists(pointer_path):
+                continue
+            try:
+                with open(pointer_path) as f:
+                    version = json.load(f)["version"]
+                with open(os.path.join(self.root, entry, version, "meta.json")) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError, KeyError):
+                continue
+            datasets.append({k: meta.get(k) for k in ("dataset_id", "version", "shape", "num_classes", "created_at")})
+        return datasets
+
+    def delete(self, dataset_id: str) -> bool:
+        dataset_dir = self._dir(dataset_id)
+        with self._lock:
+            self._open.pop(dataset_id, None)
+        if not os.path.isdir(dataset_dir):
+            return False
+        shutil.rmtree(dataset_dir, ignore_errors=True)
+        return True
@@ -0,0 +1,145 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+
+class IntegratedGradients:
+
+    def __init__(self, model, input_dim: int, max_rows: int = 8192):
+        self.model = model
+        self.input_dim = input_dim
+        self.max_rows = max_rows
+        self._predict = tf.function(
+            self._call,
+            input_signature=[tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32)]
+        )
+        self._attribute = tf.function(
+            self._path_gradients,
+            input_signature=[
+                tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32),
+                tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32),
+                tf.TensorSpec(shape=(None,), dtype=tf.int32),
+                tf.TensorSpec(shape=(None,), dtype=tf.float32),
+            ]
+        )
+
+    def __repr__(self):
+        return f"IntegratedGradients(model={self.model.name!r}, input_dim={self.input_dim})"
+
+    def _call(self, x):
+        return self.model(x, training=False)
+
+    def _path_gradients(self, x, baseline, targets, alphas):
+        steps = tf.shape(alphas)[0]
+        diff = x - baseline
+        # every interpolation step of every sample goes through the model as one batch
+        path = baseline[:, None, :] + alphas[None, :, None] * diff[:, None, :]
+        flat = tf.reshape(path, (-1, self.input_dim))
+        rows = tf.repeat(targets, steps)
+        with tf.GradientTape() as tape:
+            tape.watch(flat)
+            outputs = self.model(flat, training=False)
+            selected = tf.reduce_sum(outputs * tf.one_hot(rows, tf.shape(outputs)[1], dtype=outputs.dtype), axis=1)
+        grads = tf.reshape(tape.gradient(selected, flat), (-1, steps, self.input_dim))
+        # trapezoidal rule over the path
+        average = tf.reduce_mean((grads[:, :-1] + grads[:, 1:]) / 2.0, axis=1)
+        selected = tf.reshape(selected, (-1, steps))
+        return diff * average, selected[:, -1], selected[:, 0]
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self._predict(tf.convert_to_tensor(x, dtype=tf.float32)).numpy()
+
+    def attribute(self, x: np.ndarray, baseline: np.ndarray, targets: np.ndarray, steps: int = 50):
+        alphas = tf.linspace(0.0, 1.0, steps + 1)
+        chunk = max(1, self.max_rows // (steps + 1))
+        attributions, outputs, baseline_outputs = [], [], []
+        for start in range(0, len(x), chunk):
+            a, out, base = self._attribute(
+                tf.convert_to_tensor(x[start:start + chunk], dtype=tf.float32),
+                tf.convert_to_tensor(baseline[start:start + chunk], dtype=tf.float32),
+                tf.convert_to_tensor(targets[start:start + chunk], dtype=tf.int32),
+                alphas
+            )
+            attributions.append(a.numpy())
+            outputs.append(out.numpy())
+            baseline_outputs.append(base.numpy())
+        return np.concatenate(attributions), np.concatenate(outputs), np.concatenate(baseline_outputs)
+
+
+def input_hash(*arrays) -> str:
+    digest = hashlib.sha1()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        digest.update(str((arr.dtype.str, arr.shape)).encode("utf-8"))
+        digest.update(arr.tobytes())
+    return digest.hexdigest()
+
+
+class AttributionEngine:
+
+    def __init__(self, max_entries: int = 256, max_rows: int = 8192):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._explainers: Dict[str, Tuple[int, IntegratedGradients]] = {}
+        self._cache: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"AttributionEngine(sessions={len(self._explainers)}, cached={len(self._cache)})"
+
+    def explainer(self, session_id: str, model, input_dim: int) -> IntegratedGradients:
+        with self._lock:
+            cached = self._explainers.get(session_id)
+            if cached is not None and cached[0] == id(model):
+                return cached[1]
+            # NumPy engine models bring their own gradient implementation
+            explainer_class = getattr(model, "explainer_class", IntegratedGradients)
+            explainer = explainer_class(model, input_dim, self.max_rows)
+            self._explainers[session_id] = (id(model), explainer)
+            return explainer
+
+    def explain(self, session_id: str, version: str, model, x: np.ndarray, baseline: np.ndarray,
+                target: Optional[np.ndarray], steps: int) -> Dict[str, Any]:
+        key = (session_id, version, steps, input_hash(x, baseline, target if target is not None else np.zeros(0)))
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(result, cached=True)
+            self.misses += 1
+
+        explainer = self.explainer(session_id, model, x.shape[1])
+        if target is None:
+            target = explainer.predict(x).argmax(axis=1)
+        attributions, outputs, baseline_outputs = explainer.attribute(x, baseline, target, steps)
+        result = {
+            "attributions": attributions.tolist(),
+            "targets": target.tolist(),
+            "outputs": outputs.tolist(),
+            "baseline_outputs": baseline_outputs.tolist(),
+            # completeness: attributions should sum to f(x) - f(baseline); large gaps mean too few steps
+            "convergence_delta": (attributions.sum(axis=1) - (outputs - baseline_outputs)).tolist(),
+            "steps": steps,
+        }
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return dict(result, cached=False)
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._explainers.pop(session_id, None)
+            for key in [k for k in self._cache if k[0] == session_id]:
+                del self._cache[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._explainers), "entries": len(self._cache), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from weight_stream import dense_layers
+
+
+class LayoutOptions:
+
+    def __init__(self, top_k: Optional[int] = 10, threshold: Optional[float] = None, per: str = "source",
+                 width: float = 960, height: float = 500, layer_spacing: float = 123, node_spacing: float = 12):
+        self.top_k = top_k if top_k is None or top_k > 0 else None
+        self.threshold = threshold
+        self.per = per if per in ("source", "target") else "source"
+        self.width = width
+        self.height = height
+        self.layer_spacing = layer_spacing
+        self.node_spacing = max(1.0, node_spacing)
+
+    def __repr__(self):
+        return f"LayoutOptions(top_k={self.top_k}, threshold={self.threshold}, per={self.per!r})"
+
+    def key(self) -> Tuple:
+        return (self.top_k, self.threshold, self.per, self.width, self.height, self.layer_spacing, self.node_spacing)
+
+
+def layer_sizes(model) -> List[int]:
+    layers = dense_layers(model)
+    if not layers:
+        return []
+    return [int(layers[0].kernel.shape[0])] + [int(layer.kernel.shape[1]) for layer in layers]
+
+
+def layer_positions(sizes: List[int], options: LayoutOptions) -> List[Dict[str, Any]]:
+    # Same spacing as formatNodes in the D3 visualizer; layers taller than the
+    # canvas are wrapped into several columns inside the layer's band
+    total_width = (len(sizes) - 1) * options.layer_spacing
+    x_offset = (options.width - total_width) / 2
+    per_column = max(1, int(options.height // options.node_spacing))
+    positions = []
+    for layer, count in enumerate(sizes):
+        index = np.arange(count)
+        columns = -(-count // per_column)
+        rows = min(count, per_column)
+        column = index // per_column
+        column_width = options.layer_spacing / (columns + 1) if columns > 1 else 0.0
+        cx = x_offset + layer * options.layer_spacing + (column - (columns - 1) / 2) * column_width
+        cy = (index % per_column + 1) * options.height / (rows + 1)
+        positions.append({
+            "layer": layer,
+            "size": count,
+            "columns": columns,
+            "cx": np.round(cx, 2).tolist(),
+            "cy": np.round(cy, 2).tolist(),
+        })
+    return positions
+
+
+def prune_kernel(kernel: np.ndarray, top_k: Optional[int], threshold: Optional[float],
+                 per: str = "source") -> Tuple[np.ndarray, np.ndarray]:
+    magnitude = np.abs(kernel)
+    if per == "target":
+        magnitude = magnitude.T
+    n, m = magnitude.shape
+    if top_k is not None and top_k < m:
+        cols = np.argpartition(magnitude, m - top_k, axis=1)[:, m - top_k:]
+        rows = np.repeat(np.arange(n), top_k)
+        cols = cols.ravel()
+    else:
+        rows, cols = np.indices((n, m)).reshape(2, -1)
+    if threshold is not None:
+        keep = magnitude[rows, cols] >= threshold
+        rows, cols = rows[keep], cols[keep]
+    if per == "target":
+        rows, cols = cols, rows
+    order = np.lexsort((cols, rows))
+    return rows[order], cols[order]
+
+
+def build_layout(model, options: LayoutOptions) -> Dict[str, Any]:
+    layers = dense_layers(model)
+    sizes = layer_sizes(model)
+    edges = []
+    total = 0
+    for layer, dense in enumerate(layers):
+        kernel = np.asarray(dense.kernel)
+        source, target = prune_kernel(kernel, options.top_k, options.threshold, options.per)
+        total += kernel.size
+        edges.append({
+            "layer": layer,
+            "source": source.tolist(),
+            "target": target.tolist(),
+            "weight": kernel[source, target].astype(float).tolist(),
+        })
+    return {
+        "layers": sizes,
+        "nodes": layer_positions(sizes, options),
+        "edges": edges,
+        "edges_total": total,
+        "edges_kept": sum(len(e["source"]) for e in edges),
+        "options": {"top_k": options.top_k, "threshold": options.threshold, "per": options.per},
+    }
+
+
+class GraphLayoutCache:
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f"GraphLayoutCache(entries={len(self._entries)}, max_entries={self.max_entries})"
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            layout = self._entries.get(key)
+            if layout is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return layout
+
+    def put(self, key: Tuple, layout: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = layout
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def drop(self, session_id: str):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == session_id]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,146 @@
+import asyncio
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+
+def decode_npy(body: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(body), allow_pickle=False)
+
+
+def encode_npy(arr: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, arr, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def build_inference_model(model, scaler):
+    # StandardScaler divides by scale_ (1.0 for constant columns), so pass scale_**2 rather than var_
+    normalization = keras.layers.Normalization(
+        mean=np.asarray(scaler.mean_, dtype=np.float32),
+        variance=np.asarray(scaler.scale_, dtype=np.float32) ** 2,
+        name="standard_scaler"
+    )
+    inputs = keras.Input(shape=(len(scaler.mean_),), name="raw_features")
+    outputs = model(normalization(inputs), training=False)
+    return keras.Model(inputs, outputs, name=f"{model.name}_inference")
+
+
+class CompiledModel:
+
+    def __init__(self, model, input_dim: int):
+        self.model = model
+        self.input_dim = input_dim
+        self._forward = tf.function(
+            self._call,
+            input_signature=[tf.TensorSpec(shape=(None, input_dim), dtype=tf.float32)]
+        )
+
+    def __repr__(self):
+        return f"CompiledModel(model={self.model.name!r}, input_dim={self.input_dim})"
+
+    def _call(self, x):
+        return self.model(x, training=False)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return self._forward(tf.convert_to_tensor(x, dtype=tf.float32)).numpy()
+
+
+class MicroBatcher:
+
+    def __init__(self, compiled: CompiledModel, executor: ThreadPoolExecutor,
+                 window_seconds: float = 0.005, max_batch_rows: int = 1024):
+        self.compiled = compiled
+        self.executor = executor
+        self.window_seconds = window_seconds
+        self.max_batch_rows = max_batch_rows
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.batches = 0
+        self.requests = 0
+
+    def __repr__(self):
+        return f"MicroBatcher(window={self.window_seconds}s, max_batch_rows={self.max_batch_rows})"
+
+    async def submit(self, x: np.ndarray) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((x, future))
+        self._pending_rows += len(x)
+        self.requests += 1
+        if self._pending_rows >= self.max_batch_rows:
+            self._flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush, loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if not batch:
+            return
+        self.batches += 1
+        inputs = np.concatenate([x for x, _ in batch]) if len(batch) > 1 else batch[0][0]
+        task = loop.run_in_executor(self.executor, self.compiled, inputs)
+
+        def deliver(done: asyncio.Future):
+            error = done.exception()
+            offset = 0
+            for x, future in batch:
+                if future.done():
+                    offset += len(x)
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[offset:offset + len(x)])
+                offset += len(x)
+
+        task.add_done_callback(deliver)
+
+
+class InferenceEngine:
+
+    def __init__(self, workers: int = 2, window_seconds: float = 0.005, max_batch_rows: int = 1024):
+        self.window_seconds = window_seconds
+        self.max_batch_rows = max_batch_rows
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._batchers: Dict[str, Tuple[int, MicroBatcher]] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"InferenceEngine(sessions={len(self._batchers)}, window={self.window_seconds}s)"
+
+    def batcher(self, session_id: str, model, input_dim: int) -> MicroBatcher:
+        with self._lock:
+            cached = self._batchers.get(session_id)
+            if cached is not None and cached[0] == id(model):
+                return cached[1]
+            batcher = MicroBatcher(
+                CompiledModel(model, input_dim), self.executor,
+                self.window_seconds, self.max_batch_rows
+            )
+            self._batchers[session_id] = (id(model), batcher)
+            return batcher
+
+    async def predict(self, session_id: str, model, x: np.ndarray, input_dim: int) -> np.ndarray:
+        return await self.batcher(session_id, model, input_dim).submit(x)
+
+    def drop(self, session_id: str):
+        with self._lock:
+            self._batchers.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                sid: {"requests": b.requests, "batches": b.batches}
+                for sid, (_, b) in self._batchers.items()
+            }
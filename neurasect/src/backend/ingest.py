@@ -0,0 +1,189 @@
+import codecs
+import os
+import tempfile
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from supabase_loader import CategoryCodes
+
+ENCODINGS = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'ascii']
+READ_BLOCK_BYTES = 1024 * 1024
+SAMPLE_BYTES = 64 * 1024
+
+
+class SpooledUpload:
+
+    def __init__(self, path: str, size: int, line_count: int, ends_with_newline: bool):
+        self.path = path
+        self.size = size
+        self.line_count = line_count
+        self.ends_with_newline = ends_with_newline
+
+    def __repr__(self):
+        return f"SpooledUpload(path={self.path!r}, size={self.size}, lines={self.line_count})"
+
+    def max_rows(self) -> int:
+        lines = self.line_count + (0 if self.ends_with_newline or self.size == 0 else 1)
+        return max(lines - 1, 0)
+
+    def sample(self, size: int = SAMPLE_BYTES) -> bytes:
+        with open(self.path, "rb") as f:
+            return f.read(size)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+async def spool_upload(file, block_size: int = READ_BLOCK_BYTES,
+                       on_progress: Optional[Callable[[int], None]] = None) -> SpooledUpload:
+    size = 0
+    lines = 0
+    last = b""
+    handle = tempfile.NamedTemporaryFile(prefix="upload_", suffix=".csv", delete=False)
+    try:
+        while True:
+            block = await file.read(block_size)
+            if not block:
+                break
+            handle.write(block)
+            size += len(block)
+            lines += block.count(b"\n")
+            last = block[-1:]
+            if on_progress:
+                on_progress(size)
+    finally:
+        handle.close()
+    return SpooledUpload(handle.name, size, lines, last == b"\n")
+
+
+def detect_encoding(sample: bytes) -> str:
+    for encoding in ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except (UnicodeDecodeError, UnicodeError):
+            continue
+    raise HTTPException(status_code=400, detail="Could not decode CSV file. Try saving with UTF-8 encoding.")
+
+
+def _label_string(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _feature_string(value: np.float32) -> str:
+    # shortest text for a stored float32 feature, so 3.0 -> "3" and 0.1 -> "0.1" like the CSV had it
+    return np.format_float_positional(value, trim="-")
+
+
+class TargetColumn:
+
+    def __init__(self, capacity: int):
+        self.values = np.empty(capacity, dtype=np.float64)
+        self.codes: Optional[CategoryCodes] = None
+        self.is_integer = True
+
+    def write(self, start: int, chunk: pd.Series):
+        if self.codes is None:
+            numeric = pd.to_numeric(chunk, errors="coerce")
+            if numeric.isna().sum() == chunk.isna().sum():
+                self.values[start:start + len(chunk)] = numeric.to_numpy(dtype=np.float64)
+                self.is_integer = self.is_integer and pd.api.types.is_integer_dtype(chunk.dtype)
+                return
+            # first non-numeric target: re-key everything seen so far as strings, like LabelEncoder on the whole column
+            self.codes = CategoryCodes()
+            self.values[:start] = self.codes.encode([_label_string(v) for v in self.values[:start]])
+        self.values[start:start + len(chunk)] = self.codes.encode(chunk.astype(str).tolist())
+
+    def finish(self, rows: int) -> np.ndarray:
+        y = self.values[:rows]
+        if self.codes is not None:
+            return self.codes.sorted_remap()[y.astype(np.int64)].astype(np.int64)
+        if self.is_integer:
+            return y.astype(np.int64)
+        return y
+
+
+def parse_csv(upload: SpooledUpload, encoding: str, chunk_rows: int = 50000,
+              on_progress: Optional[Callable[[int, int], None]] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    # the encoding is guessed from the first block only, so a bad byte further in moves on to the next candidate
+    candidates = [encoding] + (ENCODINGS[ENCODINGS.index(encoding) + 1:] if encoding in ENCODINGS else [])
+    for candidate in candidates:
+        try:
+            return _parse_csv(upload, candidate, chunk_rows, on_progress)
+        except UnicodeDecodeError:
+            print(f"CSV is not valid {candidate} past the sampled block, retrying")
+    raise HTTPException(status_code=400, detail="Could not decode CSV file. Try saving with UTF-8 encoding.")
+
+
+def _parse_csv(upload: SpooledUpload, encoding: str, chunk_rows: int,
+               on_progress: Optional[Callable[[int, int], None]]) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+    capacity = upload.max_rows()
+    X: Optional[np.ndarray] = None
+    target: Optional[TargetColumn] = None
+    categorical: Dict[int, CategoryCodes] = {}
+    columns = None
+    rows = 0
+
+    with open(upload.path, "rb") as f:
+        reader = pd.read_csv(f, encoding=encoding, chunksize=chunk_rows)
+        for chunk in reader:
+            if columns is None:
+                columns = list(chunk.columns)
+                if len(columns) < 2:
+                    raise HTTPException(status_code=400, detail="Dataset must have at least 2 columns (features + target)")
+                X = np.empty((capacity, len(columns) - 1), dtype=np.float32)
+                target = TargetColumn(capacity)
+                for j, col in enumerate(columns[:-1]):
+                    if chunk[col].dtype in ("object", "string"):
+                        categorical[j] = CategoryCodes()
+
+            n = len(chunk)
+            if rows + n > X.shape[0]:
+                X = np.resize(X, (rows + n, X.shape[1]))
+                target.values = np.resize(target.values, rows + n)
+
+            for j, col in enumerate(columns[:-1]):
+                values = chunk[col]
+                if j in categorical:
+                    X[rows:rows + n, j] = categorical[j].encode(values.astype(str).tolist())
+                else:
+                    try:
+                        X[rows:rows + n, j] = values.to_numpy(dtype=np.float32)
+                    except (TypeError, ValueError):
+                        # first non-numeric value in a column that looked numeric: re-key the rows so far as strings
+                        codes = categorical[j] = CategoryCodes()
+                        X[:rows, j] = codes.encode([_feature_string(v) for v in X[:rows, j]])
+                        X[rows:rows + n, j] = codes.encode(values.astype(str).tolist())
+            target.write(rows, chunk[columns[-1]])
+            rows += n
+            if on_progress:
+                on_progress(f.tell(), rows)
+
+    if columns is None:
+        raise HTTPException(status_code=400, detail="CSV file is empty")
+
+    if rows != X.shape[0]:
+        X = X[:rows].copy()
+    for j, codes in categorical.items():
+        X[:, j] = codes.sorted_remap()[X[:, j].astype(np.int64)]
+    y = target.finish(rows)
+
+    label_encodings = {
+        columns[j]: sorted(codes.codes) for j, codes in categorical.items()
+    }
+    if target.codes is not None:
+        label_encodings[columns[-1]] = sorted(target.codes.codes)
+    info = {
+        "columns": columns,
+        "encoding": encoding,
+        "label_encodings": label_encodings,
+    }
+    return X, y, info
@@ -1,19 +1,47 @@
-from fastapi import FastAPI, WebSocket, HTTPException, WebSocketDisconnect, UploadFile, File
+import time
+MAIN_IMPORT_STARTED = time.perf_counter()
+
+from fastapi import FastAPI, WebSocket, HTTPException, WebSocketDisconnect, UploadFile, File, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import tensorflow as tf
-from tensorflow import keras
 import numpy as np
 import pandas as pd
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 import json
 import asyncio
 from datetime import datetime
 import os
-from supabase import create_client, Client
+import httpx
 from dotenv import load_dotenv
 import threading
-import io
+import shutil
+import socket
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from scheduler import TrainingScheduler
+from sessions import SessionStore
+from dataset_cache import DatasetCache
+from supabase_loader import SupabaseDatasetLoader
+from ingest import spool_upload, detect_encoding, parse_csv
+from dataset_store import DatasetStore
+from progress import ProgressOptions, ProgressStream, BatchThrottle
+from weight_stream import WeightSnapshotEncoder, flatten_weights, weight_manifest
+from graph_layout import GraphLayoutCache, LayoutOptions, build_layout, layer_sizes
+from checkpoints import CheckpointStore
+from sweep import Sweep, create_executor, expand_space, export_arrays, halving_rungs, retire_arrays
+from registry import create_registry
+from routing import SessionRouter, InternalListener
+from runtime import LazyModule, LazyObject, ModelRuntime, loaded_version
+import numpy_engine
+
+# TensorFlow takes seconds to import, so it and the modules built on it load on first use
+# (or in the background at startup, see TF_STARTUP) and health/upload answer right away
+tf = LazyModule("tensorflow")
+keras = LazyModule("tensorflow", "keras")
+pipeline = LazyModule("pipeline")
+inference = LazyModule("inference")
+modeling = LazyModule("modeling")
+surgery = LazyModule("surgery")
 
 load_dotenv()
 
@@ -30,20 +58,68 @@ app.add_middleware(
 SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL", "")
 SUPABASE_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_PUBLISHABLE_DEFAULT_KEY", "")
 
-supabase_client: Optional[Client] = None
+SUPABASE_PAGE_SIZE = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+SUPABASE_MAX_CONCURRENCY = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "4"))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+DATA_PREP_WORKERS = int(os.getenv("DATA_PREP_WORKERS", "4"))
+
+# the client is created on the event loop at startup; every query shares its pooled connections
+supabase_client = None
+supabase_http: Optional[httpx.AsyncClient] = None
+supabase_loader: Optional[SupabaseDatasetLoader] = None
+event_loop: Optional[asyncio.AbstractEventLoop] = None
+prep_executor = ThreadPoolExecutor(max_workers=DATA_PREP_WORKERS, thread_name_prefix="data-prep")
 
-if SUPABASE_URL and SUPABASE_KEY:
+async def connect_supabase():
+    global supabase_client, supabase_http, supabase_loader
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        print("Supabase credentials not found in environment")
+        print("Only local datasets will be available")
+        return
     try:
-        supabase_client = create_client(SUPABASE_URL, SUPABASE_KEY)
+        from supabase import acreate_client, AsyncClientOptions
+        supabase_http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=SUPABASE_MAX_CONCURRENCY, max_keepalive_connections=SUPABASE_MAX_CONCURRENCY),
+            timeout=SUPABASE_TIMEOUT_SECONDS
+        )
+        supabase_client = await acreate_client(
+            SUPABASE_URL, SUPABASE_KEY, options=AsyncClientOptions(httpx_client=supabase_http)
+        )
+        supabase_loader = SupabaseDatasetLoader(
+            supabase_client, page_size=SUPABASE_PAGE_SIZE, max_concurrency=SUPABASE_MAX_CONCURRENCY
+        )
         print("Supabase client initialized")
     except Exception as e:
         print(f"Failed to initialize Supabase: {e}")
         print("Continuing with local datasets only")
-else:
-    print("Supabase credentials not found in environment")
-    print("Only local datasets will be available")
 
-uploaded_datasets: Dict[str, tuple] = {}
+@app.on_event("startup")
+async def start_data_access():
+    global event_loop
+    event_loop = asyncio.get_running_loop()
+    if supabase_client is None:
+        await connect_supabase()
+
+@app.on_event("shutdown")
+async def stop_data_access():
+    if supabase_http is not None:
+        await supabase_http.aclose()
+    prep_executor.shutdown(wait=False, cancel_futures=True)
+
+async def run_blocking(func, *args):
+    # dataset loading, preprocessing and model building stay off the event loop
+    return await asyncio.get_running_loop().run_in_executor(prep_executor, func, *args)
+
+DATASET_STORE_DIR = os.getenv("DATASET_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "datasets"))
+dataset_store = DatasetStore(DATASET_STORE_DIR)
+upload_progress: Dict[str, Dict[str, Any]] = {}
+UPLOAD_CHUNK_ROWS = int(os.getenv("UPLOAD_CHUNK_ROWS", "50000"))
+UPLOAD_PROGRESS_TTL_SECONDS = float(os.getenv("UPLOAD_PROGRESS_TTL_SECONDS", "60"))
+
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_BYTES", str(1024 ** 3)))
+DATASET_REMOTE_TTL_SECONDS = int(os.getenv("DATASET_REMOTE_TTL_SECONDS", "300"))
+dataset_cache = DatasetCache(max_bytes=DATASET_CACHE_MAX_BYTES)
+STREAMING_THRESHOLD_BYTES = int(os.getenv("STREAMING_THRESHOLD_BYTES", str(256 * 1024 ** 2)))
 
 class TrainingConfig(BaseModel):
     model_config = {"protected_namespaces": ()}
@@ -61,6 +137,7 @@ class TrainingConfig(BaseModel):
     activation: str
     epochs: Optional[int] = 100
     batch_size: Optional[int] = 32
+    checkpoint_every: Optional[int] = None
 
 class TrainingResponse(BaseModel):
     model_config = {"protected_namespaces": ()}
@@ -70,6 +147,38 @@ class TrainingResponse(BaseModel):
     model_summary: str
     input_shape: List[int]
     output_shape: List[int]
+    engine: Optional[str] = None
+
+class SweepRequest(BaseModel):
+    base: TrainingConfig
+    space: Dict[str, Any]
+    search: Optional[str] = "grid"
+    n_trials: Optional[int] = 10
+    seed: Optional[int] = None
+    metric: Optional[str] = "val_loss"
+    strategy: Optional[str] = "halving"
+    min_epochs: Optional[int] = 5
+    reduction_factor: Optional[int] = 3
+    early_stopping_patience: Optional[int] = None
+
+class ExplainRequest(BaseModel):
+    inputs: List[List[Union[float, str]]]
+    steps: Optional[int] = 50
+    baseline: Optional[Any] = "mean"
+    target: Optional[Any] = "predicted"
+
+class GrowRequest(BaseModel):
+    operation: str
+    layer: int
+    neurons: Optional[int] = None
+    activation: Optional[str] = None
+    noise: Optional[float] = 0.0
+
+class ResumeRequest(BaseModel):
+    epochs: int
+    learning_rate: Optional[float] = None
+    optimizer: Optional[str] = None
+    batch_size: Optional[int] = None
 
 class EpochUpdate(BaseModel):
     epoch: int
@@ -78,64 +187,237 @@ class EpochUpdate(BaseModel):
     val_loss: Optional[float] = None
     val_accuracy: Optional[float] = None
 
-training_sessions: Dict[str, Dict[str, Any]] = {}
+def release_session(session_id: str, session: Dict[str, Any]):
+    if "cancel_event" in session:
+        session["cancel_event"].set()
+    training_scheduler.remove(session_id)
+    # NumPy engine sessions never touch these, so don't import TensorFlow just to clean up
+    if inference_engine.loaded:
+        inference_engine.drop(session_id)
+    graph_cache.drop(session_id)
+    if attribution_engine.loaded:
+        attribution_engine.drop(session_id)
+    session_registry.release(session_id)
+    template_key = session.get("template_key")
+    if template_key is not None and session.get("status") not in ("queued", "training") and "model" in session:
+        template_cache.release(template_key, session["model"])
+    # no keras.backend.clear_session() here: it resets global state under models other threads may be building
+
+TRAINING_WORKERS = int(os.getenv("TRAINING_WORKERS", "2"))
+TEMPLATE_CACHE_ENTRIES = int(os.getenv("TEMPLATE_CACHE_ENTRIES", "32"))
+TEMPLATE_POOL_SIZE = int(os.getenv("TEMPLATE_POOL_SIZE", "2"))
+# small networks on small datasets train on the NumPy engine unless model_type asks for "keras"
+NUMPY_ENGINE_MAX_PARAMS = int(os.getenv("NUMPY_ENGINE_MAX_PARAMS", "20000"))
+NUMPY_ENGINE_MAX_ROWS = int(os.getenv("NUMPY_ENGINE_MAX_ROWS", "100000"))
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(2 * 1024 ** 3)))
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "checkpoints"))
+CHECKPOINT_EVERY = int(os.getenv("CHECKPOINT_EVERY", "0"))
+# plain files and NumPy only: Keras is imported when a Keras model is saved or loaded
+checkpoint_store = CheckpointStore(CHECKPOINT_DIR)
+
+PROGRESS_MAX_RATE = float(os.getenv("PROGRESS_MAX_RATE", "20"))
+PROGRESS_MAX_PENDING = int(os.getenv("PROGRESS_MAX_PENDING", "256"))
+WEIGHTS_MAX_RATE = float(os.getenv("WEIGHTS_MAX_RATE", "5"))
+
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+INFERENCE_BATCH_WINDOW_MS = float(os.getenv("INFERENCE_BATCH_WINDOW_MS", "5"))
+INFERENCE_MAX_BATCH_ROWS = int(os.getenv("INFERENCE_MAX_BATCH_ROWS", "1024"))
+
+GRAPH_CACHE_ENTRIES = int(os.getenv("GRAPH_CACHE_ENTRIES", "64"))
+GRAPH_TOP_K = int(os.getenv("GRAPH_TOP_K", "10"))
+graph_cache = GraphLayoutCache(max_entries=GRAPH_CACHE_ENTRIES)
+
+# architectures repeat a lot, so models from ended sessions are kept (already traced) for the next start
+templates = LazyModule("templates")
+template_cache = LazyObject(lambda: templates.TemplateCache(TEMPLATE_CACHE_ENTRIES, TEMPLATE_POOL_SIZE))
+
+EXPLAIN_MAX_STEPS = int(os.getenv("EXPLAIN_MAX_STEPS", "300"))
+EXPLAIN_MAX_ROWS = int(os.getenv("EXPLAIN_MAX_ROWS", "8192"))
+EXPLAIN_CACHE_ENTRIES = int(os.getenv("EXPLAIN_CACHE_ENTRIES", "256"))
+def create_attribution_engine():
+    from explain import AttributionEngine
+    return AttributionEngine(max_entries=EXPLAIN_CACHE_ENTRIES, max_rows=EXPLAIN_MAX_ROWS)
+
+attribution_engine = LazyObject(create_attribution_engine)
+
+model_versions = itertools.count(1)
+
+SWEEP_DIR = os.getenv("SWEEP_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sweeps"))
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "2"))
+SWEEP_WORKER_THREADS = int(os.getenv("SWEEP_WORKER_THREADS", "1"))
+SWEEP_MAX_TRIALS = int(os.getenv("SWEEP_MAX_TRIALS", "256"))
+sweeps: Dict[str, Sweep] = {}
+# exported datasets are shared by sweeps with the same key and removed once none of them is running
+sweep_data_users: Dict[str, int] = {}
+sweep_executor = None
+
+# with a shared registry (sqlite:///path) several workers can serve the API; requests for a
+# session, sweep or upload owned by another worker are forwarded to it
+SESSION_REGISTRY = os.getenv("SESSION_REGISTRY", "memory")
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+WORKER_ADDRESS = os.getenv("WORKER_ADDRESS", "")
+WORKER_INTERNAL_HOST = os.getenv("WORKER_INTERNAL_HOST", "127.0.0.1")
+WORKER_HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "5"))
+session_registry = create_registry(SESSION_REGISTRY, WORKER_ID, heartbeat_ttl=WORKER_HEARTBEAT_SECONDS * 3)
+internal_listener: Optional[InternalListener] = None
+app.add_middleware(SessionRouter, registry=session_registry)
+
+training_scheduler = TrainingScheduler(max_workers=TRAINING_WORKERS)
+inference_engine = LazyObject(lambda: inference.InferenceEngine(
+    workers=INFERENCE_WORKERS,
+    window_seconds=INFERENCE_BATCH_WINDOW_MS / 1000,
+    max_batch_rows=INFERENCE_MAX_BATCH_ROWS
+))
+training_sessions = SessionStore(
+    ttl_seconds=SESSION_TTL_SECONDS,
+    max_bytes=SESSION_MAX_BYTES,
+    on_evict=release_session
+)
 active_connections: Dict[str, WebSocket] = {}
 
-def get_optimizer(optimizer_name: str, learning_rate: float):
-    optimizers_map = {
-        "adam": keras.optimizers.Adam(learning_rate=learning_rate),
-        "sgd": keras.optimizers.SGD(learning_rate=learning_rate),
-        "rmsprop": keras.optimizers.RMSprop(learning_rate=learning_rate),
-        "adagrad": keras.optimizers.Adagrad(learning_rate=learning_rate),
-        "adamw": keras.optimizers.AdamW(learning_rate=learning_rate)
+def weight_encoder_from_query(params) -> Optional[WeightSnapshotEncoder]:
+    if params.get("weights") not in ("1", "true"):
+        return None
+    try:
+        return WeightSnapshotEncoder(
+            dtype=params.get("weights_dtype", "float16"),
+            keyframe_every=int(params.get("weights_keyframe_every", 20)),
+            every=int(params.get("weights_every", 1)),
+            max_rate=float(params.get("weights_max_rate", WEIGHTS_MAX_RATE)),
+        )
+    except ValueError:
+        return WeightSnapshotEncoder(max_rate=WEIGHTS_MAX_RATE)
+
+def restore_session(session_id: str) -> Dict[str, Any]:
+    # blocking: loads the model (importing TensorFlow for Keras sessions), so it runs on the prep executor
+    info = checkpoint_store.load(session_id)
+    engine = getattr(info["model"], "engine", "keras")
+    session = {
+        "model": info["model"],
+        "engine": engine,
+        "inference_model": build_inference_model(engine, info["model"], info["preprocessing"]["scaler"]),
+        "preprocessing": info["preprocessing"],
+        "config": TrainingConfig(**info["config"]),
+        "status": info["status"],
+        "history": info["history"],
+        "num_classes": info["num_classes"],
+        "input_dim": info["input_dim"],
+        "cancel_event": threading.Event(),
+        "model_version": next(model_versions),
     }
-    return optimizers_map.get(optimizer_name.lower(), keras.optimizers.Adam(learning_rate=learning_rate))
-
-def get_regularizer(regularizer_name: str, rate: float):
-    if regularizer_name == "l1":
-        return keras.regularizers.l1(rate)
-    elif regularizer_name == "l2":
-        return keras.regularizers.l2(rate)
-    elif regularizer_name == "l1_l2":
-        return keras.regularizers.l1_l2(l1=rate, l2=rate)
-    return None
-
-def build_model(input_shape, output_shape, num_layers, num_neurons, activation, regularizer, regularization_rate):
-    model = keras.Sequential()
-    kernel_reg = get_regularizer(regularizer, regularization_rate) if regularizer not in ["none", "dropout", "batch_norm"] else None
-
-    model.add(keras.layers.Input(shape=(input_shape,)))
-    model.add(keras.layers.Dense(num_neurons, activation=activation, kernel_regularizer=kernel_reg))
-    if regularizer == "dropout":
-        model.add(keras.layers.Dropout(regularization_rate))
-    elif regularizer == "batch_norm":
-        model.add(keras.layers.BatchNormalization())
-
-    for i in range(num_layers - 1):
-        model.add(keras.layers.Dense(num_neurons, activation=activation, kernel_regularizer=kernel_reg))
-        if regularizer == "dropout":
-            model.add(keras.layers.Dropout(regularization_rate))
-        elif regularizer == "batch_norm":
-            model.add(keras.layers.BatchNormalization())
-
-    if output_shape == 1:
-        model.add(keras.layers.Dense(1))
-    else:
-        model.add(keras.layers.Dense(output_shape, activation="softmax"))
+    print(f"Restored session {session_id} ({session['status']}) from {CHECKPOINT_DIR}")
+    return session
 
-    return model
+# concurrent requests for the same evicted session share one restore
+restoring: Dict[str, asyncio.Future] = {}
 
-def get_model_summary(model: keras.Model) -> str:
+async def get_session(session_id: str) -> Dict[str, Any]:
+    session = training_sessions.get(session_id)
+    if session is not None:
+        return session
+    if not checkpoint_store.exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    restore = restoring.get(session_id)
+    if restore is None:
+        restore = restoring[session_id] = asyncio.ensure_future(run_blocking(restore_session, session_id))
+        restore.add_done_callback(lambda _: restoring.pop(session_id, None))
+    try:
+        session = await asyncio.shield(restore)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not restore session: {str(e)}")
+    if session_id not in training_sessions:
+        training_sessions[session_id] = session
+        session_registry.claim(session_id, "session")
+    return training_sessions[session_id]
+
+async def sweep_sessions():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_SECONDS)
+        try:
+            training_sessions.evict()
+        except Exception as e:
+            print(f"Session sweep failed: {e}")
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    asyncio.create_task(sweep_sessions())
+
+async def worker_heartbeat():
+    while True:
+        await asyncio.sleep(WORKER_HEARTBEAT_SECONDS)
+        try:
+            session_registry.heartbeat()
+        except Exception as e:
+            print(f"Worker heartbeat failed: {e}")
+
+@app.on_event("startup")
+async def register_worker():
+    global internal_listener
+    address = WORKER_ADDRESS or None
+    if session_registry.shared and not address:
+        internal_listener = InternalListener(app, host=WORKER_INTERNAL_HOST)
+        address = await internal_listener.start()
+    session_registry.register_worker(address)
+    asyncio.create_task(worker_heartbeat())
+    print(f"Worker {WORKER_ID} registered ({type(session_registry).__name__}, address: {address})")
+
+@app.on_event("shutdown")
+async def unregister_worker():
+    session_registry.unregister_worker()
+    if internal_listener is not None:
+        await internal_listener.stop()
+
+def get_sweep_executor():
+    global sweep_executor
+    if sweep_executor is None:
+        sweep_executor = create_executor(SWEEP_WORKERS, SWEEP_WORKER_THREADS)
+    return sweep_executor
+
+@app.on_event("shutdown")
+async def stop_sweep_workers():
+    for sweep in sweeps.values():
+        sweep.cancel()
+    if sweep_executor is not None:
+        sweep_executor.shutdown(wait=False, cancel_futures=True)
+    shutil.rmtree(os.path.join(SWEEP_DIR, "data"), ignore_errors=True)
+
+async def release_sweep_data(data_dir: str):
+    sweep_data_users[data_dir] -= 1
+    if sweep_data_users[data_dir] == 0:
+        del sweep_data_users[data_dir]
+        doomed = retire_arrays(data_dir)
+        if doomed is not None:
+            await asyncio.get_running_loop().run_in_executor(None, shutil.rmtree, doomed, True)
+
+async def run_sweep(sweep: Sweep, data_dir: str):
+    try:
+        await sweep.run(get_sweep_executor(), data_dir)
+    finally:
+        await release_sweep_data(data_dir)
+
+def cancel_training(session_id: str) -> bool:
+    session = training_sessions.get(session_id)
+    if session is None:
+        return False
+    session["cancel_event"].set()
+    removed = training_scheduler.remove(session_id)
+    if removed or session["status"] in ("initialized", "queued"):
+        session["status"] = "cancelled"
+    return True
+
+def get_model_summary(model) -> str:
     string_list = []
     model.summary(print_fn=lambda x: string_list.append(x))
     return "\n".join(string_list)
 
 def load_dataset(dataset_id: str):
-    if dataset_id in uploaded_datasets:
-        X, y = uploaded_datasets[dataset_id]
-        unique_values = len(np.unique(y))
+    if dataset_id in dataset_store:
+        X, y, meta = dataset_store.load(dataset_id)
         print(f"Loaded uploaded dataset: {dataset_id} (shape: {X.shape})")
-        return X, y, unique_values if unique_values < 20 else 1
+        return X, y, meta["num_classes"]
     
     if supabase_client:
         try:
@@ -160,57 +442,40 @@ def load_dataset(dataset_id: str):
     )
 
 def load_supabase_dataset(dataset_id: str):
-    if not supabase_client:
+    if not supabase_loader:
         raise HTTPException(status_code=503, detail="Supabase not configured")
     try:
-        dataset_response = supabase_client.table("datasets").select("*").eq("id", dataset_id).execute()
-        if not dataset_response.data:
-            raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' not found in Supabase")
-        dataset_info = dataset_response.data[0]
-        dataset_title = dataset_info.get("title", "").lower()
-        table_names = ["iris", "boston", "youtube", "insurance", "carsales"]
-        table_name = next((t for t in table_names if t in dataset_title), None)
-        if not table_name:
-            for tname in table_names:
-                try:
-                    response = supabase_client.table(tname).select("*").eq("dataset_id", dataset_id).execute()
-                    if response.data:
-                        table_name = tname
-                        break
-                except:
-                    continue
-        if not table_name:
-            raise HTTPException(status_code=404, detail=f"No data found for dataset '{dataset_id}'")
-        data_response = supabase_client.table(table_name).select("*").eq("dataset_id", dataset_id).execute()
-        if not data_response.data:
-            raise HTTPException(status_code=404, detail=f"No data rows found for dataset '{dataset_id}'")
-        df = pd.DataFrame(data_response.data)
-        df = df.drop(columns=[c for c in ["id", "dataset_id", "created_at"] if c in df.columns], errors="ignore")
-        if len(df.columns) < 2:
-            raise HTTPException(status_code=400, detail="Dataset must have at least 2 columns")
-        from sklearn.preprocessing import LabelEncoder
-        X_df = df.iloc[:, :-1].copy()
-        for col in X_df.columns:
-            if X_df[col].dtype in ("object", "string"):
-                le = LabelEncoder()
-                X_df[col] = le.fit_transform(X_df[col].astype(str))
-        X = X_df.values.astype(float)
-        y = df.iloc[:, -1].values
-        try:
-            y = pd.to_numeric(y)
-        except:
-            le = LabelEncoder()
-            y = le.fit_transform(y.astype(str))
-        unique_values = len(np.unique(y))
-        num_classes = unique_values if unique_values < 20 else 1
-        print(f"Loaded '{dataset_title}' from Supabase — shape: {X.shape}, classes: {num_classes}")
-        return X, y, num_classes
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError("load_supabase_dataset blocks; call it from the data prep executor")
+    try:
+        # runs in a worker thread; the async client belongs to the event loop
+        return asyncio.run_coroutine_threadsafe(supabase_loader.load(dataset_id), event_loop).result()
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error loading dataset: {str(e)}")
 
+def dataset_version(dataset_id: str) -> str:
+    stored_version = dataset_store.version(dataset_id)
+    if stored_version is not None:
+        return stored_version
+    if dataset_id in ("iris", "boston"):
+        return "builtin"
+    return f"remote-{int(time.time() // DATASET_REMOTE_TTL_SECONDS)}"
+
+def is_streaming(X) -> bool:
+    return isinstance(X, np.memmap) and X.nbytes > STREAMING_THRESHOLD_BYTES
+
+def one_hot(y, num_classes: int) -> np.ndarray:
+    # same result as keras.utils.to_categorical, without importing TensorFlow
+    return np.eye(num_classes)[np.asarray(y, dtype=int).ravel()]
+
 def prepare_data(X, y, train_test_split: float):
+    if is_streaming(X):
+        return pipeline.prepare_streaming_data(X, y, train_test_split)
     from sklearn.model_selection import train_test_split as sklearn_split
     from sklearn.preprocessing import StandardScaler
     scaler = StandardScaler()
@@ -218,6 +483,92 @@ def prepare_data(X, y, train_test_split: float):
     X_train, X_test, y_train, y_test = sklearn_split(X_scaled, y, test_size=1 - train_test_split, random_state=42)
     return X_train, X_test, y_train, y_test, scaler
 
+def dataset_metadata(dataset_id: str) -> Dict[str, Any]:
+    if dataset_id in dataset_store:
+        return dataset_store.metadata(dataset_id)
+    if supabase_loader:
+        return supabase_loader.metadata(dataset_id)
+    return {}
+
+def build_preprocessing(dataset_id: str, scaler, num_classes: int) -> Dict[str, Any]:
+    meta = dataset_metadata(dataset_id)
+    columns = meta.get("columns") or []
+    label_encodings = meta.get("label_encodings", {})
+    target_column = columns[-1] if columns else None
+    return {
+        "scaler": scaler,
+        "feature_columns": columns[:-1],
+        "label_encodings": {c: v for c, v in label_encodings.items() if c != target_column},
+        "class_names": label_encodings.get(target_column) if num_classes > 1 else None,
+        "num_classes": num_classes,
+    }
+
+def prepared_dataset_key(dataset_id: str, train_test_split: float, data_preprocessing: Optional[str]) -> str:
+    return dataset_cache.key(dataset_id, dataset_version(dataset_id), train_test_split, data_preprocessing or "none")
+
+def load_prepared_dataset(dataset_id: str, train_test_split: float, data_preprocessing: Optional[str]):
+    key = prepared_dataset_key(dataset_id, train_test_split, data_preprocessing)
+
+    def build():
+        X, y, num_classes = load_dataset(dataset_id)
+        streaming = is_streaming(X)
+        X_train, X_test, y_train, y_test, scaler = prepare_data(X, y, train_test_split)
+        if streaming:
+            X_train.num_classes = X_test.num_classes = num_classes
+        elif num_classes > 1:
+            y_train = one_hot(y_train, num_classes)
+            y_test = one_hot(y_test, num_classes)
+        preprocessing = build_preprocessing(dataset_id, scaler, num_classes)
+        return X_train, X_test, y_train, y_test, preprocessing, num_classes
+
+    return dataset_cache.get_or_create(key, build)
+
+TF_STARTUP = os.getenv("TF_STARTUP", "background")
+WARMUP_MODEL = os.getenv("WARMUP_MODEL", "1").lower() in ("1", "true", "yes")
+
+def warm_up_model() -> Dict[str, float]:
+    # one small fit/predict pays TensorFlow's first-use costs (kernel registration, graph
+    # tracing machinery, thread pools) before the first real session does
+    from sklearn.preprocessing import StandardScaler
+    timings = {}
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(256, 8)).astype(np.float32)
+    y = keras.utils.to_categorical(rng.integers(0, 3, 256), 3)
+
+    start = time.perf_counter()
+    model = modeling.build_model(8, 3, 2, 32, "relu", "l2", 0.001)
+    modeling.compile_model(model, 3, "adam", 0.01)
+    get_model_summary(model)
+    timings["build_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    model.fit(pipeline.make_dataset(X, y, 32, shuffle=True), epochs=1, verbose=0,
+              validation_data=pipeline.make_dataset(X, y, 32, shuffle=False))
+    timings["fit_seconds"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    inference_model = inference.build_inference_model(model, StandardScaler().fit(X))
+    inference_model.predict(X[:32], verbose=0)
+    timings["predict_seconds"] = round(time.perf_counter() - start, 3)
+    return timings
+
+model_runtime = ModelRuntime(
+    ["tensorflow", "sklearn.preprocessing", "sklearn.model_selection", "pipeline", "modeling",
+     "inference", "explain", "surgery", "templates"],
+    warmup=warm_up_model if WARMUP_MODEL else None
+)
+startup_timings: Dict[str, float] = {}
+
+@app.on_event("startup")
+async def start_model_runtime():
+    if TF_STARTUP == "eager":
+        await asyncio.get_running_loop().run_in_executor(None, model_runtime.start, "eager")
+    else:
+        model_runtime.start(TF_STARTUP)
+    startup_timings["main_import_seconds"] = MAIN_IMPORT_SECONDS
+    startup_timings["serving_after_seconds"] = round(time.perf_counter() - MAIN_IMPORT_STARTED, 3)
+    print(f"Serving after {startup_timings['serving_after_seconds']}s (TensorFlow: {TF_STARTUP})")
+
 @app.get("/")
 async def root():
     return {"message": "NeuraSect Backend API is running", "version": "1.0.0", "status": "healthy"}
@@ -226,85 +577,140 @@ async def root():
 async def health_check():
     return {
         "status": "healthy",
-        "tensorflow_version": tf.__version__,
+        "ready": model_runtime.ready,
+        "tensorflow_version": loaded_version("tensorflow"),
         "active_sessions": len(training_sessions),
+        "training_workers": training_scheduler.max_workers,
+        "memory": training_sessions.stats(),
+        "dataset_cache": dataset_cache.stats(),
+        "graph_cache": graph_cache.stats(),
+        "explain_cache": attribution_engine.stats() if attribution_engine.loaded else None,
+        "model_templates": template_cache.stats() if template_cache.loaded else None,
+        "supabase": supabase_loader.stats() if supabase_loader else None,
+        "registry": session_registry.stats(),
+        "startup": {**startup_timings, "runtime": model_runtime.stats()},
         "timestamp": datetime.now().isoformat()
     }
 
+@app.get("/api/ready")
+async def readiness_check():
+    # 503 until TensorFlow is loaded and warmed up, for orchestrator readiness probes
+    if not model_runtime.ready:
+        raise HTTPException(status_code=503, detail=f"Model runtime is {model_runtime.state}")
+    return {"ready": True, "runtime": model_runtime.stats()}
+
+@app.get("/api/upload/datasets")
+async def list_uploaded_datasets():
+    return {"datasets": dataset_store.list()}
+
+@app.get("/api/upload/{dataset_id}/progress")
+async def get_upload_progress(dataset_id: str):
+    if dataset_id not in upload_progress:
+        raise HTTPException(status_code=404, detail="No upload in progress for this dataset")
+    return {"dataset_id": dataset_id, **upload_progress[dataset_id]}
+
 @app.post("/api/upload/dataset")
 async def upload_dataset(file: UploadFile = File(...)):
+    dataset_id = progress = None
     try:
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")
         
-        contents = await file.read()
-        
-        encodings = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252', 'ascii']
-        df = None
-        used_encoding = None
-        
-        for encoding in encodings:
-            try:
-                df = pd.read_csv(io.StringIO(contents.decode(encoding)))
-                used_encoding = encoding
-                break
-            except (UnicodeDecodeError, UnicodeError):
-                continue
-        
-        if df is None:
-            raise HTTPException(status_code=400, detail="Could not decode CSV file. Try saving with UTF-8 encoding.")
-        
-        if df.shape[1] < 2:
-            raise HTTPException(status_code=400, detail="Dataset must have at least 2 columns (features + target)")
-        
         dataset_id = file.filename.rsplit('.', 1)[0]
+        progress = upload_progress[dataset_id] = {
+            "stage": "receiving", "bytes_received": 0, "bytes_parsed": 0, "rows": 0, "total_bytes": None
+        }
+        session_registry.claim(f"upload:{dataset_id}", "upload")
+        started = time.perf_counter()
 
-        X_df = df.iloc[:, :-1].copy()
-        y = df.iloc[:, -1].values
+        upload = await spool_upload(file, on_progress=lambda n: progress.update(bytes_received=n))
+        try:
+            progress.update(stage="parsing", total_bytes=upload.size)
+            encoding = detect_encoding(upload.sample())
 
-        from sklearn.preprocessing import LabelEncoder
-        for col in X_df.columns:
-            if X_df[col].dtype in ("object", "string"):
-                le = LabelEncoder()
-                X_df[col] = le.fit_transform(X_df[col].astype(str))
+            def on_parse_progress(bytes_parsed: int, rows: int):
+                progress.update(bytes_parsed=bytes_parsed, rows=rows)
 
-        try:
-            X = X_df.values.astype(float)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=f"Could not convert features to numbers: {str(e)}")
-        
-        try:
-            y = pd.to_numeric(y)
-        except:
-            print(f"   Converting target column to numeric...")
-            le = LabelEncoder()
-            y = le.fit_transform(y.astype(str))
+            loop = asyncio.get_event_loop()
+            X, y, info = await loop.run_in_executor(
+                None, lambda: parse_csv(upload, encoding, UPLOAD_CHUNK_ROWS, on_parse_progress)
+            )
+        except pd.errors.EmptyDataError:
+            raise HTTPException(status_code=400, detail="CSV file is empty")
+        finally:
+            upload.remove()
 
-        uploaded_datasets[dataset_id] = (X, y)
-        
         num_classes = len(np.unique(y))
+        progress.update(stage="saving")
+        await run_blocking(dataset_store.save, dataset_id, X, y, {
+            "columns": info["columns"],
+            "label_encodings": info["label_encodings"],
+            "encoding": info["encoding"],
+            "num_unique": num_classes,
+            "num_classes": num_classes if num_classes < 20 else 1,
+        })
+        finish_upload_progress(dataset_id, progress, stage="done", bytes_parsed=upload.size, rows=int(X.shape[0]))
         
         return {
             "dataset_id": dataset_id,
             "message": f"Dataset uploaded successfully",
             "shape": list(X.shape),
-            "num_classes": num_classes
+            "num_classes": num_classes,
+            "encoding": info["encoding"],
+            "bytes": upload.size,
+            "seconds": round(time.perf_counter() - started, 3)
         }
-    except HTTPException:
+    except HTTPException as e:
+        if progress is not None:
+            finish_upload_progress(dataset_id, progress, stage="error", error=e.detail)
         raise
     except Exception as e:
         print(f"Error processing dataset: {str(e)}")
+        if progress is not None:
+            finish_upload_progress(dataset_id, progress, stage="error", error=str(e))
         raise HTTPException(status_code=500, detail=f"Error processing dataset: {str(e)}")
 
-@app.post("/api/train/start", response_model=TrainingResponse)
-async def start_training(config: TrainingConfig):
-    try:
-        X, y, num_classes = load_dataset(config.dataset_id)
-        X_train, X_test, y_train, y_test, scaler = prepare_data(X, y, config.train_test_split)
-        if num_classes > 1:
-            y_train = keras.utils.to_categorical(y_train, num_classes)
-            y_test = keras.utils.to_categorical(y_test, num_classes)
-        model = build_model(
+def finish_upload_progress(dataset_id: str, progress: Dict[str, Any], **fields):
+    # keep the final stage around long enough for a poller to see it, then drop it
+    progress.update(**fields)
+
+    def expire():
+        if upload_progress.get(dataset_id) is progress:
+            del upload_progress[dataset_id]
+
+    asyncio.get_running_loop().call_later(UPLOAD_PROGRESS_TTL_SECONDS, expire)
+
+def model_engine(engine: Optional[str]):
+    # numpy_engine mirrors the build_model / compile_model / CancellationCallback API of modeling
+    return numpy_engine if engine == "numpy" else modeling
+
+def build_inference_model(engine: Optional[str], model, scaler):
+    if engine == "numpy":
+        return numpy_engine.build_inference_model(model, scaler)
+    return inference.build_inference_model(model, scaler)
+
+def select_engine(config: TrainingConfig, X_train, num_classes: int) -> str:
+    model_type = (config.model_type or "").lower()
+    if model_type in ("keras", "tensorflow"):
+        return "keras"
+    supported = isinstance(X_train, np.ndarray) and config.activation in numpy_engine.ACTIVATIONS
+    if model_type == "numpy":
+        if not supported:
+            raise HTTPException(status_code=400, detail="The NumPy engine needs an in-memory dataset and a supported activation")
+        return "numpy"
+    if not supported or len(X_train) > NUMPY_ENGINE_MAX_ROWS:
+        return "keras"
+    params = numpy_engine.count_params(X_train.shape[1], num_classes, config.num_layers, config.num_neurons, config.regularizer)
+    return "numpy" if params <= NUMPY_ENGINE_MAX_PARAMS else "keras"
+
+def create_session(config: TrainingConfig):
+    X_train, X_test, y_train, y_test, preprocessing, num_classes = load_prepared_dataset(
+        config.dataset_id, config.train_test_split, config.data_preprocessing
+    )
+    engine = select_engine(config, X_train, num_classes)
+
+    def build():
+        return model_engine(engine).build_model(
             input_shape=X_train.shape[1],
             output_shape=num_classes,
             num_layers=config.num_layers,
@@ -313,28 +719,56 @@ async def start_training(config: TrainingConfig):
             regularizer=config.regularizer,
             regularization_rate=config.regularization_rate
         )
-        optimizer = get_optimizer(config.optimizer, config.learning_rate)
-        if num_classes == 1:
-            model.compile(optimizer=optimizer, loss="mse", metrics=["mae"])
-        else:
-            model.compile(optimizer=optimizer, loss="categorical_crossentropy", metrics=["accuracy"])
+
+    if engine == "numpy":
+        # building a NumPy network is cheaper than a template lookup
+        key, source = None, "built"
+        model = numpy_engine.compile_model(build(), num_classes, config.optimizer, config.learning_rate)
+        model_summary = get_model_summary(model)
+    else:
+        key = templates.template_key(X_train.shape[1], num_classes, config)
+        model, model_summary, source = template_cache.acquire(
+            key,
+            build,
+            lambda m: modeling.compile_model(m, num_classes, config.optimizer, config.learning_rate),
+            get_model_summary,
+            config.learning_rate
+        )
+    session = {
+        "model": model,
+        "engine": engine,
+        "inference_model": build_inference_model(engine, model, preprocessing["scaler"]),
+        "preprocessing": preprocessing,
+        "X_train": X_train, "X_test": X_test,
+        "y_train": y_train, "y_test": y_test,
+        "config": config,
+        "status": "initialized",
+        "history": [],
+        "num_classes": num_classes,
+        "input_dim": X_train.shape[1],
+        "cancel_event": threading.Event(),
+        "template_key": key,
+        "model_source": source,
+        "model_version": next(model_versions),
+    }
+    return session, model_summary
+
+@app.post("/api/train/start", response_model=TrainingResponse)
+async def start_training(config: TrainingConfig):
+    try:
+        session, model_summary = await run_blocking(create_session, config)
+        num_classes = session["num_classes"]
 
         session_id = f"session_{len(training_sessions)}_{datetime.now().timestamp()}"
-        training_sessions[session_id] = {
-            "model": model,
-            "X_train": X_train, "X_test": X_test,
-            "y_train": y_train, "y_test": y_test,
-            "config": config,
-            "status": "initialized",
-            "history": [],
-            "num_classes": num_classes,
-        }
+        training_sessions[session_id] = session
+        session_registry.claim(session_id, "session")
         return TrainingResponse(
             session_id=session_id,
             message="Training session initialized successfully",
-            model_summary=get_model_summary(model),
-            input_shape=list(X_train.shape),
-            output_shape=[num_classes] if num_classes > 1 else [1]
+            model_summary=model_summary,
+            input_shape=list(session["X_train"].shape),
+            output_shape=[num_classes] if num_classes > 1 else [1],
+            engine=session["engine"]
         )
     except Exception as e:
         import traceback
@@ -351,26 +785,74 @@ async def training_websocket(websocket: WebSocket, session_id: str):
         await websocket.close()
         return
 
+    if training_scheduler.position(session_id) is not None:
+        await websocket.send_json({"error": "Session is already training"})
+        await websocket.close()
+        return
+
+    if training_sessions[session_id].get("changing"):
+        await websocket.send_json({"error": "The network is being changed; connect again when it is done"})
+        await websocket.close()
+        return
+
     active_connections[session_id] = websocket
     session = training_sessions[session_id]
+    job = None
+    watcher = None
 
     try:
-        await websocket.send_json({
-            "type": "training_started",
-            "message": "Training started",
-            "epochs": session["config"].epochs
-        })
-
-        epoch_queue: asyncio.Queue = asyncio.Queue()
+        options = ProgressOptions.from_query(websocket.query_params, PROGRESS_MAX_RATE)
+        epoch_queue = ProgressStream(options, max_pending=PROGRESS_MAX_PENDING)
+        batch_throttle = BatchThrottle(options)
+        weight_encoder = weight_encoder_from_query(websocket.query_params)
 
         loop = asyncio.get_event_loop()
 
-        class QueueCallback(keras.callbacks.Callback):
+        def publish(update: Dict[str, Any]):
+            try:
+                loop.call_soon_threadsafe(epoch_queue.put, update)
+            except RuntimeError:
+                pass
+
+        async def send(update: Dict[str, Any]):
+            if update.get("type") == "weights_frame":
+                await websocket.send_bytes(update["frame"])
+                return
+            payload = epoch_queue.encode(update)
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+
+        engine = session.get("engine", "keras")
+        callback_base = numpy_engine.Callback if engine == "numpy" else keras.callbacks.Callback
+
+        class QueueCallback(callback_base):
+            def on_train_begin(self, logs=None):
+                self.started = time.perf_counter()
+
+            def on_epoch_begin(self, epoch, logs=None):
+                self.epoch = epoch
+
+            def on_train_batch_end(self, batch, logs=None):
+                if not batch_throttle.ready(batch):
+                    return
+                logs = logs or {}
+                publish({
+                    "type": "batch_update",
+                    "epoch": self.epoch + 1,
+                    "batch": batch + 1,
+                    "batches": self.params.get("steps"),
+                    "loss": float(logs.get("loss", 0)),
+                })
+
             def on_epoch_end(self, epoch, logs=None):
                 logs = logs or {}
                 update = {
                     "type": "epoch_update",
                     "epoch": epoch + 1,
+                    # server-side clock: updates may be coalesced, so arrival times don't give epoch times
+                    "elapsed": round(time.perf_counter() - self.started, 4),
                     "loss": float(logs.get("loss", 0)),
                     "val_loss": float(logs.get("val_loss", 0)) if "val_loss" in logs else None,
                 }
@@ -380,40 +862,122 @@ async def training_websocket(websocket: WebSocket, session_id: str):
                 else:
                     update["mae"] = float(logs.get("mae", 0))
                     update["val_mae"] = float(logs.get("val_mae", 0)) if "val_mae" in logs else None
-                loop.call_soon_threadsafe(epoch_queue.put_nowait, update)
+                publish(update)
+                if weight_encoder is not None and weight_encoder.due(epoch):
+                    self.last_streamed = epoch
+                    publish({"type": "weights_frame", "frame": weight_encoder.encode(flatten_weights(self.model), epoch + 1)})
+
+            def on_train_end(self, logs=None):
+                epoch = getattr(self, "epoch", 0)
+                if weight_encoder is not None and getattr(self, "last_streamed", None) != epoch:
+                    publish({"type": "weights_frame", "frame": weight_encoder.encode(flatten_weights(self.model), epoch + 1)})
 
         def run_training():
+            cancel_event = session["cancel_event"]
+            if cancel_event.is_set():
+                return
+            bump_model_version(session)
+            session["status"] = "training"
+            resume = session.pop("resume", None)
+            initial_epoch = resume["initial_epoch"] if resume else 0
+            epochs = resume["target_epochs"] if resume else session["config"].epochs
             try:
-                history = session["model"].fit(
-                    session["X_train"], session["y_train"],
-                    validation_data=(session["X_test"], session["y_test"]),
-                    epochs=session["config"].epochs,
-                    batch_size=session["config"].batch_size,
-                    callbacks=[QueueCallback()],
-                    verbose=0
+                batch_size = session["config"].batch_size
+                callbacks = [QueueCallback(), model_engine(engine).CancellationCallback(cancel_event)]
+                checkpoint = checkpoint_store.callback(
+                    session_id, session["config"].checkpoint_every or CHECKPOINT_EVERY, session
                 )
-                session["history"] = history.history
+                if checkpoint is not None:
+                    callbacks.append(checkpoint)
+                if engine == "numpy":
+                    history = session["model"].fit(
+                        session["X_train"], session["y_train"],
+                        batch_size=batch_size,
+                        validation_data=(session["X_test"], session["y_test"]),
+                        initial_epoch=initial_epoch,
+                        epochs=epochs,
+                        shuffle=True,
+                        callbacks=callbacks,
+                        verbose=0
+                    )
+                else:
+                    train_data = pipeline.make_dataset(session["X_train"], session["y_train"], batch_size, shuffle=True)
+                    val_data = pipeline.make_dataset(session["X_test"], session["y_test"], batch_size, shuffle=False)
+                    history = session["model"].fit(
+                        train_data,
+                        validation_data=val_data,
+                        initial_epoch=initial_epoch,
+                        epochs=epochs,
+                        shuffle=False,
+                        callbacks=callbacks,
+                        verbose=0
+                    )
+                session["history"] = merge_history(session["history"], history.history) if resume else history.history
+                if cancel_event.is_set():
+                    session["status"] = "cancelled"
+                    publish({"type": "TRAINING_CANCELLED", "history": history.history})
+                    return
                 session["status"] = "completed"
-                loop.call_soon_threadsafe(
-                    epoch_queue.put_nowait,
-                    {"type": "TRAINING_COMPLETE", "history": history.history}
-                )
+                try:
+                    checkpoint_store.export(session_id, session)
+                except Exception as e:
+                    print(f"Export failed for {session_id}: {e}")
+                publish({"type": "TRAINING_COMPLETE", "history": history.history})
             except Exception as e:
-                loop.call_soon_threadsafe(
-                    epoch_queue.put_nowait,
-                    {"type": "TRAINING_ERROR", "error": str(e)}
-                )
                 session["status"] = "error"
+                publish({"type": "TRAINING_ERROR", "error": str(e)})
+
+        def on_queue_position(position: int):
+            publish({"type": "queue_position", "position": position})
+
+        def on_removed():
+            # cancelled (or evicted) while still queued: run_training never runs to report it
+            session["status"] = "cancelled"
+            publish({"type": "TRAINING_CANCELLED", "history": {}})
+
+        async def watch_client():
+            try:
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        break
+                    if not message.get("text"):
+                        continue
+                    try:
+                        command = json.loads(message["text"])
+                    except ValueError:
+                        continue
+                    if isinstance(command, dict) and command.get("action") == "cancel":
+                        cancel_training(session_id)
+            except Exception:
+                pass
+            if session["status"] in ("queued", "training"):
+                cancel_training(session_id)
+                epoch_queue.put({"type": "CLIENT_DISCONNECTED"})
 
-        training_thread = threading.Thread(target=run_training, daemon=True)
-        training_thread.start()
+        session["cancel_event"].clear()
+        session["status"] = "queued"
+        # read before submit: the worker pops session["resume"] as soon as it starts
+        target_epochs = session["resume"]["target_epochs"] if "resume" in session else session["config"].epochs
+        job = training_scheduler.submit(session_id, run_training, on_position=on_queue_position, on_removed=on_removed)
+
+        await send({
+            "type": "training_started",
+            "message": "Training started" if job.status == "running" else "Training queued",
+            "epochs": target_epochs,
+            "queue_position": training_scheduler.position(session_id),
+            "progress": options.to_dict()
+        })
+        if weight_encoder is not None:
+            await send(weight_manifest(session["model"]))
+        watcher = asyncio.create_task(watch_client())
 
         while True:
             update = await epoch_queue.get()
 
             if update.get("type") == "TRAINING_COMPLETE":
                 history = update.get("history", {})
-                await websocket.send_json({
+                await send({
                     "type": "training_complete",
                     "message": "Training completed successfully",
                     "final_metrics": {
@@ -424,15 +988,26 @@ async def training_websocket(websocket: WebSocket, session_id: str):
                     }
                 })
                 break
+            elif update.get("type") == "TRAINING_CANCELLED":
+                await send({
+                    "type": "training_cancelled",
+                    "message": "Training cancelled",
+                    "epochs_completed": len(update.get("history", {}).get("loss", []))
+                })
+                break
+            elif update.get("type") == "CLIENT_DISCONNECTED":
+                print(f"WebSocket disconnected for session {session_id}")
+                break
             elif update.get("type") == "TRAINING_ERROR":
-                await websocket.send_json({"type": "error", "message": update.get("error")})
+                await send({"type": "error", "message": update.get("error")})
                 break
             else:
-                await websocket.send_json(update)
+                await send(update)
 
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for session {session_id}")
-        session["status"] = "cancelled"
+        if job is not None:
+            cancel_training(session_id)
     except Exception as e:
         print(f"WebSocket error: {e}")
         try:
@@ -440,35 +1015,441 @@ async def training_websocket(websocket: WebSocket, session_id: str):
         except:
             pass
     finally:
+        if watcher is not None:
+            watcher.cancel()
         active_connections.pop(session_id, None)
         try:
             await websocket.close()
         except:
             pass
 
+@app.get("/api/train/queue")
+async def get_training_queue():
+    return training_scheduler.snapshot()
+
 @app.get("/api/train/{session_id}/status")
 async def get_training_status(session_id: str):
+    session = await get_session(session_id)
+    return {
+        "session_id": session_id,
+        "status": session["status"],
+        "engine": session.get("engine", "keras"),
+        "history": session["history"],
+        "queue_position": training_scheduler.position(session_id)
+    }
+
+@app.post("/api/train/{session_id}/cancel")
+async def cancel_session(session_id: str):
     if session_id not in training_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
-    session = training_sessions[session_id]
-    return {"session_id": session_id, "status": session["status"], "history": session["history"]}
+    cancel_training(session_id)
+    return {"session_id": session_id, "status": training_sessions[session_id]["status"]}
 
 @app.post("/api/train/{session_id}/predict")
-async def predict(session_id: str, data: List[List[float]]):
-    if session_id not in training_sessions:
-        raise HTTPException(status_code=404, detail="Session not found")
-    session = training_sessions[session_id]
+async def predict(session_id: str, request: Request):
+    session = await get_session(session_id)
     if session["status"] != "completed":
         raise HTTPException(status_code=400, detail="Model is not trained yet")
+    body = await request.body()
     try:
-        predictions = session["model"].predict(np.array(data))
-        return {"predictions": predictions.tolist()}
+        if request.headers.get("content-type", "").startswith("application/octet-stream"):
+            data = inference.decode_npy(body)
+        else:
+            data = encode_inputs(json.loads(body), session["preprocessing"], session["input_dim"])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse input: {str(e)}")
+    input_dim = session["input_dim"]
+    if data.ndim != 2 or data.shape[1] != input_dim:
+        raise HTTPException(status_code=400, detail=f"Expected input of shape (n, {input_dim}), got {list(data.shape)}")
+    try:
+        if session.get("engine") == "numpy":
+            # a NumPy forward pass is cheap enough that micro-batching would only add latency
+            loop = asyncio.get_event_loop()
+            predictions = await loop.run_in_executor(None, session["inference_model"].predict, data.astype(np.float32))
+        else:
+            predictions = await inference_engine.predict(
+                session_id, session["inference_model"], data.astype(np.float32), input_dim
+            )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    if "application/octet-stream" in request.headers.get("accept", ""):
+        return Response(content=inference.encode_npy(predictions), media_type="application/octet-stream")
+    result = {"predictions": predictions.tolist()}
+    if session["num_classes"] > 1:
+        classes = predictions.argmax(axis=1)
+        result["classes"] = classes.tolist()
+        class_names = session["preprocessing"].get("class_names")
+        if class_names:
+            result["labels"] = [class_names[i] for i in classes]
+    return result
+
+def encode_inputs(rows, preprocessing: Dict[str, Any], input_dim: int) -> np.ndarray:
+    # categorical columns take the original strings; numbers are still read as codes
+    if not (isinstance(rows, list) and rows and all(isinstance(row, list) and len(row) == input_dim for row in rows)):
+        raise HTTPException(status_code=400, detail=f"Expected a list of rows with {input_dim} values each")
+    if not all(isinstance(v, (int, float, str)) for row in rows for v in row):
+        raise HTTPException(status_code=400, detail="Input values must be numbers or category names")
+    try:
+        if not any(isinstance(v, str) for row in rows for v in row):
+            return np.array(rows, dtype=np.float32)
+        columns = preprocessing.get("feature_columns") or []
+        encodings = preprocessing.get("label_encodings") or {}
+        lookups = {j: {v: i for i, v in enumerate(encodings[c])} for j, c in enumerate(columns) if c in encodings}
+        data = np.empty((len(rows), input_dim), dtype=np.float32)
+        for i, row in enumerate(rows):
+            for j, value in enumerate(row):
+                if isinstance(value, str) and j in lookups:
+                    if value not in lookups[j]:
+                        raise ValueError(f"unknown category '{value}' for column '{columns[j]}'")
+                    data[i, j] = lookups[j][value]
+                else:
+                    data[i, j] = float(value)
+        return data
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not parse input: {str(e)}")
+
+def trained_epochs(session: Dict[str, Any]) -> int:
+    history = session["history"] or {}
+    return len(history.get("loss", []))
+
+def merge_history(previous, new: Dict[str, List[float]]) -> Dict[str, List[float]]:
+    merged = {k: list(v) for k, v in (previous or {}).items()}
+    for key, values in new.items():
+        merged.setdefault(key, []).extend(values)
+    return merged
+
+def model_version(session: Dict[str, Any]) -> str:
+    return str(session.get("model_version", 0))
+
+def bump_model_version(session: Dict[str, Any]):
+    # drawn from a process-wide counter, so a number is never reused: not after retraining
+    # from scratch, and not when a freed model's id() comes back
+    session["model_version"] = next(model_versions)
+
+@app.get("/api/train/{session_id}/graph")
+async def get_graph_layout(session_id: str, top_k: Optional[int] = GRAPH_TOP_K, threshold: Optional[float] = None,
+                           per: str = "source", width: float = 960, height: float = 500):
+    session = await get_session(session_id)
+    options = LayoutOptions(top_k=top_k, threshold=threshold, per=per, width=width, height=height)
+    # weights are still moving while training, so only finished models are cached
+    cacheable = session["status"] not in ("queued", "training")
+    key = (session_id, model_version(session), options.key())
+    layout = graph_cache.get(key) if cacheable else None
+    if layout is None:
+        loop = asyncio.get_event_loop()
+        try:
+            layout = await loop.run_in_executor(None, build_layout, session["model"], options)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if cacheable:
+            graph_cache.put(key, layout)
+    return {"session_id": session_id, "status": session["status"], **layout}
+
+@app.post("/api/train/{session_id}/explain")
+async def explain(session_id: str, request: ExplainRequest):
+    session = await get_session(session_id)
+    if session["status"] != "completed":
+        raise HTTPException(status_code=400, detail="Model is not trained yet")
+    input_dim = session["input_dim"]
+    x = encode_inputs(request.inputs, session["preprocessing"], input_dim)
+    steps = request.steps if request.steps is not None else 50
+    if steps < 1 or steps > EXPLAIN_MAX_STEPS:
+        raise HTTPException(status_code=400, detail=f"steps must be between 1 and {EXPLAIN_MAX_STEPS}")
+
+    # attributions are taken on raw features, so the default baseline is the training mean
+    scaler = session["preprocessing"]["scaler"]
+    if request.baseline in (None, "mean"):
+        baseline = np.asarray(scaler.mean_, dtype=np.float32)
+    elif request.baseline == "zeros":
+        baseline = np.zeros(input_dim, dtype=np.float32)
+    else:
+        try:
+            baseline = np.asarray(request.baseline, dtype=np.float32)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="baseline must be 'mean', 'zeros' or a list of feature values")
+    try:
+        baseline = np.broadcast_to(baseline, x.shape).astype(np.float32)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"baseline must have {input_dim} features or match the inputs")
+
+    num_outputs = max(1, session["num_classes"])
+    if request.target in (None, "predicted"):
+        target = None if num_outputs > 1 else np.zeros(len(x), dtype=np.int32)
+    else:
+        try:
+            target = np.broadcast_to(np.asarray(request.target, dtype=np.int32), (len(x),)).copy()
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="target must be 'predicted', a class index or one index per input")
+        if target.min() < 0 or target.max() >= num_outputs:
+            raise HTTPException(status_code=400, detail=f"target must be between 0 and {num_outputs - 1}")
+
+    loop = asyncio.get_event_loop()
+    try:
+        result = await loop.run_in_executor(
+            None, attribution_engine.explain, session_id, model_version(session),
+            session["inference_model"], x, baseline, target, steps
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    result["feature_names"] = session["preprocessing"].get("feature_columns") or None
+    class_names = session["preprocessing"].get("class_names")
+    if class_names and num_outputs > 1:
+        result["labels"] = [class_names[i] for i in result["targets"]]
+    return {"session_id": session_id, **result}
+
+def keras_copy(session: Dict[str, Any]):
+    # same layer order and weight layout as numpy_engine.build_model
+    config = session["config"]
+    model = modeling.build_model(
+        session["input_dim"], session["num_classes"], config.num_layers, config.num_neurons,
+        config.activation, config.regularizer, config.regularization_rate
+    )
+    model.set_weights(session["model"].get_weights())
+    return model
+
+def grow_network(session: Dict[str, Any], request: GrowRequest):
+    old_model = session["model"]
+    if session.get("engine") == "numpy":
+        # surgery works on Keras layers, so a grown NumPy session continues on Keras
+        old_model = keras_copy(session)
+    if request.operation == "widen":
+        model = surgery.widen_dense(old_model, request.layer, request.neurons or 1, noise=request.noise or 0.0)
+    elif request.operation == "deepen":
+        model = surgery.insert_dense(old_model, request.layer, request.neurons, request.activation)
+    else:
+        raise ValueError("operation must be 'widen' or 'deepen'")
+
+    config = session["config"]
+    modeling.compile_model(model, session["num_classes"], config.optimizer, config.learning_rate)
+    # the model sees scaled features, so a standard normal batch is representative
+    sample = np.random.default_rng(0).standard_normal((256, session["input_dim"])).astype(np.float32)
+    output_change = float(np.abs(model(sample, training=False).numpy() - old_model(sample, training=False).numpy()).max())
+    inference_model = build_inference_model("keras", model, session["preprocessing"]["scaler"])
+    return model, old_model, output_change, inference_model, get_model_summary(model)
+
+def claim_for_change(session: Dict[str, Any]):
+    # grow and resume yield the loop while they build, so two of them must not overlap on a session
+    if session["status"] in ("queued", "training"):
+        raise HTTPException(status_code=409, detail="Cannot change the network while it is training")
+    if session.get("changing"):
+        raise HTTPException(status_code=409, detail="The network is already being changed")
+    session["changing"] = True
+
+@app.post("/api/train/{session_id}/grow")
+async def grow_model(session_id: str, request: GrowRequest):
+    session = await get_session(session_id)
+    claim_for_change(session)
+    try:
+        try:
+            model, old_model, output_change, inference_model, model_summary = await run_blocking(
+                grow_network, session, request
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        session["model"] = model
+        session["engine"] = "keras"
+        bump_model_version(session)
+        if session.get("template_key") is not None:
+            # the old network still has the cached architecture, so the next start can reuse it
+            template_cache.release(session["template_key"], old_model)
+        session["template_key"] = None
+        session["inference_model"] = inference_model
+        if session["status"] == "completed":
+            try:
+                await run_blocking(checkpoint_store.export, session_id, session)
+            except Exception as e:
+                print(f"Export failed for {session_id}: {e}")
+    finally:
+        session["changing"] = False
+    return {
+        "session_id": session_id,
+        "layers": layer_sizes(model),
+        "max_output_change": output_change,
+        "model_summary": model_summary,
+    }
+
+@app.post("/api/train/{session_id}/resume")
+async def resume_training(session_id: str, request: ResumeRequest):
+    session = await get_session(session_id)
+    if session["status"] in ("queued", "training"):
+        raise HTTPException(status_code=409, detail="Session is already training")
+    if request.epochs < 1:
+        raise HTTPException(status_code=400, detail="epochs must be at least 1")
+    if request.batch_size is not None and request.batch_size < 1:
+        raise HTTPException(status_code=400, detail="batch_size must be at least 1")
+    claim_for_change(session)
+    try:
+        return await prepare_resume(session_id, session, request)
+    finally:
+        session["changing"] = False
+
+async def prepare_resume(session_id: str, session: Dict[str, Any], request: ResumeRequest):
+    config = session["config"]
+    if "X_train" not in session:
+        # sessions restored from disk only carry the model, so reload the (cached) split
+        X_train, X_test, y_train, y_test, _, _ = await run_blocking(
+            load_prepared_dataset, config.dataset_id, config.train_test_split, config.data_preprocessing
+        )
+        session.update(X_train=X_train, X_test=X_test, y_train=y_train, y_test=y_test)
+
+    model = session["model"]
+    learning_rate = request.learning_rate if request.learning_rate is not None else config.learning_rate
+    optimizer_name = (request.optimizer or config.optimizer).lower()
+    if model.optimizer is None or optimizer_name != config.optimizer.lower():
+        await run_blocking(
+            model_engine(session.get("engine")).compile_model, model, session["num_classes"], optimizer_name, learning_rate
+        )
+        optimizer_state = "reset"
+        session["template_key"] = None
+    else:
+        # same optimizer: keep its moments and step count, only change the rate
+        model.optimizer.learning_rate = learning_rate
+        optimizer_state = "kept"
+
+    session["config"] = config.model_copy(update={
+        "learning_rate": learning_rate,
+        "optimizer": optimizer_name,
+        "batch_size": request.batch_size or config.batch_size,
+    })
+    initial_epoch = trained_epochs(session)
+    bump_model_version(session)
+    session["resume"] = {
+        "initial_epoch": initial_epoch,
+        "epochs": request.epochs,
+        "target_epochs": initial_epoch + request.epochs,
+    }
+    return {
+        "session_id": session_id,
+        "message": "Session ready to resume; connect to the training WebSocket to continue",
+        "initial_epoch": initial_epoch,
+        "target_epochs": initial_epoch + request.epochs,
+        "learning_rate": learning_rate,
+        "optimizer": optimizer_name,
+        "optimizer_state": optimizer_state,
+    }
 
 @app.delete("/api/train/{session_id}")
 async def delete_session(session_id: str):
+    exported = checkpoint_store.delete(session_id)
     if session_id not in training_sessions:
+        if exported:
+            return {"message": f"Session {session_id} deleted successfully"}
         raise HTTPException(status_code=404, detail="Session not found")
+    cancel_training(session_id)
     del training_sessions[session_id]
-    return {"message": f"Session {session_id} deleted successfully"}
\ No newline at end of file
+    return {"message": f"Session {session_id} deleted successfully"}
+
+@app.post("/api/sweep")
+async def start_sweep(request: SweepRequest):
+    base = request.base
+    if request.strategy not in ("halving", "none"):
+        raise HTTPException(status_code=400, detail="strategy must be 'halving' or 'none'")
+    try:
+        trials = expand_space(request.space, request.search, request.n_trials, request.seed, SWEEP_MAX_TRIALS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    epochs = base.epochs or 100
+    if request.strategy == "halving":
+        rungs = halving_rungs(request.min_epochs or 1, epochs, request.reduction_factor or 3)
+    else:
+        rungs = [epochs]
+
+    X_train, X_test, y_train, y_test, preprocessing, num_classes = await run_blocking(
+        load_prepared_dataset, base.dataset_id, base.train_test_split, base.data_preprocessing
+    )
+    if isinstance(X_train, pipeline.StreamingSplit):
+        raise HTTPException(status_code=400, detail="Dataset is too large to sweep over")
+    sweep_id = f"sweep_{len(sweeps)}_{datetime.now().timestamp()}"
+    try:
+        sweep = Sweep(
+            sweep_id, base.model_dump(), trials, num_classes, os.path.join(SWEEP_DIR, sweep_id),
+            metric=request.metric or "val_loss", rungs=rungs,
+            reduction_factor=request.reduction_factor or 3, patience=request.early_stopping_patience
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = prepared_dataset_key(base.dataset_id, base.train_test_split, base.data_preprocessing)
+    data_dir = os.path.join(SWEEP_DIR, "data", key)
+    sweep_data_users[data_dir] = sweep_data_users.get(data_dir, 0) + 1
+    loop = asyncio.get_event_loop()
+    try:
+        await loop.run_in_executor(None, export_arrays, data_dir, (X_train, X_test, y_train, y_test))
+    except Exception as e:
+        await release_sweep_data(data_dir)
+        raise HTTPException(status_code=500, detail=f"Could not share dataset with sweep workers: {str(e)}")
+
+    sweeps[sweep_id] = sweep
+    session_registry.claim(sweep_id, "sweep")
+    asyncio.create_task(run_sweep(sweep, data_dir))
+    return {"sweep_id": sweep_id, "trials": len(trials), "rungs": rungs, "metric": sweep.metric, "mode": sweep.mode}
+
+@app.get("/api/sweep")
+async def list_sweeps():
+    return {"sweeps": [sweep.summary() for sweep in sweeps.values()]}
+
+@app.get("/api/sweep/{sweep_id}")
+async def get_sweep(sweep_id: str):
+    if sweep_id not in sweeps:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    return sweeps[sweep_id].snapshot()
+
+@app.post("/api/sweep/{sweep_id}/cancel")
+async def cancel_sweep(sweep_id: str):
+    if sweep_id not in sweeps:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    sweeps[sweep_id].cancel()
+    return {"sweep_id": sweep_id, "status": sweeps[sweep_id].status}
+
+@app.delete("/api/sweep/{sweep_id}")
+async def delete_sweep(sweep_id: str):
+    sweep = sweeps.pop(sweep_id, None)
+    if sweep is None:
+        raise HTTPException(status_code=404, detail="Sweep not found")
+    sweep.delete()
+    session_registry.release(sweep_id)
+    return {"message": f"Sweep {sweep_id} deleted successfully"}
+
+@app.websocket("/ws/sweep/{sweep_id}")
+async def sweep_websocket(websocket: WebSocket, sweep_id: str):
+    await websocket.accept()
+
+    sweep = sweeps.get(sweep_id)
+    if sweep is None:
+        await websocket.send_json({"error": "Invalid sweep ID"})
+        await websocket.close()
+        return
+
+    stream = ProgressStream(ProgressOptions.from_query(websocket.query_params, PROGRESS_MAX_RATE), max_pending=PROGRESS_MAX_PENDING)
+
+    async def send(update: Dict[str, Any]):
+        payload = stream.encode(update)
+        if isinstance(payload, bytes):
+            await websocket.send_bytes(payload)
+        else:
+            await websocket.send_text(payload)
+
+    sweep.subscribe(stream.put)
+    try:
+        if sweep.finished:
+            await send({"type": "sweep_complete", **sweep.snapshot()})
+            return
+        await send({"type": "sweep_leaderboard", **sweep.snapshot()})
+        while True:
+            update = await stream.get()
+            await send(update)
+            if update.get("type") == "sweep_complete":
+                break
+    except WebSocketDisconnect:
+        print(f"Sweep WebSocket disconnected for {sweep_id}")
+    except Exception as e:
+        print(f"Sweep WebSocket error: {e}")
+    finally:
+        sweep.unsubscribe(stream.put)
+        try:
+            await websocket.close()
+        except:
+            pass
+
+MAIN_IMPORT_SECONDS = round(time.perf_counter() - MAIN_IMPORT_STARTED, 3)
@@ -3,6 +3,8 @@ from tensorflow.keras import Sequential, layers, models
 import numpy as np
 from typing import Optional, List
 
+from surgery import resize_dense, widen_dense, insert_dense
+
 
 class MLP:
     
@@ -11,6 +13,7 @@ class MLP:
         self.model = Sequential()
         self._has_input = False
         self._layers = [] 
+        self._compile_args = None
         
     def __repr__(self):
         return f"MLP(input_dim={self.input_dim}, layers={len(self._layers)})"
@@ -42,26 +45,40 @@ class MLP:
     def rebuild_with_new_layer(self, layer_index: int, neurons: int, activation: str = "relu"):
         if layer_index >= len(self._layers):
             raise ValueError(f"Layer index {layer_index} out of range")
+        if layer_index == len(self._layers) - 1 and neurons != self._layers[layer_index]['neurons']:
+            raise ValueError("Cannot resize the output layer")
         
+        if layer_index < len(self._layers) - 1:
+            self.model = resize_dense(self.model, layer_index, neurons, activation=activation)
+        else:
+            self.model.layers[-1].activation = tf.keras.activations.get(activation)
         self._layers[layer_index]['neurons'] = neurons
         self._layers[layer_index]['activation'] = activation
-        
-        old_weights = self.get_weights() if self._has_input else None
-        self.model = Sequential()
-        self._has_input = False
-        
-        for i, layer_config in enumerate(self._layers):
-            self.add_layer(
-                layer_config['neurons'],
-                layer_config['activation'],
-                **layer_config['kwargs']
-            )
-        
-        if old_weights:
-            try:
-                self.set_weights(old_weights)
-            except:
-                print("Warning: Could not restore all weights after layer modification")
+        self._recompile()
+    
+    def widen_layer(self, layer_index: int, neurons: int = 1, noise: float = 0.0):
+        self.model = widen_dense(self.model, layer_index, neurons, noise=noise)
+        self._layers[layer_index]['neurons'] += neurons
+        self._recompile()
+    
+    def insert_layer(self, after_index: int, neurons: Optional[int] = None, activation: Optional[str] = None):
+        self.model = insert_dense(self.model, after_index, neurons, activation)
+        source = self._layers[after_index]
+        self._layers.insert(after_index + 1, {
+            'neurons': neurons or source['neurons'],
+            'activation': activation or source['activation'],
+            'kwargs': source['kwargs']
+        })
+        self._recompile()
+    
+    def _recompile(self):
+        if self._compile_args is None:
+            return
+        optimizer, loss, metrics = self._compile_args
+        if not isinstance(optimizer, str):
+            # optimizer slots are shaped like the old weights, so start a fresh one with the same settings
+            optimizer = optimizer.__class__.from_config(optimizer.get_config())
+        self.compile(optimizer, loss, metrics)
     
     def get_weights(self):
         if self._has_input:
@@ -73,6 +90,7 @@ class MLP:
             self.model.set_weights(weights)
     
     def compile(self, optimizer="adam", loss="mse", metrics=None):
+        self._compile_args = (optimizer, loss, metrics)
         self.model.compile(optimizer=optimizer, loss=loss, metrics=metrics or [])
     
     def fit(self, X, y, **kwargs):
@@ -151,4 +169,7 @@ if __name__ == "__main__":
         dropout_rate=0.2
     )
     
-    mlp2.summary()
\ No newline at end of file
+    mlp2.summary()
+    mlp.widen_layer(0, neurons=4)
+    mlp.insert_layer(1)
+    mlp.summary()
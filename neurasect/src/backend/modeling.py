@@ -0,0 +1,73 @@
+from tensorflow import keras
+
+
+def get_optimizer(optimizer_name: str, learning_rate: float):
+    optimizers_map = {
+        "adam": keras.optimizers.Adam(learning_rate=learning_rate),
+        "sgd": keras.optimizers.SGD(learning_rate=learning_rate),
+        "rmsprop": keras.optimizers.RMSprop(learning_rate=learning_rate),
+        "adagrad": keras.optimizers.Adagrad(learning_rate=learning_rate),
+        "adamw": keras.optimizers.AdamW(learning_rate=learning_rate)
+    }
+    return optimizers_map.get(optimizer_name.lower(), keras.optimizers.Adam(learning_rate=learning_rate))
+
+
+def get_regularizer(regularizer_name: str, rate: float):
+    if regularizer_name == "l1":
+        return keras.regularizers.l1(rate)
+    elif regularizer_name == "l2":
+        return keras.regularizers.l2(rate)
+    elif regularizer_name == "l1_l2":
+        return keras.regularizers.l1_l2(l1=rate, l2=rate)
+    return None
+
+
+def build_model(input_shape, output_shape, num_layers, num_neurons, activation, regularizer, regularization_rate):
+    model = keras.Sequential()
+    kernel_reg = get_regularizer(regularizer, regularization_rate) if regularizer not in ["none", "dropout", "batch_norm"] else None
+
+    model.add(keras.layers.Input(shape=(input_shape,)))
+    model.add(keras.layers.Dense(num_neurons, activation=activation, kernel_regularizer=kernel_reg))
+    if regularizer == "dropout":
+        model.add(keras.layers.Dropout(regularization_rate))
+    elif regularizer == "batch_norm":
+        model.add(keras.layers.BatchNormalization())
+
+    for i in range(num_layers - 1):
+        model.add(keras.layers.Dense(num_neurons, activation=activation, kernel_regularizer=kernel_reg))
+        if regularizer == "dropout":
+            model.add(keras.layers.Dropout(regularization_rate))
+        elif regularizer == "batch_norm":
+            model.add(keras.layers.BatchNormalization())
+
+    if output_shape == 1:
+        model.add(keras.layers.Dense(1))
+    else:
+        model.add(keras.layers.Dense(output_shape, activation="softmax"))
+
+    return model
+
+
+def compile_model(model, num_classes: int, optimizer_name: str, learning_rate: float):
+    optimizer = get_optimizer(optimizer_name, learning_rate)
+    if num_classes == 1:
+        model.compile(optimizer=optimizer, loss="mse", metrics=["mae"])
+    else:
+        model.compile(optimizer=optimizer, loss="categorical_crossentropy", metrics=["accuracy"])
+    return model
+
+
+class CancellationCallback(keras.callbacks.Callback):
+    def __init__(self, cancel_event):
+        super().__init__()
+        self.cancel_event = cancel_event
+
+    def _check(self):
+        if self.cancel_event.is_set():
+            self.model.stop_training = True
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._check()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._check()
@@ -0,0 +1,711 @@
+import io
+import json
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+# Small dense networks trained with plain NumPy: same layers, initializers, optimizer update
+# rules and loss/metric definitions as the Keras models in modeling.py, without TensorFlow
+ENGINE = "numpy"
+ACTIVATIONS = ("relu", "sigmoid", "tanh", "softmax", "leaky_relu", "elu", "linear")
+EPSILON = 1e-7
+
+
+def _activate(name: str, z: np.ndarray) -> np.ndarray:
+    if name == "relu":
+        return np.maximum(z, 0)
+    if name == "sigmoid":
+        return 1 / (1 + np.exp(-z))
+    if name == "tanh":
+        return np.tanh(z)
+    if name == "softmax":
+        e = np.exp(z - z.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+    if name == "leaky_relu":
+        return np.where(z > 0, z, 0.2 * z)
+    if name == "elu":
+        return np.where(z > 0, z, np.expm1(np.minimum(z, 0)))
+    return z
+
+
+def _activation_grad(name: str, grad: np.ndarray, z: np.ndarray, out: np.ndarray) -> np.ndarray:
+    if name == "relu":
+        return grad * (z > 0)
+    if name == "sigmoid":
+        return grad * out * (1 - out)
+    if name == "tanh":
+        return grad * (1 - out * out)
+    if name == "softmax":
+        return out * (grad - (grad * out).sum(axis=1, keepdims=True))
+    if name == "leaky_relu":
+        return np.where(z > 0, grad, 0.2 * grad)
+    if name == "elu":
+        return np.where(z > 0, grad, grad * (out + 1))
+    return grad
+
+
+class Dense:
+
+    def __init__(self, units: int, activation: Optional[str] = None, kernel_regularizer: Optional[Tuple[float, float]] = None,
+                 name: str = "dense"):
+        if (activation or "linear") not in ACTIVATIONS:
+            raise ValueError(f"Activation '{activation}' is not supported by the NumPy engine")
+        self.units = units
+        self.activation = activation or "linear"
+        self.kernel_regularizer = kernel_regularizer
+        self.name = name
+        self.kernel: Optional[np.ndarray] = None
+        self.bias: Optional[np.ndarray] = None
+
+    def __repr__(self):
+        return f"Dense(units={self.units}, activation={self.activation!r}, name={self.name!r})"
+
+    def build(self, input_dim: int, rng: np.random.Generator):
+        # glorot_uniform kernel and zero bias, as keras.layers.Dense
+        limit = np.sqrt(6 / (input_dim + self.units))
+        self.kernel = rng.uniform(-limit, limit, (input_dim, self.units)).astype(np.float32)
+        self.bias = np.zeros(self.units, dtype=np.float32)
+        return self.units
+
+    @property
+    def weights(self) -> List[np.ndarray]:
+        return [self.kernel, self.bias]
+
+    @property
+    def trainable_weights(self) -> List[np.ndarray]:
+        return [self.kernel, self.bias]
+
+    def forward(self, x: np.ndarray, training: bool, rng):
+        z = x @ self.kernel + self.bias
+        out = _activate(self.activation, z)
+        return out, (x, z, out)
+
+    def backward(self, grad: np.ndarray, cache, from_logits: bool = False):
+        x, z, out = cache
+        dz = grad if from_logits else _activation_grad(self.activation, grad, z, out)
+        dkernel = x.T @ dz
+        if self.kernel_regularizer is not None:
+            l1, l2 = self.kernel_regularizer
+            if l1:
+                dkernel += l1 * np.sign(self.kernel)
+            if l2:
+                dkernel += 2 * l2 * self.kernel
+        return dz @ self.kernel.T, [dkernel, dz.sum(axis=0)]
+
+    def regularization_loss(self) -> float:
+        if self.kernel_regularizer is None:
+            return 0.0
+        l1, l2 = self.kernel_regularizer
+        return float(l1 * np.abs(self.kernel).sum() + l2 * np.square(self.kernel).sum())
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"class_name": "Dense", "units": self.units, "activation": self.activation,
+                "kernel_regularizer": self.kernel_regularizer, "name": self.name}
+
+
+class Dropout:
+
+    def __init__(self, rate: float, name: str = "dropout"):
+        self.rate = rate
+        self.name = name
+
+    def __repr__(self):
+        return f"Dropout(rate={self.rate}, name={self.name!r})"
+
+    def build(self, input_dim: int, rng: np.random.Generator):
+        return input_dim
+
+    @property
+    def weights(self) -> List[np.ndarray]:
+        return []
+
+    @property
+    def trainable_weights(self) -> List[np.ndarray]:
+        return []
+
+    def forward(self, x: np.ndarray, training: bool, rng):
+        if not training or self.rate <= 0:
+            return x, None
+        mask = (rng.random(x.shape, dtype=np.float32) >= self.rate) / np.float32(1 - self.rate)
+        return x * mask, mask
+
+    def backward(self, grad: np.ndarray, mask, from_logits: bool = False):
+        return (grad if mask is None else grad * mask), []
+
+    def regularization_loss(self) -> float:
+        return 0.0
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"class_name": "Dropout", "rate": self.rate, "name": self.name}
+
+
+class BatchNormalization:
+
+    def __init__(self, momentum: float = 0.99, epsilon: float = 1e-3, name: str = "batch_normalization"):
+        self.momentum = momentum
+        self.epsilon = epsilon
+        self.name = name
+
+    def __repr__(self):
+        return f"BatchNormalization(name={self.name!r})"
+
+    def build(self, input_dim: int, rng: np.random.Generator):
+        self.gamma = np.ones(input_dim, dtype=np.float32)
+        self.beta = np.zeros(input_dim, dtype=np.float32)
+        self.moving_mean = np.zeros(input_dim, dtype=np.float32)
+        self.moving_variance = np.ones(input_dim, dtype=np.float32)
+        return input_dim
+
+    @property
+    def weights(self) -> List[np.ndarray]:
+        return [self.gamma, self.beta, self.moving_mean, self.moving_variance]
+
+    @property
+    def trainable_weights(self) -> List[np.ndarray]:
+        return [self.gamma, self.beta]
+
+    def forward(self, x: np.ndarray, training: bool, rng):
+        if not training:
+            return (x - self.moving_mean) / np.sqrt(self.moving_variance + self.epsilon) * self.gamma + self.beta, None
+        mean = x.mean(axis=0)
+        variance = x.var(axis=0)
+        self.moving_mean *= self.momentum
+        self.moving_mean += (1 - self.momentum) * mean
+        self.moving_variance *= self.momentum
+        self.moving_variance += (1 - self.momentum) * variance
+        inv = 1 / np.sqrt(variance + self.epsilon)
+        normalized = (x - mean) * inv
+        return normalized * self.gamma + self.beta, (normalized, inv)
+
+    def backward(self, grad: np.ndarray, cache, from_logits: bool = False):
+        normalized, inv = cache
+        dnormalized = grad * self.gamma
+        dx = inv * (dnormalized - dnormalized.mean(axis=0) - normalized * (dnormalized * normalized).mean(axis=0))
+        return dx, [(grad * normalized).sum(axis=0), grad.sum(axis=0)]
+
+    def regularization_loss(self) -> float:
+        return 0.0
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"class_name": "BatchNormalization", "momentum": self.momentum, "epsilon": self.epsilon, "name": self.name}
+
+
+LAYERS = {"Dense": Dense, "Dropout": Dropout, "BatchNormalization": BatchNormalization}
+
+
+class Optimizer:
+    # update rules and defaults follow keras.optimizers, with the slots kept as plain arrays
+
+    def __init__(self, learning_rate: float = 0.001):
+        self.learning_rate = learning_rate
+        self.iterations = 0
+        self._slots: Optional[List[List[np.ndarray]]] = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(learning_rate={self.learning_rate}, iterations={self.iterations})"
+
+    @property
+    def name(self) -> str:
+        return type(self).__name__.lower()
+
+    @property
+    def built(self) -> bool:
+        return self._slots is not None
+
+    @property
+    def variables(self) -> List[np.ndarray]:
+        return [slot for slots in self._slots or [] for slot in slots]
+
+    def slots(self, param: np.ndarray) -> List[np.ndarray]:
+        return []
+
+    def apply(self, params: List[np.ndarray], grads: List[np.ndarray]):
+        if self._slots is None:
+            self._slots = [self.slots(p) for p in params]
+        self.iterations += 1
+        lr = np.float32(self.learning_rate)
+        for param, grad, slots in zip(params, grads, self._slots):
+            self.update(param, grad, slots, lr)
+
+    def update(self, param: np.ndarray, grad: np.ndarray, slots: List[np.ndarray], lr):
+        param -= lr * grad
+
+    def reset(self):
+        self._slots = None
+        self.iterations = 0
+
+    def get_state(self) -> Tuple[Dict[str, Any], List[np.ndarray]]:
+        return {"name": self.name, "learning_rate": float(self.learning_rate), "iterations": self.iterations}, self.variables
+
+    def set_state(self, iterations: int, variables: List[np.ndarray], params: List[np.ndarray]):
+        if not variables:
+            return
+        per_param = len(variables) // len(params)
+        self._slots = [list(variables[i * per_param:(i + 1) * per_param]) for i in range(len(params))]
+        self.iterations = iterations
+
+
+class SGD(Optimizer):
+    pass
+
+
+class Adam(Optimizer):
+
+    def __init__(self, learning_rate: float = 0.001, beta_1: float = 0.9, beta_2: float = 0.999):
+        super().__init__(learning_rate)
+        self.beta_1 = beta_1
+        self.beta_2 = beta_2
+
+    def slots(self, param: np.ndarray) -> List[np.ndarray]:
+        return [np.zeros_like(param), np.zeros_like(param)]
+
+    def apply(self, params: List[np.ndarray], grads: List[np.ndarray]):
+        # bias correction folded into the step size, as Keras does
+        step = self.iterations + 1
+        self._alpha = np.float32(self.learning_rate * np.sqrt(1 - self.beta_2 ** step) / (1 - self.beta_1 ** step))
+        super().apply(params, grads)
+
+    def update(self, param, grad, slots, lr):
+        m, v = slots
+        m += (grad - m) * (1 - self.beta_1)
+        v += (grad * grad - v) * (1 - self.beta_2)
+        param -= self._alpha * m / (np.sqrt(v) + EPSILON)
+
+
+class AdamW(Adam):
+
+    def __init__(self, learning_rate: float = 0.001, weight_decay: float = 0.004):
+        super().__init__(learning_rate)
+        self.weight_decay = weight_decay
+
+    def update(self, param, grad, slots, lr):
+        param -= param * np.float32(self.weight_decay) * lr
+        super().update(param, grad, slots, lr)
+
+
+class RMSprop(Optimizer):
+
+    def __init__(self, learning_rate: float = 0.001, rho: float = 0.9):
+        super().__init__(learning_rate)
+        self.rho = rho
+
+    def slots(self, param: np.ndarray) -> List[np.ndarray]:
+        return [np.zeros_like(param)]
+
+    def update(self, param, grad, slots, lr):
+        velocity, = slots
+        velocity *= self.rho
+        velocity += (1 - self.rho) * grad * grad
+        param -= lr * grad / np.sqrt(velocity + EPSILON)
+
+
+class Adagrad(Optimizer):
+
+    def __init__(self, learning_rate: float = 0.001, initial_accumulator_value: float = 0.1):
+        super().__init__(learning_rate)
+        self.initial_accumulator_value = initial_accumulator_value
+
+    def slots(self, param: np.ndarray) -> List[np.ndarray]:
+        return [np.full_like(param, self.initial_accumulator_value)]
+
+    def update(self, param, grad, slots, lr):
+        accumulator, = slots
+        accumulator += grad * grad
+        param -= lr * grad / np.sqrt(accumulator + EPSILON)
+
+
+OPTIMIZERS = {"adam": Adam, "sgd": SGD, "rmsprop": RMSprop, "adagrad": Adagrad, "adamw": AdamW}
+
+
+def get_optimizer(optimizer_name: str, learning_rate: float) -> Optimizer:
+    return OPTIMIZERS.get(optimizer_name.lower(), Adam)(learning_rate=learning_rate)
+
+
+def get_regularizer(regularizer_name: str, rate: float) -> Optional[Tuple[float, float]]:
+    # (l1, l2) factors, matching keras.regularizers.l1 / l2 / l1_l2
+    if regularizer_name == "l1":
+        return (rate, 0.0)
+    elif regularizer_name == "l2":
+        return (0.0, rate)
+    elif regularizer_name == "l1_l2":
+        return (rate, rate)
+    return None
+
+
+class Callback:
+    # the subset of keras.callbacks.Callback that Sequential.fit calls
+
+    def __init__(self):
+        self.model = None
+        self.params: Dict[str, Any] = {}
+
+    def set_model(self, model):
+        self.model = model
+
+    def set_params(self, params: Dict[str, Any]):
+        self.params = params
+
+    def on_train_begin(self, logs=None):
+        pass
+
+    def on_epoch_begin(self, epoch, logs=None):
+        pass
+
+    def on_train_batch_end(self, batch, logs=None):
+        pass
+
+    def on_epoch_end(self, epoch, logs=None):
+        pass
+
+    def on_train_end(self, logs=None):
+        pass
+
+
+class CancellationCallback(Callback):
+    def __init__(self, cancel_event):
+        super().__init__()
+        self.cancel_event = cancel_event
+
+    def _check(self):
+        if self.cancel_event.is_set():
+            self.model.stop_training = True
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._check()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._check()
+
+
+class History:
+
+    def __init__(self):
+        self.epoch: List[int] = []
+        self.history: Dict[str, List[float]] = {}
+
+    def __repr__(self):
+        return f"History(epochs={len(self.epoch)})"
+
+    def record(self, epoch: int, logs: Dict[str, float]):
+        self.epoch.append(epoch)
+        for key, value in logs.items():
+            self.history.setdefault(key, []).append(value)
+
+
+class Sequential:
+    engine = ENGINE
+    file_extension = ".npz"
+
+    def __init__(self, input_dim: int, layers: List[Any], name: str = "sequential", seed: Optional[int] = None):
+        self.input_dim = input_dim
+        self.layers = layers
+        self.name = name
+        self.optimizer: Optional[Optimizer] = None
+        self.loss: Optional[str] = None
+        self.metric: Optional[str] = None
+        self.stop_training = False
+        self._rng = np.random.default_rng(seed)
+        self._output_units = []
+        units = input_dim
+        for layer in layers:
+            units = layer.build(units, self._rng)
+            self._output_units.append(units)
+        self.output_dim = units
+
+    def __repr__(self):
+        return f"Sequential(name={self.name!r}, layers={len(self.layers)}, params={self.count_params()})"
+
+    @property
+    def weights(self) -> List[np.ndarray]:
+        return [w for layer in self.layers for w in layer.weights]
+
+    @property
+    def trainable_weights(self) -> List[np.ndarray]:
+        return [w for layer in self.layers for w in layer.trainable_weights]
+
+    def get_weights(self) -> List[np.ndarray]:
+        return [w.copy() for w in self.weights]
+
+    def set_weights(self, weights: List[np.ndarray]):
+        current = self.weights
+        if len(weights) != len(current):
+            raise ValueError(f"Expected {len(current)} weight arrays, got {len(weights)}")
+        for target, value in zip(current, weights):
+            target[...] = np.asarray(value, dtype=target.dtype).reshape(target.shape)
+
+    def count_params(self) -> int:
+        return int(sum(w.size for w in self.weights))
+
+    def compile(self, optimizer: Optimizer, loss: str, metric: str):
+        self.optimizer = optimizer
+        self.loss = loss
+        self.metric = metric
+
+    def summary(self, print_fn=print):
+        rows = [("Layer (type)", "Output Shape", "Param #")]
+        for layer, units in zip(self.layers, self._output_units):
+            rows.append((f"{layer.name} ({type(layer).__name__})", f"(None, {units})", str(sum(w.size for w in layer.weights))))
+        widths = [max(len(row[i]) for row in rows) + 2 for i in range(3)]
+        trainable = sum(w.size for w in self.trainable_weights)
+        print_fn(f'Model: "{self.name}" (NumPy engine)')
+        print_fn("-" * sum(widths))
+        for i, row in enumerate(rows):
+            print_fn("".join(cell.ljust(width) for cell, width in zip(row, widths)))
+            if i == 0:
+                print_fn("=" * sum(widths))
+        print_fn("=" * sum(widths))
+        print_fn(f" Total params: {self.count_params()}")
+        print_fn(f" Trainable params: {trainable}")
+        print_fn(f" Non-trainable params: {self.count_params() - trainable}")
+
+    def _forward(self, x: np.ndarray, training: bool):
+        caches = []
+        for layer in self.layers:
+            x, cache = layer.forward(x, training, self._rng)
+            caches.append(cache)
+        return x, caches
+
+    def _backward(self, grad: np.ndarray, caches, from_logits: bool = False):
+        # returns the gradient w.r.t. the inputs and the parameter gradients in trainable_weights order
+        grads = []
+        last = len(self.layers) - 1
+        for i in range(last, -1, -1):
+            grad, layer_grads = self.layers[i].backward(grad, caches[i], from_logits=from_logits and i == last)
+            grads[:0] = layer_grads
+        return grad, grads
+
+    def __call__(self, x: np.ndarray, training: bool = False) -> np.ndarray:
+        return self._forward(np.asarray(x, dtype=np.float32), training)[0]
+
+    def predict(self, x: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        return self(x)
+
+    def input_gradients(self, x: np.ndarray, output_grad: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        out, caches = self._forward(np.asarray(x, dtype=np.float32), False)
+        grad, _ = self._backward(output_grad.astype(np.float32), caches)
+        return out, grad
+
+    def regularization_loss(self) -> float:
+        return sum(layer.regularization_loss() for layer in self.layers)
+
+    def _loss(self, out: np.ndarray, y: np.ndarray) -> Tuple[float, np.ndarray]:
+        # loss value and its gradient w.r.t. the logits (softmax + crossentropy) or the outputs (mse)
+        if self.loss == "categorical_crossentropy":
+            probs = np.clip(out, EPSILON, 1 - EPSILON)
+            return float(-(y * np.log(probs)).sum(axis=1).mean()), (out - y) / len(y)
+        diff = out - y
+        return float(np.mean(diff * diff)), 2 * diff / diff.size
+
+    def _metric(self, out: np.ndarray, y: np.ndarray) -> float:
+        if self.metric == "accuracy":
+            return float(np.mean(out.argmax(axis=1) == y.argmax(axis=1)))
+        return float(np.mean(np.abs(out - y)))
+
+    def _targets(self, y: np.ndarray) -> np.ndarray:
+        y = np.asarray(y, dtype=np.float32)
+        return y.reshape(-1, 1) if y.ndim == 1 else y
+
+    def evaluate(self, x: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+        out = self(x)
+        y = self._targets(y)
+        loss, _ = self._loss(out, y)
+        return {"loss": loss + self.regularization_loss(), self.metric: self._metric(out, y)}
+
+    def fit(self, x: np.ndarray, y: np.ndarray, batch_size: int = 32, epochs: int = 1, initial_epoch: int = 0,
+            validation_data=None, shuffle: bool = True, callbacks=None, verbose: int = 0) -> History:
+        if self.optimizer is None:
+            raise RuntimeError("Call compile_model() before fit()")
+        x = np.asarray(x, dtype=np.float32)
+        y = self._targets(y)
+        batch_size = batch_size or 32
+        steps = -(-len(x) // batch_size)
+        history = History()
+        callbacks = list(callbacks or [])
+        for callback in callbacks:
+            callback.set_model(self)
+            callback.set_params({"verbose": verbose, "epochs": epochs, "steps": steps})
+        # build_model ends classifiers in softmax, so crossentropy is differentiated w.r.t. the logits
+        from_logits = self.loss == "categorical_crossentropy"
+        params = self.trainable_weights
+
+        self.stop_training = False
+        for callback in callbacks:
+            callback.on_train_begin()
+        for epoch in range(initial_epoch, epochs):
+            for callback in callbacks:
+                callback.on_epoch_begin(epoch)
+            order = self._rng.permutation(len(x)) if shuffle else np.arange(len(x))
+            seen, loss_sum, metric_sum = 0, 0.0, 0.0
+            for step in range(steps):
+                idx = order[step * batch_size:(step + 1) * batch_size]
+                xb, yb = x[idx], y[idx]
+                out, caches = self._forward(xb, True)
+                loss, grad = self._loss(out, yb)
+                loss += self.regularization_loss()
+                _, grads = self._backward(grad, caches, from_logits=from_logits)
+                self.optimizer.apply(params, grads)
+                # running means over the epoch, like the Keras loss and metric trackers
+                seen += len(idx)
+                loss_sum += loss * len(idx)
+                metric_sum += self._metric(out, yb) * len(idx)
+                logs = {"loss": loss_sum / seen, self.metric: metric_sum / seen}
+                for callback in callbacks:
+                    callback.on_train_batch_end(step, logs)
+                if self.stop_training:
+                    break
+            logs = {"loss": loss_sum / max(seen, 1), self.metric: metric_sum / max(seen, 1)}
+            if validation_data is not None:
+                val = self.evaluate(*validation_data)
+                logs.update({f"val_{k}": v for k, v in val.items()})
+            history.record(epoch, logs)
+            for callback in callbacks:
+                callback.on_epoch_end(epoch, logs)
+            if self.stop_training:
+                break
+        for callback in callbacks:
+            callback.on_train_end(logs=None)
+        return history
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"name": self.name, "input_dim": self.input_dim, "layers": [layer.get_config() for layer in self.layers],
+                "loss": self.loss, "metric": self.metric}
+
+    def save(self, path: str):
+        config = self.get_config()
+        slots = []
+        if self.optimizer is not None:
+            config["optimizer"], slots = self.optimizer.get_state()
+        arrays = {f"weight_{i}": w for i, w in enumerate(self.weights)}
+        arrays.update({f"slot_{i}": s for i, s in enumerate(slots)})
+        buffer = io.BytesIO()
+        np.savez(buffer, config=np.array(json.dumps(config)), **arrays)
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+
+def load_model(path: str) -> Sequential:
+    with np.load(path, allow_pickle=False) as data:
+        config = json.loads(str(data["config"]))
+        weights = [data[f"weight_{i}"] for i in range(sum(1 for k in data.files if k.startswith("weight_")))]
+        slots = [data[f"slot_{i}"].copy() for i in range(sum(1 for k in data.files if k.startswith("slot_")))]
+    layers = []
+    for layer_config in config["layers"]:
+        layer_config = dict(layer_config)
+        layer_class = LAYERS[layer_config.pop("class_name")]
+        if layer_config.get("kernel_regularizer") is not None:
+            layer_config["kernel_regularizer"] = tuple(layer_config["kernel_regularizer"])
+        layers.append(layer_class(**layer_config))
+    model = Sequential(config["input_dim"], layers, name=config["name"])
+    model.set_weights(weights)
+    if config.get("optimizer"):
+        state = config["optimizer"]
+        optimizer = get_optimizer(state["name"], state["learning_rate"])
+        optimizer.set_state(state["iterations"], slots, model.trainable_weights)
+        model.compile(optimizer, config["loss"], config["metric"])
+    return model
+
+
+def build_model(input_shape, output_shape, num_layers, num_neurons, activation, regularizer, regularization_rate):
+    kernel_reg = get_regularizer(regularizer, regularization_rate) if regularizer not in ["none", "dropout", "batch_norm"] else None
+    layers = []
+    counts: Dict[str, int] = {}
+
+    def named(layer_class, *args, **kwargs):
+        base = {"Dense": "dense", "Dropout": "dropout", "BatchNormalization": "batch_normalization"}[layer_class.__name__]
+        index = counts.get(base, 0)
+        counts[base] = index + 1
+        return layer_class(*args, name=base if index == 0 else f"{base}_{index}", **kwargs)
+
+    for _ in range(num_layers):
+        layers.append(named(Dense, num_neurons, activation=activation, kernel_regularizer=kernel_reg))
+        if regularizer == "dropout":
+            layers.append(named(Dropout, regularization_rate))
+        elif regularizer == "batch_norm":
+            layers.append(named(BatchNormalization))
+
+    if output_shape == 1:
+        layers.append(named(Dense, 1))
+    else:
+        layers.append(named(Dense, output_shape, activation="softmax"))
+
+    return Sequential(input_shape, layers)
+
+
+def compile_model(model: Sequential, num_classes: int, optimizer_name: str, learning_rate: float):
+    optimizer = get_optimizer(optimizer_name, learning_rate)
+    if num_classes == 1:
+        model.compile(optimizer, "mse", "mae")
+    else:
+        model.compile(optimizer, "categorical_crossentropy", "accuracy")
+    return model
+
+
+def count_params(input_shape: int, output_shape: int, num_layers: int, num_neurons: int, regularizer: str) -> int:
+    hidden = input_shape * num_neurons + num_neurons + (num_layers - 1) * (num_neurons * num_neurons + num_neurons)
+    if regularizer == "batch_norm":
+        hidden += 4 * num_neurons * num_layers
+    return hidden + num_neurons * output_shape + output_shape
+
+
+class IntegratedGradients:
+    # NumPy counterpart of explain.IntegratedGradients for InferenceModel
+
+    def __init__(self, model, input_dim: int, max_rows: int = 8192):
+        self.model = model
+        self.input_dim = input_dim
+        self.max_rows = max_rows
+
+    def __repr__(self):
+        return f"IntegratedGradients(model={self.model.name!r}, input_dim={self.input_dim})"
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        return self.model.predict(x)
+
+    def attribute(self, x: np.ndarray, baseline: np.ndarray, targets: np.ndarray, steps: int = 50):
+        alphas = np.linspace(0.0, 1.0, steps + 1, dtype=np.float32)
+        chunk = max(1, self.max_rows // (steps + 1))
+        attributions, outputs, baseline_outputs = [], [], []
+        for start in range(0, len(x), chunk):
+            xs, base, rows = x[start:start + chunk], baseline[start:start + chunk], targets[start:start + chunk]
+            diff = xs - base
+            flat = (base[:, None, :] + alphas[None, :, None] * diff[:, None, :]).reshape(-1, self.input_dim)
+            flat_targets = np.repeat(rows, steps + 1)
+            seed = np.zeros((len(flat), self.model.output_dim), dtype=np.float32)
+            seed[np.arange(len(flat)), flat_targets] = 1
+            out, grads = self.model.input_gradients(flat, seed)
+            grads = grads.reshape(-1, steps + 1, self.input_dim)
+            selected = out[np.arange(len(flat)), flat_targets].reshape(-1, steps + 1)
+            # trapezoidal rule over the path
+            attributions.append(diff * ((grads[:, :-1] + grads[:, 1:]) / 2.0).mean(axis=1))
+            outputs.append(selected[:, -1])
+            baseline_outputs.append(selected[:, 0])
+        return np.concatenate(attributions), np.concatenate(outputs), np.concatenate(baseline_outputs)
+
+
+class InferenceModel:
+    # scaling folded in front of the network, like inference.build_inference_model
+    engine = ENGINE
+    explainer_class = IntegratedGradients
+
+    def __init__(self, model: Sequential, scaler):
+        self.model = model
+        self.mean = np.asarray(scaler.mean_, dtype=np.float32)
+        self.scale = np.asarray(scaler.scale_, dtype=np.float32)
+        self.name = f"{model.name}_inference"
+        self.output_dim = model.output_dim
+
+    def __repr__(self):
+        return f"InferenceModel(model={self.model.name!r})"
+
+    def predict(self, x: np.ndarray, batch_size: Optional[int] = None, verbose: int = 0) -> np.ndarray:
+        return self.model.predict((np.asarray(x, dtype=np.float32) - self.mean) / self.scale)
+
+    __call__ = predict
+
+    def input_gradients(self, x: np.ndarray, output_grad: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        out, grad = self.model.input_gradients((np.asarray(x, dtype=np.float32) - self.mean) / self.scale, output_grad)
+        return out, grad / self.scale
+
+
+def build_inference_model(model: Sequential, scaler) -> InferenceModel:
+    return InferenceModel(model, scaler)
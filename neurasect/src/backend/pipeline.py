@@ -0,0 +1,95 @@
+import weakref
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+SCALER_FIT_ROWS = 65536
+
+_tensor_datasets: Dict[int, Tuple[weakref.ref, np.ndarray, tf.data.Dataset]] = {}
+
+
+class StreamingSplit:
+
+    def __init__(self, X: np.ndarray, y: np.ndarray, indices: np.ndarray, scaler, num_classes: int = 1):
+        self.X = X
+        self.y = y
+        self.indices = indices
+        self.scaler = scaler
+        self.num_classes = num_classes
+
+    def __repr__(self):
+        return f"StreamingSplit(rows={len(self.indices)}, features={self.X.shape[1]}, classes={self.num_classes})"
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self.indices), self.X.shape[1])
+
+    def labels(self, idx: np.ndarray) -> np.ndarray:
+        y = np.asarray(self.y[idx])
+        if self.num_classes > 1:
+            return np.eye(self.num_classes, dtype=np.float32)[y.astype(np.int64)]
+        return y.astype(np.float32)
+
+    def features(self, idx: np.ndarray) -> np.ndarray:
+        return self.scaler.transform(np.asarray(self.X[idx])).astype(np.float32)
+
+    def batches(self, batch_size: int, shuffle: bool = True, seed: Optional[int] = None):
+        order = self.indices
+        if shuffle:
+            order = np.random.default_rng(seed).permutation(order)
+        for start in range(0, len(order), batch_size):
+            # sorted reads keep memory-mapped access sequential within a batch
+            idx = np.sort(order[start:start + batch_size])
+            yield self.features(idx), self.labels(idx)
+
+
+def prepare_streaming_data(X: np.ndarray, y: np.ndarray, train_test_split: float):
+    from sklearn.model_selection import train_test_split as sklearn_split
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler()
+    for start in range(0, X.shape[0], SCALER_FIT_ROWS):
+        scaler.partial_fit(np.asarray(X[start:start + SCALER_FIT_ROWS]))
+    train_idx, test_idx = sklearn_split(np.arange(X.shape[0]), test_size=1 - train_test_split, random_state=42)
+    X_train = StreamingSplit(X, y, np.sort(train_idx), scaler)
+    X_test = StreamingSplit(X, y, np.sort(test_idx), scaler)
+    return X_train, X_test, None, None, scaler
+
+
+def _tensor_dataset(X: np.ndarray, y: np.ndarray) -> tf.data.Dataset:
+    cached = _tensor_datasets.get(id(X))
+    if cached is not None and cached[0]() is X and cached[1] is y:
+        return cached[2]
+    dataset = tf.data.Dataset.from_tensor_slices((
+        np.asarray(X, dtype=np.float32),
+        np.asarray(y, dtype=np.float32)
+    ))
+    if not X.flags.writeable:
+        # read-only arrays come from the shared dataset cache, so their tensors can be shared too
+        _tensor_datasets[id(X)] = (weakref.ref(X), y, dataset)
+        weakref.finalize(X, _tensor_datasets.pop, id(X), None)
+    return dataset
+
+
+def make_dataset(X, y, batch_size: int, shuffle: bool = True, seed: Optional[int] = None) -> tf.data.Dataset:
+    if isinstance(X, StreamingSplit):
+        num_features = X.shape[1]
+        label_shape = (None, X.num_classes) if X.num_classes > 1 else (None,)
+        dataset = tf.data.Dataset.from_generator(
+            lambda: X.batches(batch_size, shuffle),
+            output_signature=(
+                tf.TensorSpec(shape=(None, num_features), dtype=tf.float32),
+                tf.TensorSpec(shape=label_shape, dtype=tf.float32),
+            )
+        )
+        num_batches = -(-len(X) // batch_size)
+        return dataset.apply(tf.data.experimental.assert_cardinality(num_batches)).prefetch(AUTOTUNE)
+
+    dataset = _tensor_dataset(X, y)
+    if shuffle:
+        dataset = dataset.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(AUTOTUNE)
@@ -0,0 +1,128 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+COALESCE_TYPES = ("epoch_update", "batch_update", "queue_position", "sweep_leaderboard")
+
+
+class ProgressOptions:
+
+    def __init__(self, granularity: str = "epoch", batch_every: int = 1,
+                 max_rate: float = 20.0, encoding: str = "json"):
+        self.granularity = granularity if granularity in ("epoch", "batch") else "epoch"
+        self.batch_every = max(1, batch_every)
+        self.max_rate = max_rate
+        self.encoding = encoding if encoding == "msgpack" and msgpack is not None else "json"
+
+    def __repr__(self):
+        return (f"ProgressOptions(granularity={self.granularity!r}, batch_every={self.batch_every}, "
+                f"max_rate={self.max_rate}, encoding={self.encoding!r})")
+
+    @classmethod
+    def from_query(cls, params, default_max_rate: float = 20.0) -> "ProgressOptions":
+        def number(name, default, cast):
+            try:
+                return cast(params.get(name, default))
+            except (TypeError, ValueError):
+                return default
+        return cls(
+            granularity=params.get("granularity", "epoch"),
+            batch_every=number("batch_every", 1, int),
+            max_rate=number("max_rate", default_max_rate, float),
+            encoding=params.get("encoding", "json"),
+        )
+
+    @property
+    def interval(self) -> float:
+        return 1.0 / self.max_rate if self.max_rate > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "granularity": self.granularity,
+            "batch_every": self.batch_every,
+            "max_rate": self.max_rate,
+            "encoding": self.encoding,
+        }
+
+
+class ProgressStream:
+
+    def __init__(self, options: ProgressOptions, max_pending: int = 256):
+        self.options = options
+        self.max_pending = max_pending
+        self._pending: deque = deque()
+        self._ready = asyncio.Event()
+        self._last_sent = 0.0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __repr__(self):
+        return f"ProgressStream(pending={len(self._pending)}, dropped={self.dropped}, coalesced={self.coalesced})"
+
+    def _coalesce_index(self, kind: str) -> Optional[int]:
+        for i in range(len(self._pending) - 1, -1, -1):
+            queued_kind = self._pending[i].get("type")
+            if queued_kind == kind:
+                return i
+            if queued_kind not in COALESCE_TYPES:
+                return None
+        return None
+
+    def put(self, update: Dict[str, Any]):
+        kind = update.get("type")
+        index = self._coalesce_index(kind) if kind in COALESCE_TYPES else None
+        if index is not None:
+            skipped = self._pending[index].get("coalesced", 0) + 1
+            del self._pending[index]
+            update = dict(update, coalesced=skipped)
+            self.coalesced += 1
+        elif len(self._pending) >= self.max_pending:
+            for i, queued in enumerate(self._pending):
+                if queued.get("type") in COALESCE_TYPES:
+                    del self._pending[i]
+                    self.dropped += 1
+                    break
+        self._pending.append(update)
+        self._ready.set()
+
+    async def get(self) -> Dict[str, Any]:
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+        if self._pending[0].get("type") in COALESCE_TYPES:
+            wait = self._last_sent + self.options.interval - time.monotonic()
+            if wait > 0:
+                # later updates of the same kind coalesce into the queued one while we wait
+                await asyncio.sleep(wait)
+        update = self._pending.popleft()
+        if update.get("type") in COALESCE_TYPES:
+            self._last_sent = time.monotonic()
+        return update
+
+    def encode(self, update: Dict[str, Any]):
+        if self.options.encoding == "msgpack":
+            return msgpack.packb(update, use_bin_type=True)
+        return json.dumps(update)
+
+
+class BatchThrottle:
+
+    def __init__(self, options: ProgressOptions):
+        self.options = options
+        self._last = 0.0
+
+    def ready(self, batch: int) -> bool:
+        if self.options.granularity != "batch" or (batch + 1) % self.options.batch_every:
+            return False
+        now = time.monotonic()
+        if now - self._last < self.options.interval:
+            return False
+        self._last = now
+        return True
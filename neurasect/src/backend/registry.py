@@ -0,0 +1,174 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+
+class SessionRegistry:
+    shared = False
+
+    def __init__(self, worker_id: str, heartbeat_ttl: float = 30.0):
+        self.worker_id = worker_id
+        self.heartbeat_ttl = heartbeat_ttl
+        self.address: Optional[str] = None
+        self._lock = threading.Lock()
+        self._workers: Dict[str, Dict[str, Any]] = {}
+        self._owners: Dict[str, Dict[str, Any]] = {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}(worker={self.worker_id!r}, owned={len(self.owned())})"
+
+    def register_worker(self, address: Optional[str] = None):
+        self.address = address
+        now = time.time()
+        with self._lock:
+            self._workers[self.worker_id] = {
+                "worker_id": self.worker_id, "address": address, "pid": os.getpid(),
+                "started_at": now, "heartbeat_at": now,
+            }
+
+    def heartbeat(self):
+        with self._lock:
+            if self.worker_id in self._workers:
+                self._workers[self.worker_id]["heartbeat_at"] = time.time()
+
+    def unregister_worker(self):
+        with self._lock:
+            self._workers.pop(self.worker_id, None)
+            for key in [k for k, v in self._owners.items() if v["worker_id"] == self.worker_id]:
+                del self._owners[key]
+
+    def claim(self, key: str, kind: str):
+        with self._lock:
+            self._owners[key] = {"key": key, "kind": kind, "worker_id": self.worker_id, "claimed_at": time.time()}
+
+    def release(self, key: str):
+        with self._lock:
+            owner = self._owners.get(key)
+            if owner is not None and owner["worker_id"] == self.worker_id:
+                del self._owners[key]
+
+    def _alive(self, heartbeat_at: Optional[float]) -> bool:
+        return heartbeat_at is not None and time.time() - heartbeat_at <= self.heartbeat_ttl
+
+    def owner(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            owner = self._owners.get(key)
+            if owner is None:
+                return None
+            worker = self._workers.get(owner["worker_id"], {})
+            return {
+                "worker_id": owner["worker_id"],
+                "address": worker.get("address"),
+                "alive": self._alive(worker.get("heartbeat_at")),
+            }
+
+    def owned(self) -> List[str]:
+        with self._lock:
+            return [k for k, v in self._owners.items() if v["worker_id"] == self.worker_id]
+
+    def workers(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            workers = [dict(w) for w in self._workers.values()]
+        for w in workers:
+            w["alive"] = self._alive(w["heartbeat_at"])
+        return workers
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "worker_id": self.worker_id,
+            "address": self.address,
+            "owned": len(self.owned()),
+            "workers": self.workers(),
+        }
+
+
+class SQLiteSessionRegistry(SessionRegistry):
+    shared = True
+
+    def __init__(self, path: str, worker_id: str, heartbeat_ttl: float = 30.0):
+        super().__init__(worker_id, heartbeat_ttl)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # one connection per process, shared by the event loop and worker threads under the lock
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS workers (worker_id TEXT PRIMARY KEY, address TEXT, pid INTEGER, "
+                "started_at REAL, heartbeat_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS owners (key TEXT PRIMARY KEY, kind TEXT, worker_id TEXT, claimed_at REAL)"
+            )
+
+    def __repr__(self):
+        return f"SQLiteSessionRegistry(path={self.path!r}, worker={self.worker_id!r})"
+
+    def _execute(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def register_worker(self, address: Optional[str] = None):
+        self.address = address
+        now = time.time()
+        self._execute(
+            "INSERT OR REPLACE INTO workers (worker_id, address, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?, ?)",
+            (self.worker_id, address, os.getpid(), now, now)
+        )
+        # forget workers that have been silent for a long time, and everything they owned
+        stale = time.time() - self.heartbeat_ttl * 10
+        self._execute("DELETE FROM owners WHERE worker_id IN (SELECT worker_id FROM workers WHERE heartbeat_at < ?)", (stale,))
+        self._execute("DELETE FROM workers WHERE heartbeat_at < ?", (stale,))
+
+    def heartbeat(self):
+        self._execute("UPDATE workers SET heartbeat_at = ? WHERE worker_id = ?", (time.time(), self.worker_id))
+
+    def unregister_worker(self):
+        self._execute("DELETE FROM owners WHERE worker_id = ?", (self.worker_id,))
+        self._execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+
+    def claim(self, key: str, kind: str):
+        self._execute(
+            "INSERT OR REPLACE INTO owners (key, kind, worker_id, claimed_at) VALUES (?, ?, ?, ?)",
+            (key, kind, self.worker_id, time.time())
+        )
+
+    def release(self, key: str):
+        self._execute("DELETE FROM owners WHERE key = ? AND worker_id = ?", (key, self.worker_id))
+
+    def owner(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._execute(
+            "SELECT o.worker_id, w.address, w.heartbeat_at FROM owners o "
+            "LEFT JOIN workers w ON w.worker_id = o.worker_id WHERE o.key = ?", (key,)
+        )
+        if not rows:
+            return None
+        worker_id, address, heartbeat_at = rows[0]
+        return {"worker_id": worker_id, "address": address, "alive": self._alive(heartbeat_at)}
+
+    def owned(self) -> List[str]:
+        return [row[0] for row in self._execute("SELECT key FROM owners WHERE worker_id = ?", (self.worker_id,))]
+
+    def workers(self) -> List[Dict[str, Any]]:
+        rows = self._execute("SELECT worker_id, address, pid, started_at, heartbeat_at FROM workers")
+        return [
+            {"worker_id": w, "address": a, "pid": p, "started_at": s, "heartbeat_at": h, "alive": self._alive(h)}
+            for w, a, p, s, h in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_registry(spec: str, worker_id: str, heartbeat_ttl: float = 30.0) -> SessionRegistry:
+    # "memory" keeps everything in this process; "sqlite:///path/to/file.db" is shared between workers
+    if not spec or spec == "memory":
+        return SessionRegistry(worker_id, heartbeat_ttl)
+    if spec.startswith("sqlite://"):
+        return SQLiteSessionRegistry(spec[len("sqlite://"):], worker_id, heartbeat_ttl)
+    raise ValueError(f"Unknown session registry '{spec}'; use 'memory' or 'sqlite:///path'")
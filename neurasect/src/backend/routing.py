@@ -0,0 +1,182 @@
+import asyncio
+import re
+import socket
+from typing import Optional, Tuple
+
+import httpx
+
+from registry import SessionRegistry
+
+FORWARDED_HEADER = "x-neurasect-forwarded"
+OWNER_HEADER = "x-neurasect-worker"
+
+# path -> registry key for everything that lives in one worker's memory
+OWNED_ROUTES = [
+    (re.compile(r"^/api/train/(session_[^/]+)"), "{}"),
+    (re.compile(r"^/ws/train/(session_[^/]+)"), "{}"),
+    (re.compile(r"^/api/sweep/(sweep_[^/]+)"), "{}"),
+    (re.compile(r"^/ws/sweep/(sweep_[^/]+)"), "{}"),
+    (re.compile(r"^/api/upload/([^/]+)/progress$"), "upload:{}"),
+]
+HOP_HEADERS = {"host", "connection", "keep-alive", "transfer-encoding", "upgrade", "content-length",
+               "proxy-connection", "te", "trailer"}
+
+
+def route_key(path: str) -> Optional[str]:
+    for pattern, key in OWNED_ROUTES:
+        match = pattern.match(path)
+        if match:
+            return key.format(match.group(1))
+    return None
+
+
+class SessionRouter:
+
+    def __init__(self, app, registry: SessionRegistry, timeout: float = 300.0):
+        self.app = app
+        self.registry = registry
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self.forwarded = 0
+
+    def __repr__(self):
+        return f"SessionRouter(worker={self.registry.worker_id!r}, forwarded={self.forwarded})"
+
+    def _owner_address(self, scope) -> Optional[Tuple[str, str]]:
+        if not self.registry.shared or scope["type"] not in ("http", "websocket"):
+            return None
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            return None
+        if any(name == FORWARDED_HEADER.encode() for name, _ in scope.get("headers", [])):
+            return None
+        key = route_key(scope["path"])
+        if key is None:
+            return None
+        owner = self.registry.owner(key)
+        # sessions whose owner is gone are handled here, e.g. restored from a checkpoint
+        if owner is None or owner["worker_id"] == self.registry.worker_id or not owner["alive"] or not owner["address"]:
+            return None
+        return owner["worker_id"], owner["address"]
+
+    async def __call__(self, scope, receive, send):
+        target = self._owner_address(scope)
+        if target is None:
+            await self.app(scope, receive, send)
+            return
+        self.forwarded += 1
+        if scope["type"] == "http":
+            await self._forward_http(scope, receive, send, *target)
+        else:
+            await self._forward_websocket(scope, receive, send, *target)
+
+    def _headers(self, scope):
+        headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in scope["headers"]
+                   if k.decode("latin-1").lower() not in HOP_HEADERS]
+        return headers + [(FORWARDED_HEADER, self.registry.worker_id)]
+
+    async def _forward_http(self, scope, receive, send, worker_id: str, address: str):
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        url = address.rstrip("/") + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        try:
+            response = await self._client.request(scope["method"], url, headers=self._headers(scope), content=body)
+            status, content = response.status_code, response.content
+            headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()
+                       if k.lower() not in HOP_HEADERS and k.lower() != "content-encoding"]
+        except httpx.HTTPError as e:
+            status = 502
+            content = f'{{"detail": "Worker {worker_id} did not respond: {type(e).__name__}"}}'.encode()
+            headers = [(b"content-type", b"application/json")]
+        headers += [(b"content-length", str(len(content)).encode()), (OWNER_HEADER.encode(), worker_id.encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": content})
+
+    async def _forward_websocket(self, scope, receive, send, worker_id: str, address: str):
+        import websockets
+
+        url = re.sub(r"^http", "ws", address.rstrip("/")) + scope["path"]
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode("latin-1")
+        await receive()  # websocket.connect
+        try:
+            upstream = await websockets.connect(
+                url, additional_headers={FORWARDED_HEADER: self.registry.worker_id}, max_size=None
+            )
+        except Exception as e:
+            print(f"Could not reach worker {worker_id} for {scope['path']}: {e}")
+            await send({"type": "websocket.close", "code": 1011})
+            return
+        await send({"type": "websocket.accept", "headers": [(OWNER_HEADER.encode(), worker_id.encode())]})
+
+        async def client_to_upstream():
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                if message.get("bytes") is not None:
+                    await upstream.send(message["bytes"])
+                elif message.get("text") is not None:
+                    await upstream.send(message["text"])
+
+        async def upstream_to_client():
+            try:
+                async for frame in upstream:
+                    if isinstance(frame, bytes):
+                        await send({"type": "websocket.send", "bytes": frame})
+                    else:
+                        await send({"type": "websocket.send", "text": frame})
+            except websockets.ConnectionClosed:
+                pass
+            await send({"type": "websocket.close", "code": upstream.close_code or 1000})
+
+        tasks = [asyncio.ensure_future(client_to_upstream()), asyncio.ensure_future(upstream_to_client())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await upstream.close()
+
+
+class InternalListener:
+    # a private port per worker, so other workers can reach this process directly
+    # (uvicorn --workers shares one public socket between all of them)
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        self.app = app
+        self.host = host
+        self.port = port
+        self.server = None
+        self.address: Optional[str] = None
+
+    def __repr__(self):
+        return f"InternalListener(address={self.address!r})"
+
+    async def start(self) -> str:
+        import uvicorn
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.set_inheritable(True)
+        config = uvicorn.Config(self.app, lifespan="off", log_level="warning", ws="websockets")
+        config.load()
+        self.server = uvicorn.Server(config)
+        # serve() would take over the worker's signal handlers, so only start the listening socket
+        self.server.lifespan = config.lifespan_class(config)
+        await self.server.startup(sockets=[sock])
+        self.address = f"http://{self.host}:{sock.getsockname()[1]}"
+        return self.address
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.force_exit = True
+            await self.server.shutdown()
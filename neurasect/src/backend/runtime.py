@@ -0,0 +1,142 @@
+import importlib
+import sys
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+_import_lock = threading.RLock()
+import_timings: Dict[str, float] = {}
+
+
+def timed_import(name: str):
+    with _import_lock:
+        if name in sys.modules:
+            return sys.modules[name]
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        import_timings[name] = round(time.perf_counter() - start, 3)
+        return module
+
+
+def loaded_version(name: str) -> Optional[str]:
+    # never waits on an import in progress, so health checks answer while TensorFlow loads
+    if not _import_lock.acquire(blocking=False):
+        return None
+    try:
+        return getattr(sys.modules.get(name), "__version__", None)
+    finally:
+        _import_lock.release()
+
+
+class LazyModule:
+    # imports the module (and through it TensorFlow) on first attribute access
+
+    def __init__(self, name: str, attribute: Optional[str] = None):
+        self._name = name
+        self._attribute = attribute
+        self._module = None
+
+    def __repr__(self):
+        target = f"{self._name}.{self._attribute}" if self._attribute else self._name
+        return f"LazyModule({target!r}, loaded={self._module is not None})"
+
+    def _load(self):
+        if self._module is None:
+            module = timed_import(self._name)
+            self._module = getattr(module, self._attribute) if self._attribute else module
+        return self._module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+
+class LazyObject:
+    # creates the wrapped object on first use, for module-level singletons whose classes need TensorFlow
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._object = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"LazyObject(loaded={self._object is not None})"
+
+    @property
+    def loaded(self) -> bool:
+        return self._object is not None
+
+    def __getattr__(self, name: str):
+        if self._object is None:
+            with self._lock:
+                if self._object is None:
+                    self._object = self._factory()
+        return getattr(self._object, name)
+
+
+class ModelRuntime:
+
+    def __init__(self, modules: List[str], warmup: Optional[Callable[[], Dict[str, Any]]] = None):
+        self.modules = modules
+        self.warmup = warmup
+        self.mode: Optional[str] = None
+        self.state = "not_loaded"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, Any] = {}
+        self._started_at: Optional[float] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"ModelRuntime(state={self.state!r}, mode={self.mode!r})"
+
+    @property
+    def ready(self) -> bool:
+        # in lazy mode nothing is preloaded, so there is nothing to wait for
+        return self.state == "ready" or self.mode == "lazy"
+
+    def load(self):
+        with self._lock:
+            if self.state in ("loading", "warming", "ready"):
+                return
+            self.state = "loading"
+            self._started_at = time.perf_counter()
+        try:
+            start = time.perf_counter()
+            for name in self.modules:
+                timed_import(name)
+            self.timings["import_seconds"] = round(time.perf_counter() - start, 3)
+            if self.warmup is not None:
+                self.state = "warming"
+                start = time.perf_counter()
+                self.timings["warmup"] = self.warmup()
+                self.timings["warmup_seconds"] = round(time.perf_counter() - start, 3)
+            self.state = "ready"
+        except Exception as e:
+            # requests still import what they need on demand
+            self.state = "failed"
+            self.error = str(e)
+            print(f"Model runtime failed to load: {e}")
+        finally:
+            self.timings["ready_seconds"] = round(time.perf_counter() - self._started_at, 3)
+            self._ready.set()
+
+    def start(self, mode: str = "background"):
+        self.mode = mode
+        if mode == "lazy":
+            return
+        if mode == "eager":
+            self.load()
+            return
+        threading.Thread(target=self.load, name="model-runtime", daemon=True).start()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "mode": self.mode,
+            "error": self.error,
+            **self.timings,
+            "imports": dict(import_timings),
+        }
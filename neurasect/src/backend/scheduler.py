@@ -0,0 +1,149 @@
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Optional, Dict, Any, List
+
+
+class TrainingJob:
+
+    def __init__(self, session_id: str, target: Callable[[], None],
+                 on_position: Optional[Callable[[int], None]] = None,
+                 on_removed: Optional[Callable[[], None]] = None):
+        self.session_id = session_id
+        self.target = target
+        self.on_position = on_position
+        self.on_removed = on_removed
+        self.status = "queued"
+        self.submitted_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.done = threading.Event()
+
+    def __repr__(self):
+        return f"TrainingJob(session_id={self.session_id!r}, status={self.status!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "status": self.status,
+            "submitted_at": self.submitted_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+        }
+
+
+class TrainingScheduler:
+
+    def __init__(self, max_workers: int = 2):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._cond = threading.Condition()
+        self._pending: deque = deque()
+        self._running: Dict[str, TrainingJob] = {}
+        self._workers: List[threading.Thread] = []
+        self._completed = 0
+
+    def __repr__(self):
+        return (f"TrainingScheduler(max_workers={self.max_workers}, "
+                f"running={len(self._running)}, queued={len(self._pending)})")
+
+    def submit(self, session_id: str, target: Callable[[], None],
+               on_position: Optional[Callable[[int], None]] = None,
+               on_removed: Optional[Callable[[], None]] = None) -> TrainingJob:
+        job = TrainingJob(session_id, target, on_position, on_removed)
+        with self._cond:
+            if session_id in self._running or any(j.session_id == session_id for j in self._pending):
+                raise ValueError(f"Session '{session_id}' is already scheduled")
+            self._pending.append(job)
+            if len(self._pending) <= self._free_slots():
+                # a worker is free and takes the job right away, so it never counts as queued
+                job.status = "running"
+            self._ensure_workers()
+            self._notify_positions()
+            self._cond.notify()
+        return job
+
+    def remove(self, session_id: str) -> bool:
+        with self._cond:
+            removed = next((job for job in self._pending if job.session_id == session_id), None)
+            if removed is None:
+                return False
+            self._pending.remove(removed)
+            removed.status = "removed"
+            removed.done.set()
+            self._notify_positions()
+        # the job never runs, so whoever waits on its progress has to hear about it here
+        if removed.on_removed:
+            try:
+                removed.on_removed()
+            except Exception as e:
+                print(f"Removal callback failed for {session_id}: {e}")
+        return True
+
+    def position(self, session_id: str) -> Optional[int]:
+        with self._cond:
+            if session_id in self._running:
+                return 0
+            free = self._free_slots()
+            for i, job in enumerate(self._pending):
+                if job.session_id == session_id:
+                    return max(0, i + 1 - free)
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "running": [job.to_dict() for job in self._running.values()],
+                "queued": [dict(job.to_dict(), position=i + 1)
+                           for i, job in enumerate(list(self._pending)[self._free_slots():])],
+                "completed": self._completed,
+            }
+
+    def _ensure_workers(self):
+        self._workers = [w for w in self._workers if w.is_alive()]
+        while len(self._workers) < self.max_workers:
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"training-worker-{len(self._workers)}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _free_slots(self) -> int:
+        # every worker not running a job picks up the next pending one as soon as it wakes
+        return max(0, self.max_workers - len(self._running))
+
+    def _notify_positions(self):
+        free = self._free_slots()
+        for i, job in enumerate(self._pending):
+            if i < free:
+                continue
+            if job.on_position:
+                try:
+                    job.on_position(i + 1 - free)
+                except Exception as e:
+                    print(f"Queue position callback failed for {job.session_id}: {e}")
+
+    def _worker_loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                job = self._pending.popleft()
+                job.status = "running"
+                job.started_at = datetime.now()
+                self._running[job.session_id] = job
+                self._notify_positions()
+            try:
+                job.target()
+            except Exception as e:
+                print(f"Training job {job.session_id} raised: {e}")
+            finally:
+                with self._cond:
+                    self._running.pop(job.session_id, None)
+                    self._completed += 1
+                job.status = "finished"
+                job.finished_at = datetime.now()
+                job.done.set()
@@ -0,0 +1,153 @@
+import gc
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional, Dict, Any, List
+
+import numpy as np
+
+BUSY_STATUSES = ("queued", "training")
+ARRAY_KEYS = ("X_train", "X_test", "y_train", "y_test")
+
+
+def variable_bytes(variables) -> int:
+    total = 0
+    for v in variables:
+        total += int(np.prod(v.shape)) * np.dtype(getattr(v.dtype, "name", v.dtype)).itemsize
+    return total
+
+
+def session_bytes(session: Dict[str, Any]) -> int:
+    total = 0
+    for key in ARRAY_KEYS:
+        arr = session.get(key)
+        if isinstance(arr, np.ndarray) and arr.flags.writeable:
+            total += arr.nbytes
+    model = session.get("model")
+    if model is not None:
+        total += variable_bytes(model.weights)
+        optimizer = getattr(model, "optimizer", None)
+        if optimizer is not None and getattr(optimizer, "built", True):
+            total += variable_bytes(getattr(optimizer, "variables", []))
+    return total
+
+
+class SessionStore:
+
+    def __init__(self, ttl_seconds: float = 3600, max_bytes: int = 2 * 1024 ** 3,
+                 on_evict: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self.evictions = 0
+
+    def __repr__(self):
+        return f"SessionStore(sessions={len(self)}, ttl={self.ttl_seconds}s, max_bytes={self.max_bytes})"
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        with self._lock:
+            session = self._sessions[session_id]
+            self._touch(session_id)
+            return session
+
+    def __setitem__(self, session_id: str, session: Dict[str, Any]):
+        with self._lock:
+            self._sessions[session_id] = session
+            self._touch(session_id)
+        self.evict(protect=session_id)
+
+    def __delitem__(self, session_id: str):
+        with self._lock:
+            session = self._sessions.pop(session_id)
+            self._last_used.pop(session_id, None)
+        self._release(session_id, session)
+
+    def get(self, session_id: str, default=None):
+        with self._lock:
+            if session_id not in self._sessions:
+                return default
+            return self[session_id]
+
+    def items(self):
+        with self._lock:
+            return list(self._sessions.items())
+
+    def _touch(self, session_id: str):
+        self._last_used[session_id] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    def _release(self, session_id: str, session: Dict[str, Any]):
+        if self.on_evict:
+            try:
+                self.on_evict(session_id, session)
+            except Exception as e:
+                print(f"Session cleanup failed for {session_id}: {e}")
+        for key in ("model", "inference_model") + ARRAY_KEYS:
+            session.pop(key, None)
+        gc.collect()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(session_bytes(s) for s in self._sessions.values())
+
+    def evict(self, protect: Optional[str] = None) -> List[str]:
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            candidates = [
+                sid for sid, s in self._sessions.items()
+                if sid != protect and s.get("status") not in BUSY_STATUSES
+            ]
+            for sid in candidates:
+                if now - self._last_used.get(sid, now) > self.ttl_seconds:
+                    evicted.append(sid)
+            sizes = {sid: session_bytes(s) for sid, s in self._sessions.items()}
+            total = sum(size for sid, size in sizes.items() if sid not in evicted)
+            for sid in candidates:
+                if total <= self.max_bytes:
+                    break
+                if sid not in evicted:
+                    evicted.append(sid)
+                    total -= sizes[sid]
+            released = [(sid, self._sessions.pop(sid)) for sid in evicted]
+            for sid in evicted:
+                self._last_used.pop(sid, None)
+        for sid, session in released:
+            print(f"Evicting session {sid}")
+            self._release(sid, session)
+        self.evictions += len(evicted)
+        return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            sessions = [
+                {
+                    "session_id": sid,
+                    "status": s.get("status"),
+                    "bytes": session_bytes(s),
+                    "idle_seconds": round(now - self._last_used.get(sid, now), 1),
+                }
+                for sid, s in self._sessions.items()
+            ]
+        return {
+            "count": len(sessions),
+            "total_bytes": sum(s["bytes"] for s in sessions),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "sessions": sessions,
+        }
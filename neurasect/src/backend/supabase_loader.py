@@ -0,0 +1,259 @@
+import asyncio
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+DATA_TABLES = ["iris", "boston", "youtube", "insurance", "carsales"]
+META_COLUMNS = ("id", "dataset_id", "created_at")
+
+
+class CategoryCodes:
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, values) -> np.ndarray:
+        out = np.empty(len(values), dtype=np.float64)
+        for i, v in enumerate(values):
+            key = str(v)
+            code = self.codes.get(key)
+            if code is None:
+                code = self.codes[key] = len(self.codes)
+            out[i] = code
+        return out
+
+    def sorted_remap(self) -> np.ndarray:
+        # LabelEncoder assigns codes in sorted order; first-seen codes are remapped to match
+        classes = sorted(self.codes)
+        remap = np.empty(len(classes), dtype=np.float64)
+        for new_code, key in enumerate(classes):
+            remap[self.codes[key]] = new_code
+        return remap
+
+
+def _number_key(value: float) -> str:
+    # rows read before a column turned out to be categorical were stored as floats (None as NaN)
+    return "None" if np.isnan(value) else np.format_float_positional(value, trim="-")
+
+
+class PageAssembler:
+
+    def __init__(self, feature_columns: List[str], target_column: str, categorical: List[str],
+                 total: Optional[int] = None):
+        self.feature_columns = feature_columns
+        self.target_column = target_column
+        self.categorical = {c: CategoryCodes() for c in categorical}
+        self.promoted = set()
+        self.total = total
+        self.X = np.empty((total, len(feature_columns)), dtype=np.float64) if total is not None else None
+        self.y = np.empty(total, dtype=object) if total is not None else None
+        self.chunks: List[Tuple[int, np.ndarray, np.ndarray]] = []
+        self.written: List[Tuple[int, int]] = []
+        self.filled = 0
+        self.end = 0
+        self.label_encodings: Dict[str, List[str]] = {}
+
+    def __repr__(self):
+        return f"PageAssembler(columns={len(self.feature_columns)}, filled={self.filled}, total={self.total})"
+
+    def write(self, offset: int, rows: List[Dict]):
+        X_page = np.empty((len(rows), len(self.feature_columns)), dtype=np.float64)
+        for j, col in enumerate(self.feature_columns):
+            values = [row.get(col) for row in rows]
+            if col not in self.categorical:
+                try:
+                    X_page[:, j] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+                    continue
+                except (TypeError, ValueError):
+                    # first non-numeric value in a column that looked numeric: re-key the rows so far as strings
+                    self._promote(j, col)
+            if col in self.promoted:
+                values = [v if v is None or isinstance(v, str) else _number_key(float(v)) for v in values]
+            X_page[:, j] = self.categorical[col].encode(values)
+        y_page = np.array([row.get(self.target_column) for row in rows], dtype=object)
+
+        fit = max(0, min(len(rows), (self.total or 0) - offset)) if self.X is not None else 0
+        if fit:
+            self.X[offset:offset + fit] = X_page[:fit]
+            self.y[offset:offset + fit] = y_page[:fit]
+            self.written.append((offset, offset + fit))
+            self.end = max(self.end, offset + fit)
+        if fit < len(rows):
+            self.chunks.append((offset + fit, X_page[fit:], y_page[fit:]))
+        self.filled += len(rows)
+
+    def _promote(self, j: int, col: str):
+        codes = self.categorical[col] = CategoryCodes()
+        self.promoted.add(col)
+        for start, stop in self.written:
+            self.X[start:stop, j] = codes.encode([_number_key(v) for v in self.X[start:stop, j]])
+        for _, X_chunk, _ in self.chunks:
+            X_chunk[:, j] = codes.encode([_number_key(v) for v in X_chunk[:, j]])
+
+    def finish(self):
+        X, y = self.X, self.y
+        if X is None or self.chunks or self.filled != self.total:
+            # the row count changed while paging, fall back to stitching pages in offset order
+            head = self.end
+            chunks = sorted(self.chunks, key=lambda c: c[0])
+            parts_X = ([X[:head]] if X is not None else []) + [c[1] for c in chunks]
+            parts_y = ([y[:head]] if y is not None else []) + [c[2] for c in chunks]
+            X = np.concatenate(parts_X) if len(parts_X) > 1 else parts_X[0]
+            y = np.concatenate(parts_y) if len(parts_y) > 1 else parts_y[0]
+
+        for j, col in enumerate(self.feature_columns):
+            if col in self.categorical:
+                X[:, j] = self.categorical[col].sorted_remap()[X[:, j].astype(np.int64)]
+
+        self.label_encodings = {col: sorted(codes.codes) for col, codes in self.categorical.items()}
+        try:
+            y = pd.to_numeric(y)
+        except (TypeError, ValueError):
+            from sklearn.preprocessing import LabelEncoder
+            encoder = LabelEncoder()
+            y = encoder.fit_transform(y.astype(str))
+            self.label_encodings[self.target_column] = encoder.classes_.tolist()
+
+        unique_values = len(np.unique(y))
+        num_classes = unique_values if unique_values < 20 else 1
+        return X, y, num_classes
+
+
+class SupabaseDatasetLoader:
+
+    def __init__(self, client, page_size: int = 1000, tables: Optional[List[str]] = None,
+                 max_concurrency: int = 4):
+        self.client = client
+        self.page_size = page_size
+        self.tables = tables or DATA_TABLES
+        self.max_concurrency = max_concurrency
+        self._table_for_dataset: Dict[str, Tuple[str, str]] = {}
+        self._metadata: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def __repr__(self):
+        return (f"SupabaseDatasetLoader(page_size={self.page_size}, max_concurrency={self.max_concurrency}, "
+                f"cached_tables={len(self._table_for_dataset)})")
+
+    async def _execute(self, query):
+        # every query shares the client's pooled connection, at most max_concurrency at a time
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                return await query.execute()
+            finally:
+                self.in_flight -= 1
+
+    async def resolve_table(self, dataset_id: str) -> Tuple[str, str]:
+        with self._lock:
+            if dataset_id in self._table_for_dataset:
+                return self._table_for_dataset[dataset_id]
+
+        dataset_response = await self._execute(
+            self.client.table("datasets").select("id,title").eq("id", dataset_id).limit(1)
+        )
+        if not dataset_response.data:
+            raise HTTPException(status_code=404, detail=f"Dataset '{dataset_id}' not found in Supabase")
+        dataset_title = (dataset_response.data[0].get("title") or "").lower()
+
+        table_name = next((t for t in self.tables if t in dataset_title), None)
+        if not table_name:
+            probes = await asyncio.gather(*(
+                self._execute(self.client.table(tname).select("dataset_id").eq("dataset_id", dataset_id).limit(1))
+                for tname in self.tables
+            ), return_exceptions=True)
+            table_name = next((
+                tname for tname, probe in zip(self.tables, probes)
+                if not isinstance(probe, BaseException) and probe.data
+            ), None)
+        if not table_name:
+            raise HTTPException(status_code=404, detail=f"No data found for dataset '{dataset_id}'")
+
+        with self._lock:
+            self._table_for_dataset[dataset_id] = (table_name, dataset_title)
+        return table_name, dataset_title
+
+    def forget(self, dataset_id: str):
+        with self._lock:
+            self._table_for_dataset.pop(dataset_id, None)
+            self._metadata.pop(dataset_id, None)
+
+    def metadata(self, dataset_id: str) -> Dict:
+        # same shape as the metadata DatasetStore keeps for uploads
+        with self._lock:
+            return self._metadata.get(dataset_id, {})
+
+    async def _first_page(self, table_name: str, dataset_id: str):
+        return await self._execute(self.client.table(table_name)
+                                   .select("*", count="exact")
+                                   .eq("dataset_id", dataset_id)
+                                   .order("id")
+                                   .range(0, self.page_size - 1))
+
+    async def _page(self, table_name: str, dataset_id: str, columns: List[str], start: int):
+        response = await self._execute(self.client.table(table_name)
+                                       .select(",".join(columns))
+                                       .eq("dataset_id", dataset_id)
+                                       .order("id")
+                                       .range(start, start + self.page_size - 1))
+        return start, response.data
+
+    async def load(self, dataset_id: str):
+        loop = asyncio.get_running_loop()
+        table_name, dataset_title = await self.resolve_table(dataset_id)
+
+        first = await self._first_page(table_name, dataset_id)
+        if not first.data:
+            raise HTTPException(status_code=404, detail=f"No data rows found for dataset '{dataset_id}'")
+
+        columns = [c for c in first.data[0].keys() if c not in META_COLUMNS]
+        if len(columns) < 2:
+            raise HTTPException(status_code=400, detail="Dataset must have at least 2 columns")
+        feature_columns, target_column = columns[:-1], columns[-1]
+        categorical = [c for c in feature_columns if any(isinstance(row.get(c), str) for row in first.data)]
+
+        total = first.count if getattr(first, "count", None) is not None else None
+        assembler = PageAssembler(feature_columns, target_column, categorical, total)
+        await loop.run_in_executor(None, assembler.write, 0, first.data)
+
+        if total is not None:
+            # the row count is known, so the remaining pages are fetched concurrently
+            pages = [self._page(table_name, dataset_id, columns, start)
+                     for start in range(len(first.data), total, self.page_size)]
+            for page in asyncio.as_completed(pages):
+                start, rows = await page
+                if rows:
+                    await loop.run_in_executor(None, assembler.write, start, rows)
+        else:
+            rows = first.data
+            while len(rows) == self.page_size:
+                start, rows = await self._page(table_name, dataset_id, columns, assembler.filled)
+                if rows:
+                    await loop.run_in_executor(None, assembler.write, start, rows)
+
+        X, y, num_classes = await loop.run_in_executor(None, assembler.finish)
+        with self._lock:
+            self._metadata[dataset_id] = {
+                "columns": columns,
+                "label_encodings": assembler.label_encodings,
+                "num_classes": num_classes,
+            }
+        print(f"Loaded '{dataset_title}' from Supabase — shape: {X.shape}, classes: {num_classes}")
+        return X, y, num_classes
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_concurrency": self.max_concurrency,
+        }
@@ -0,0 +1,136 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from tensorflow import keras
+
+
+def dense_positions(model) -> List[int]:
+    return [i for i, layer in enumerate(model.layers) if isinstance(layer, keras.layers.Dense)]
+
+
+def hidden_position(model, layer: int) -> Tuple[int, int]:
+    positions = dense_positions(model)
+    if layer < 0 or layer >= len(positions) - 1:
+        raise ValueError(f"Layer {layer} is not a hidden layer; the model has {len(positions) - 1} hidden layers")
+    return positions[layer], positions[layer + 1]
+
+
+def unique_name(model, base: str) -> str:
+    names = {layer.name for layer in model.layers}
+    name, n = base, 1
+    while name in names:
+        n += 1
+        name = f"{base}_{n}"
+    return name
+
+
+def rebuild(model, configs: List[Dict], weights: List[List[np.ndarray]]) -> keras.Sequential:
+    new_model = keras.Sequential(name=model.name)
+    new_model.add(keras.Input(shape=model.input_shape[1:]))
+    for config in configs:
+        new_model.add(keras.layers.deserialize(config))
+    for layer, layer_weights in zip(new_model.layers, weights):
+        if layer_weights:
+            layer.set_weights(layer_weights)
+    return new_model
+
+
+def layer_config(layer) -> Dict:
+    config = keras.layers.serialize(layer)
+    # input shapes change around the edited layer, so let Sequential rebuild every layer
+    config.pop("build_config", None)
+    return config
+
+
+def layer_configs(model) -> List[Dict]:
+    return [layer_config(layer) for layer in model.layers]
+
+
+def resize_dense(model, layer: int, units: int, noise: float = 0.0, seed: Optional[int] = None,
+                 activation: Optional[str] = None) -> keras.Sequential:
+    if not isinstance(model, keras.Sequential):
+        raise ValueError("Network surgery only supports Sequential models")
+    if units < 1:
+        raise ValueError("A layer needs at least one neuron")
+    pos, next_pos = hidden_position(model, layer)
+    old_units = model.layers[pos].units
+    rng = np.random.default_rng(seed)
+
+    if units >= old_units:
+        # Net2WiderNet: new neurons replicate random existing ones, and every replica
+        # gets an equal share of the original outgoing weights, so outputs are unchanged
+        mapping = np.concatenate([np.arange(old_units), rng.integers(0, old_units, units - old_units)])
+        share = 1.0 / np.bincount(mapping, minlength=old_units)[mapping]
+    else:
+        mapping = np.arange(units)
+        share = np.ones(units)
+
+    configs = layer_configs(model)
+    weights = [layer.get_weights() for layer in model.layers]
+    configs[pos]["config"]["units"] = units
+    if activation is not None:
+        configs[pos]["config"]["activation"] = activation
+
+    kernel = weights[pos][0][:, mapping]
+    if noise and units > old_units:
+        scale = noise * (kernel[:, :old_units].std() or 1.0)
+        kernel[:, old_units:] += rng.normal(0.0, scale, kernel[:, old_units:].shape).astype(kernel.dtype)
+    weights[pos] = [kernel] + [w[mapping] for w in weights[pos][1:]]
+
+    for i in range(pos + 1, next_pos):
+        # per-neuron layers in between (BatchNormalization) follow the same mapping
+        if any(w.ndim != 1 or w.shape[0] != old_units for w in weights[i]):
+            raise ValueError(f"Cannot resize through layer '{model.layers[i].name}'")
+        weights[i] = [w[mapping] for w in weights[i]]
+
+    next_kernel = weights[next_pos][0][mapping] * share[:, None].astype(weights[next_pos][0].dtype)
+    weights[next_pos] = [next_kernel] + weights[next_pos][1:]
+    return rebuild(model, configs, weights)
+
+
+def widen_dense(model, layer: int, extra: int = 1, noise: float = 0.0, seed: Optional[int] = None) -> keras.Sequential:
+    if extra < 1:
+        raise ValueError("extra must be at least 1")
+    pos, _ = hidden_position(model, layer)
+    return resize_dense(model, layer, model.layers[pos].units + extra, noise=noise, seed=seed)
+
+
+def insert_dense(model, after: int, units: Optional[int] = None, activation: Optional[str] = None,
+                 seed: Optional[int] = None) -> keras.Sequential:
+    if not isinstance(model, keras.Sequential):
+        raise ValueError("Network surgery only supports Sequential models")
+    pos, next_pos = hidden_position(model, after)
+    source = model.layers[pos]
+    width = source.units
+    units = units or width
+    if units < width:
+        raise ValueError(f"An inserted layer needs at least {width} neurons to carry the previous layer's output")
+    configs = layer_configs(model)
+    weights = [layer.get_weights() for layer in model.layers]
+    if units > width and any(weights[i] for i in range(pos + 1, next_pos)):
+        raise ValueError("An inserted layer followed by batch normalization must keep the same width")
+    rng = np.random.default_rng(seed)
+
+    # Net2DeeperNet: an identity layer; exact when activation(activation(x)) == activation(x), e.g. relu
+    config = layer_config(source)
+    config["config"].update(
+        name=unique_name(model, f"{source.name}_deepened"),
+        units=units,
+        activation=activation or config["config"]["activation"],
+        use_bias=True,
+    )
+    kernel = np.zeros((width, units), dtype=np.float32)
+    kernel[:, :width] = np.eye(width, dtype=np.float32)
+    # any extra neurons start small and feed forward with zero weight
+    kernel[:, width:] = rng.normal(0.0, 1e-2, (width, units - width))
+    new_weights = [kernel, np.zeros(units, dtype=np.float32)]
+
+    next_weights = weights[next_pos]
+    if units > width:
+        next_kernel = np.zeros((units, next_weights[0].shape[1]), dtype=next_weights[0].dtype)
+        next_kernel[:width] = next_weights[0]
+        weights[next_pos] = [next_kernel] + next_weights[1:]
+
+    configs.insert(pos + 1, config)
+    weights.insert(pos + 1, new_weights)
+    return rebuild(model, configs, weights)
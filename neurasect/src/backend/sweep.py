@@ -0,0 +1,385 @@
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
+TUNABLE_PARAMS = ("num_layers", "num_neurons", "learning_rate", "regularizer",
+                  "regularization_rate", "optimizer", "activation", "batch_size")
+INT_PARAMS = ("num_layers", "num_neurons", "batch_size")
+ARRAY_NAMES = ("X_train", "X_test", "y_train", "y_test")
+FINISHED_STATUSES = ("completed", "stopped", "failed", "cancelled")
+
+
+def sample_value(rng: random.Random, name: str, spec):
+    if isinstance(spec, list):
+        return rng.choice(spec)
+    low, high = float(spec["min"]), float(spec["max"])
+    if spec.get("log"):
+        value = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        value = rng.uniform(low, high)
+    return int(round(value)) if name in INT_PARAMS else value
+
+
+def expand_space(space: Dict[str, Any], search: str = "grid", n_trials: int = 10,
+                 seed: Optional[int] = None, max_trials: int = 256) -> List[Dict[str, Any]]:
+    unknown = sorted(set(space) - set(TUNABLE_PARAMS))
+    if unknown:
+        raise ValueError(f"Cannot sweep over {unknown}; tunable parameters are {list(TUNABLE_PARAMS)}")
+    for name, spec in space.items():
+        if isinstance(spec, list):
+            if not spec:
+                raise ValueError(f"No values given for '{name}'")
+        elif not (isinstance(spec, dict) and "min" in spec and "max" in spec):
+            raise ValueError(f"'{name}' must be a list of values or a {{min, max, log}} range")
+        elif search == "grid":
+            raise ValueError(f"Grid search needs a list of values for '{name}'")
+        elif spec.get("log") and float(spec["min"]) <= 0:
+            raise ValueError(f"Log range for '{name}' must be positive")
+
+    if search == "grid":
+        names = list(space)
+        total = math.prod(len(space[name]) for name in names)
+        if total > max_trials:
+            raise ValueError(f"Grid has {total} trials, more than the limit of {max_trials}")
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    if search == "random":
+        if n_trials < 1 or n_trials > max_trials:
+            raise ValueError(f"n_trials must be between 1 and {max_trials}")
+        rng = random.Random(seed)
+        return [{name: sample_value(rng, name, spec) for name, spec in space.items()} for _ in range(n_trials)]
+    raise ValueError(f"Unknown search '{search}', expected 'grid' or 'random'")
+
+
+def halving_rungs(min_epochs: int, max_epochs: int, reduction_factor: int) -> List[int]:
+    rungs = []
+    budget = max(1, min_epochs)
+    while budget < max_epochs:
+        rungs.append(budget)
+        budget *= max(2, reduction_factor)
+    rungs.append(max_epochs)
+    return rungs
+
+
+def export_arrays(data_dir: str, arrays) -> str:
+    if os.path.exists(os.path.join(data_dir, "done")):
+        return data_dir
+    tmp_dir = f"{data_dir}.tmp-{os.getpid()}-{time.monotonic_ns()}"
+    os.makedirs(tmp_dir)
+    for name, arr in zip(ARRAY_NAMES, arrays):
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(arr, dtype=np.float32))
+    open(os.path.join(tmp_dir, "done"), "w").close()
+    try:
+        os.rename(tmp_dir, data_dir)
+    except OSError:
+        # another sweep exported the same dataset first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return data_dir
+
+
+def retire_arrays(data_dir: str) -> Optional[str]:
+    # a quick rename, so a sweep starting meanwhile exports a fresh copy instead of reading a half-deleted one;
+    # the returned directory is for the caller to remove
+    doomed = f"{data_dir}.deleted-{os.getpid()}-{time.monotonic_ns()}"
+    try:
+        os.rename(data_dir, doomed)
+    except OSError:
+        return None
+    return doomed
+
+
+def reported_metrics(num_classes: int) -> List[str]:
+    # what modeling.compile_model puts in the history
+    names = ["loss", "accuracy"] if num_classes > 1 else ["loss", "mae"]
+    return names + [f"val_{name}" for name in names]
+
+
+def create_executor(workers: int, threads_per_worker: int) -> ProcessPoolExecutor:
+    # TensorFlow is not fork-safe once imported, so workers are spawned fresh
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+        initargs=(threads_per_worker,),
+    )
+
+
+_worker_arrays: Dict[str, tuple] = {}
+
+
+def init_worker(threads: int):
+    import tensorflow as tf
+    if threads > 0:
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+        tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def shared_arrays(data_dir: str) -> tuple:
+    # the directory is removed after its sweeps finish and may be exported again later
+    stamp = os.stat(os.path.join(data_dir, "done")).st_ino
+    cached = _worker_arrays.get(data_dir)
+    if cached is None or cached[0] != stamp:
+        # memory-mapped, so every worker reads the same page-cached copy
+        arrays = tuple(np.load(os.path.join(data_dir, f"{name}.npy"), mmap_mode="r") for name in ARRAY_NAMES)
+        cached = _worker_arrays[data_dir] = (stamp, arrays)
+    return cached[1]
+
+
+def train_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    from tensorflow import keras
+    from modeling import build_model, compile_model
+    from pipeline import make_dataset
+
+    X_train, X_test, y_train, y_test = shared_arrays(task["data_dir"])
+    config = task["config"]
+    num_classes = task["num_classes"]
+    if task["initial_epoch"] and os.path.exists(task["model_path"]):
+        model = keras.models.load_model(task["model_path"])
+    else:
+        model = build_model(
+            input_shape=X_train.shape[1],
+            output_shape=num_classes,
+            num_layers=int(config["num_layers"]),
+            num_neurons=int(config["num_neurons"]),
+            activation=config["activation"],
+            regularizer=config["regularizer"],
+            regularization_rate=float(config["regularization_rate"])
+        )
+        compile_model(model, num_classes, config["optimizer"], float(config["learning_rate"]))
+
+    callbacks = []
+    if task.get("patience"):
+        callbacks.append(keras.callbacks.EarlyStopping(
+            monitor=task["metric"], mode=task["mode"], patience=task["patience"]
+        ))
+    batch_size = int(config["batch_size"])
+    start = time.perf_counter()
+    history = model.fit(
+        make_dataset(X_train, y_train, batch_size, shuffle=True),
+        validation_data=make_dataset(X_test, y_test, batch_size, shuffle=False),
+        initial_epoch=task["initial_epoch"],
+        epochs=task["epochs"],
+        shuffle=False,
+        callbacks=callbacks,
+        verbose=0
+    )
+    model.save(task["model_path"])
+    history = {k: [float(v) for v in values] for k, values in history.history.items()}
+    trained = len(history.get("loss", []))
+    return {
+        "history": history,
+        "epochs": task["initial_epoch"] + trained,
+        "seconds": time.perf_counter() - start,
+        "stopped_early": task["initial_epoch"] + trained < task["epochs"],
+    }
+
+
+class Sweep:
+
+    def __init__(self, sweep_id: str, base_config: Dict[str, Any], trials: List[Dict[str, Any]],
+                 num_classes: int, root: str, metric: str = "val_loss", rungs: Optional[List[int]] = None,
+                 reduction_factor: int = 3, patience: Optional[int] = None):
+        self.sweep_id = sweep_id
+        self.base_config = base_config
+        self.num_classes = num_classes
+        self.root = root
+        available = reported_metrics(num_classes)
+        if metric not in available:
+            raise ValueError(f"Unknown metric '{metric}'; this model reports {available}")
+        self.metric = metric
+        self.mode = "max" if metric.endswith("accuracy") else "min"
+        self.rungs = rungs or [base_config["epochs"]]
+        self.reduction_factor = max(2, reduction_factor)
+        self.patience = patience
+        self.trials = [{
+            "trial_id": i,
+            "params": params,
+            "status": "pending",
+            "epochs": 0,
+            "score": None,
+            "metrics": {},
+            "seconds": 0.0,
+        } for i, params in enumerate(trials)]
+        self.status = "pending"
+        self.rung = 0
+        self.error: Optional[str] = None
+        self.created_at = datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._futures: List[asyncio.Future] = []
+        self._cancelled = False
+        self._deleted = False
+
+    def __repr__(self):
+        return f"Sweep(id={self.sweep_id!r}, trials={len(self.trials)}, rungs={self.rungs}, status={self.status!r})"
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "cancelled", "error")
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _publish(self, update: Dict[str, Any]):
+        for callback in list(self._subscribers):
+            callback(update)
+
+    def _score(self, history: Dict[str, List[float]]) -> Optional[float]:
+        values = history.get(self.metric)
+        if not values:
+            return None
+        return max(values) if self.mode == "max" else min(values)
+
+    def _rank_key(self, trial: Dict[str, Any]):
+        score = trial["score"]
+        if score is None:
+            return (1, 0.0)
+        return (0, -score if self.mode == "max" else score)
+
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        return sorted(self.trials, key=self._rank_key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        board = self.leaderboard()
+        return {
+            "sweep_id": self.sweep_id,
+            "status": self.status,
+            "metric": self.metric,
+            "mode": self.mode,
+            "rungs": self.rungs,
+            "rung": self.rung,
+            "trials": len(self.trials),
+            "finished_trials": sum(t["status"] in FINISHED_STATUSES for t in self.trials),
+            "best": board[0] if board and board[0]["score"] is not None else None,
+            "leaderboard": board,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        best = self.leaderboard()[0] if self.trials else None
+        return {
+            "sweep_id": self.sweep_id,
+            "status": self.status,
+            "trials": len(self.trials),
+            "best_score": best["score"] if best else None,
+            "created_at": self.created_at,
+        }
+
+    def model_path(self, trial: Dict[str, Any]) -> str:
+        return os.path.join(self.root, f"trial_{trial['trial_id']}.keras")
+
+    def cancel(self):
+        self._cancelled = True
+        for future in self._futures:
+            future.cancel()
+
+    def _task(self, trial: Dict[str, Any], data_dir: str, budget: int) -> Dict[str, Any]:
+        return {
+            "config": dict(self.base_config, **trial["params"]),
+            "num_classes": self.num_classes,
+            "data_dir": data_dir,
+            "model_path": self.model_path(trial),
+            "initial_epoch": trial["epochs"],
+            "epochs": budget,
+            "metric": self.metric,
+            "mode": self.mode,
+            "patience": self.patience,
+        }
+
+    def _record(self, trial: Dict[str, Any], result: Dict[str, Any]):
+        history = trial.setdefault("history", {})
+        for key, values in result["history"].items():
+            history.setdefault(key, []).extend(values)
+        trial["epochs"] = result["epochs"]
+        trial["seconds"] += result["seconds"]
+        trial["score"] = self._score(history)
+        trial["metrics"] = {key: values[-1] for key, values in history.items() if values}
+        trial["stopped_early"] = result["stopped_early"]
+
+    async def run(self, executor: ProcessPoolExecutor, data_dir: str):
+        loop = asyncio.get_running_loop()
+        os.makedirs(self.root, exist_ok=True)
+        self.status = "running"
+        self._publish({"type": "sweep_leaderboard", **self.snapshot()})
+        try:
+            for rung, budget in enumerate(self.rungs):
+                self.rung = rung
+                alive = [t for t in self.trials if t["status"] in ("pending", "promoted")]
+                if not alive or self._cancelled:
+                    break
+                running = {}
+                for trial in alive:
+                    trial["status"] = "running"
+                    future = loop.run_in_executor(executor, train_trial, self._task(trial, data_dir, budget))
+                    running[future] = trial
+                self._futures = list(running)
+                pending = set(running)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        trial = running[future]
+                        if future.cancelled():
+                            trial["status"] = "cancelled"
+                            continue
+                        error = future.exception()
+                        if error is not None:
+                            trial["status"] = "failed"
+                            trial["error"] = str(error)
+                        else:
+                            self._record(trial, future.result())
+                            last = rung == len(self.rungs) - 1
+                            trial["status"] = "completed" if last or trial["stopped_early"] else "finished_rung"
+                    self._publish({"type": "sweep_leaderboard", **self.snapshot()})
+
+                survivors = [t for t in self.trials if t["status"] == "finished_rung"]
+                if self._cancelled:
+                    for trial in survivors:
+                        trial["status"] = "cancelled"
+                    break
+                # successive halving: keep the best 1/reduction_factor for the next, longer rung
+                keep = max(1, math.ceil(len(survivors) / self.reduction_factor))
+                for i, trial in enumerate(sorted(survivors, key=self._rank_key)):
+                    trial["status"] = "promoted" if i < keep else "stopped"
+            self.status = "cancelled" if self._cancelled else "completed"
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e)
+            print(f"Sweep {self.sweep_id} failed: {e}")
+        finally:
+            self._futures = []
+            self.finished_at = datetime.now().isoformat()
+            self._cleanup()
+            if self._deleted:
+                shutil.rmtree(self.root, ignore_errors=True)
+            self._publish({"type": "sweep_complete", **self.snapshot()})
+
+    def _cleanup(self):
+        best = self.leaderboard()[0] if self.trials else None
+        for trial in self.trials:
+            if best is not None and trial is best:
+                continue
+            try:
+                os.remove(self.model_path(trial))
+            except OSError:
+                pass
+
+    def delete(self):
+        self.cancel()
+        self._deleted = True
+        if self.finished:
+            shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,117 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Tuple
+
+from tensorflow import keras
+
+REINIT_WEIGHTS = ("kernel", "bias", "gamma", "beta", "moving_mean", "moving_variance")
+
+
+def template_key(input_dim: int, num_classes: int, config) -> Tuple:
+    # the learning rate is not part of the key: it is just a variable on the optimizer
+    return (
+        int(input_dim), int(num_classes), config.num_layers, config.num_neurons, config.activation,
+        config.regularizer, float(config.regularization_rate), config.optimizer.lower(),
+    )
+
+
+def reinitialize(model) -> bool:
+    # fresh weights from each layer's own initializers; False if a layer has weights we don't know
+    assignments = []
+    for layer in model.layers:
+        covered = set()
+        for attr in REINIT_WEIGHTS:
+            variable = getattr(layer, attr, None)
+            initializer = getattr(layer, f"{attr}_initializer", None)
+            if variable is None or initializer is None:
+                continue
+            assignments.append((variable, initializer))
+            covered.add(id(variable))
+        if any(id(w) not in covered for w in layer.weights):
+            return False
+    for variable, initializer in assignments:
+        variable.assign(initializer(variable.shape, dtype=variable.dtype))
+    return True
+
+
+def reset_optimizer(model, learning_rate: float) -> bool:
+    # slots don't all start at zero (Adagrad accumulators start at initial_accumulator_value), so build
+    # a fresh optimizer over the same weights and copy its starting state into the traced variables
+    optimizer = model.optimizer
+    fresh = optimizer.__class__.from_config(optimizer.get_config())
+    fresh.build(model.trainable_variables)
+    if len(fresh.variables) != len(optimizer.variables) or any(
+        tuple(a.shape) != tuple(b.shape) for a, b in zip(fresh.variables, optimizer.variables)
+    ):
+        return False
+    for variable, initial in zip(optimizer.variables, fresh.variables):
+        variable.assign(initial)
+    optimizer.learning_rate = learning_rate
+    model.reset_metrics()
+    return True
+
+
+class TemplateCache:
+
+    def __init__(self, max_templates: int = 32, pool_size: int = 2):
+        self.max_templates = max_templates
+        self.pool_size = pool_size
+        self._templates: "OrderedDict[Tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counts = {"built": 0, "cloned": 0, "recycled": 0, "returned": 0, "discarded": 0}
+
+    def __repr__(self):
+        return f"TemplateCache(templates={len(self._templates)}, pool_size={self.pool_size})"
+
+    def acquire(self, key: Tuple, build: Callable[[], Any], compile: Callable[[Any], Any],
+                summarize: Callable[[Any], str], learning_rate: float):
+        with self._lock:
+            template = self._templates.get(key)
+            idle = template["idle"].pop() if template and template["idle"] else None
+            if template is not None:
+                self._templates.move_to_end(key)
+
+        if idle is not None:
+            # a model given back by an ended session: same graph, already traced train step
+            if reinitialize(idle):
+                if not reset_optimizer(idle, learning_rate):
+                    compile(idle)
+                self._count("recycled")
+                return idle, template["summary"], "recycled"
+            self._count("discarded")
+
+        if template is not None:
+            model = keras.Sequential.from_config(template["config"])
+            compile(model)
+            self._count("cloned")
+            return model, template["summary"], "cloned"
+
+        model = build()
+        compile(model)
+        summary = summarize(model)
+        with self._lock:
+            self._templates[key] = {"config": model.get_config(), "summary": summary, "idle": []}
+            while len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        self._count("built")
+        return model, summary, "built"
+
+    def release(self, key: Tuple, model) -> bool:
+        with self._lock:
+            template = self._templates.get(key)
+            if template is None or len(template["idle"]) >= self.pool_size or model.optimizer is None:
+                return False
+            template["idle"].append(model)
+            self.counts["returned"] += 1
+            return True
+
+    def idle_models(self) -> int:
+        with self._lock:
+            return sum(len(t["idle"]) for t in self._templates.values())
+
+    def _count(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"templates": len(self._templates), "idle_models": self.idle_models(), **self.counts}
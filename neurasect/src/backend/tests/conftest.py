@@ -0,0 +1,129 @@
+import asyncio
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# main creates its stores on import; keep them out of the source tree
+_data_dir = tempfile.mkdtemp(prefix="neurasect-tests-")
+for _name in ("DATASET_STORE_DIR", "CHECKPOINT_DIR", "SWEEP_DIR"):
+    os.environ.setdefault(_name, os.path.join(_data_dir, _name.lower()))
+os.environ.setdefault("TF_STARTUP", "lazy")
+
+
+class FakeResponse:
+
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+
+    def __init__(self, client: "FakeSupabaseClient", table: str):
+        self.client = client
+        self.table = table
+        self.columns = "*"
+        self.count = None
+        self.filters: List[tuple] = []
+        self.order_by: Optional[str] = None
+        self.start = 0
+        self.end: Optional[int] = None
+
+    def __repr__(self):
+        return f"FakeQuery(table={self.table!r}, columns={self.columns!r}, range=({self.start}, {self.end}))"
+
+    def select(self, columns: str, count: Optional[str] = None):
+        self.columns = columns
+        self.count = count
+        return self
+
+    def eq(self, column: str, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column: str):
+        self.order_by = column
+        return self
+
+    def range(self, start: int, end: int):
+        self.start, self.end = start, end
+        return self
+
+    def limit(self, n: int):
+        self.end = self.start + n - 1
+        return self
+
+    async def execute(self) -> FakeResponse:
+        self.client.queries.append(self)
+        self.client.in_flight += 1
+        self.client.peak_in_flight = max(self.client.peak_in_flight, self.client.in_flight)
+        try:
+            if self.client.delay:
+                await asyncio.sleep(self.client.delay)
+            rows = [r for r in self.client.tables.get(self.table, [])
+                    if all(r.get(c) == v for c, v in self.filters)]
+            if self.order_by:
+                rows = sorted(rows, key=lambda r: r[self.order_by])
+            total = len(rows) if self.count == "exact" and self.client.report_count else None
+            rows = rows[self.start:None if self.end is None else self.end + 1]
+            if self.columns != "*":
+                names = self.columns.split(",")
+                rows = [{c: r.get(c) for c in names} for r in rows]
+            return FakeResponse([dict(r) for r in rows], total)
+        finally:
+            self.client.in_flight -= 1
+
+
+class FakeSupabaseClient:
+    """Serves PostgREST-style queries from in-memory tables and records every query it runs."""
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]], delay: float = 0.0, report_count: bool = True):
+        self.tables = tables
+        self.delay = delay
+        self.report_count = report_count
+        self.queries: List[FakeQuery] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def __repr__(self):
+        return f"FakeSupabaseClient(tables={list(self.tables)}, queries={len(self.queries)})"
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def data_queries(self, table: str) -> List[FakeQuery]:
+        return [q for q in self.queries if q.table == table and q.order_by]
+
+
+DATASET_ID = "0b6f8a52-1c1e-4d8e-9a43-5f0d2b7e9c11"
+
+
+def make_tables(rows: int, dataset_id: str = DATASET_ID, title: str = "Iris flowers") -> Dict[str, List[Dict]]:
+    species = ["setosa", "versicolor", "virginica"]
+    colors = ["red", "green", "blue", "violet"]
+    data = [{
+        "id": i + 1,
+        "dataset_id": dataset_id,
+        "created_at": "2025-01-01T00:00:00",
+        "length": float(i),
+        "width": float(i % 7) / 2,
+        "color": colors[(i * 5) % len(colors)] if i < rows - 1 else "amber",
+        "species": species[i % 3],
+    } for i in range(rows)]
+    return {"datasets": [{"id": dataset_id, "title": title}], "iris": data}
+
+
+@pytest.fixture
+def supabase_tables():
+    return make_tables(2500)
+
+
+@pytest.fixture
+def fake_supabase(supabase_tables):
+    return FakeSupabaseClient(supabase_tables)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+import main
+from conftest import DATASET_ID, FakeSupabaseClient, make_tables
+from supabase_loader import SupabaseDatasetLoader
+
+
+@pytest.fixture
+def slow_supabase(monkeypatch):
+    # every query waits on the loop, like a real round trip would
+    client = FakeSupabaseClient(make_tables(2500), delay=0.02)
+    monkeypatch.setattr(main, "supabase_client", client)
+    monkeypatch.setattr(main, "supabase_loader", SupabaseDatasetLoader(client, page_size=500, max_concurrency=2))
+    return client
+
+
+def run_on_loop(scenario):
+    async def wrapper():
+        main.event_loop = asyncio.get_running_loop()
+        try:
+            return await scenario()
+        finally:
+            main.event_loop = None
+    return asyncio.run(wrapper())
+
+
+async def with_heartbeat(awaitable):
+    ticks = 0
+    done = False
+
+    async def heartbeat():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    beat = asyncio.create_task(heartbeat())
+    try:
+        result = await awaitable
+    finally:
+        done = True
+        await beat
+    return result, ticks
+
+
+def test_blocking_loader_refuses_to_run_on_the_loop(slow_supabase):
+    async def scenario():
+        with pytest.raises(RuntimeError, match="data prep executor"):
+            main.load_supabase_dataset(DATASET_ID)
+
+    run_on_loop(scenario)
+    assert slow_supabase.queries == []
+
+
+def test_supabase_dataset_loads_off_the_loop(slow_supabase):
+    threads = []
+
+    def load():
+        threads.append(threading.current_thread().name)
+        return main.load_dataset(DATASET_ID)
+
+    async def scenario():
+        return await with_heartbeat(main.run_blocking(load))
+
+    (X, y, num_classes), ticks = run_on_loop(scenario)
+
+    assert X.shape == (2500, 3) and len(y) == 2500 and num_classes == 3
+    assert threads[0].startswith("data-prep")
+    # five pages at 20ms each, two at a time: the loop kept serving the heartbeat meanwhile
+    assert ticks >= 5
+    assert len(slow_supabase.data_queries("iris")) == 5
+
+
+def test_prepared_dataset_carries_supabase_class_names(slow_supabase):
+    async def scenario():
+        return await main.run_blocking(main.load_prepared_dataset, DATASET_ID, 0.8, None)
+
+    X_train, X_test, y_train, y_test, preprocessing, num_classes = run_on_loop(scenario)
+
+    assert X_train.shape[0] + X_test.shape[0] == 2500
+    assert y_train.shape[1] == num_classes == 3
+    assert preprocessing["feature_columns"] == ["length", "width", "color"]
+    assert preprocessing["class_names"] == ["setosa", "versicolor", "virginica"]
+    assert preprocessing["label_encodings"]["color"][0] == "amber"
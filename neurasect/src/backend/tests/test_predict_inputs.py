@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+import main
+
+PREPROCESSING = {"feature_columns": ["x", "color"], "label_encodings": {"color": ["blue", "green", "red"]}}
+
+
+def test_numbers_and_category_strings_are_encoded():
+    data = main.encode_inputs([[0.5, "red"], [1.5, 1], [2.0, "blue"]], PREPROCESSING, 2)
+
+    assert data.dtype == np.float32
+    assert data.tolist() == [[0.5, 2.0], [1.5, 1.0], [2.0, 0.0]]
+
+
+@pytest.mark.parametrize("body", [
+    {"a": 1},
+    [],
+    [1.0, 2.0],
+    [[1.0, 2.0], [3.0]],
+    [[1.0, 2.0, 3.0]],
+    [[1.0, None]],
+    [[1.0, [2.0]]],
+    [["abc", 1.0]],
+    [[1.0, "purple"]],
+])
+def test_malformed_inputs_are_a_400(body):
+    with pytest.raises(HTTPException) as error:
+        main.encode_inputs(body, PREPROCESSING, 2)
+    assert error.value.status_code == 400
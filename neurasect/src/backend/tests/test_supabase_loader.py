@@ -0,0 +1,107 @@
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from conftest import DATASET_ID, FakeSupabaseClient, make_tables
+from supabase_loader import META_COLUMNS, SupabaseDatasetLoader
+
+
+def load(client, dataset_id=DATASET_ID, **kwargs):
+    loader = SupabaseDatasetLoader(client, page_size=1000, **kwargs)
+    X, y, num_classes = asyncio.run(loader.load(dataset_id))
+    return loader, X, y, num_classes
+
+
+def test_pages_cover_every_row_in_id_order(fake_supabase, supabase_tables):
+    _, X, y, num_classes = load(fake_supabase)
+    rows = supabase_tables["iris"]
+
+    assert X.shape == (2500, 3)
+    assert X.dtype == np.float64
+    np.testing.assert_array_equal(X[:, 0], [r["length"] for r in rows])
+    np.testing.assert_array_equal(X[:, 1], [r["width"] for r in rows])
+    assert num_classes == 3
+    assert y.tolist() == [["setosa", "versicolor", "virginica"].index(r["species"]) for r in rows]
+
+    ranges = sorted((q.start, q.end) for q in fake_supabase.data_queries("iris"))
+    assert ranges == [(0, 999), (1000, 1999), (2000, 2999)]
+
+
+def test_later_pages_project_feature_and_target_columns(fake_supabase):
+    load(fake_supabase)
+    first, *rest = sorted(fake_supabase.data_queries("iris"), key=lambda q: q.start)
+
+    assert first.columns == "*" and first.count == "exact"
+    assert rest
+    for query in rest:
+        assert query.columns.split(",") == ["length", "width", "color", "species"]
+        assert not set(META_COLUMNS) & set(query.columns.split(","))
+        assert query.count is None
+        assert ("dataset_id", DATASET_ID) in query.filters
+
+
+def test_categories_use_sorted_codes_across_pages(fake_supabase, supabase_tables):
+    loader, X, _, _ = load(fake_supabase)
+    colors = [r["color"] for r in supabase_tables["iris"]]
+    classes = sorted(set(colors))
+
+    # "amber" only shows up on the last page but still sorts first
+    assert classes[0] == "amber"
+    assert X[:, 2].tolist() == [classes.index(c) for c in colors]
+    assert loader.metadata(DATASET_ID)["label_encodings"] == {
+        "color": classes,
+        "species": ["setosa", "versicolor", "virginica"],
+    }
+
+
+def test_unknown_count_pages_until_a_short_page():
+    client = FakeSupabaseClient(make_tables(2000), report_count=False)
+    _, X, _, _ = load(client)
+
+    assert X.shape == (2000, 3)
+    ranges = [(q.start, q.end) for q in client.data_queries("iris")]
+    # 2000 rows is an exact multiple of the page size, so it takes one empty page to stop
+    assert ranges == [(0, 999), (1000, 1999), (2000, 2999)]
+
+
+def test_concurrent_pages_stay_within_the_limit():
+    client = FakeSupabaseClient(make_tables(9000), delay=0.01)
+    loader, X, _, _ = load(client, max_concurrency=2)
+
+    assert X.shape == (9000, 3)
+    assert client.peak_in_flight == loader.peak_in_flight == 2
+    assert loader.stats()["requests"] == len(client.queries)
+
+
+def test_resolved_table_is_cached(fake_supabase):
+    loader = SupabaseDatasetLoader(fake_supabase, page_size=1000)
+    asyncio.run(loader.load(DATASET_ID))
+    asyncio.run(loader.load(DATASET_ID))
+
+    assert len([q for q in fake_supabase.queries if q.table == "datasets"]) == 1
+
+
+def test_missing_dataset_is_a_404(fake_supabase):
+    loader = SupabaseDatasetLoader(fake_supabase, page_size=1000)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(loader.load("ffffffff-0000-0000-0000-000000000000"))
+    assert error.value.status_code == 404
+
+
+@pytest.mark.parametrize("report_count", [True, False])
+def test_string_on_a_later_page_promotes_the_column(report_count):
+    tables = make_tables(2500)
+    rows = tables["iris"]
+    rows[1200]["width"] = "n/a"
+    rows[2100]["width"] = "n/a"
+    client = FakeSupabaseClient(tables, report_count=report_count)
+    loader, X, _, _ = load(client)
+
+    # numbers read before the string turned up are keyed the way they were written: 3.0 -> "3"
+    keys = [w if isinstance(w, str) else np.format_float_positional(w, trim="-") for w in (r["width"] for r in rows)]
+    classes = sorted(set(keys))
+    assert X.shape == (2500, 3)
+    assert X[:, 1].tolist() == [classes.index(k) for k in keys]
+    assert loader.metadata(DATASET_ID)["label_encodings"]["width"] == classes
@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+import pytest
+
+from sweep import Sweep, export_arrays, retire_arrays
+
+
+def make_sweep(num_classes, metric, root="/tmp/unused"):
+    return Sweep("s", {"epochs": 4}, [{"num_neurons": 4}], num_classes, root, metric=metric)
+
+
+@pytest.mark.parametrize("num_classes, metric", [(1, "val_accuracy"), (3, "val_mae"), (3, "val_acuracy")])
+def test_metric_the_model_does_not_report_is_rejected(num_classes, metric):
+    with pytest.raises(ValueError, match="Unknown metric"):
+        make_sweep(num_classes, metric)
+
+
+def test_trials_are_scored_on_the_requested_metric_only():
+    sweep = make_sweep(1, "val_mae")
+    assert sweep.mode == "min"
+    assert sweep._score({"val_mae": [0.5, 0.3, 0.4], "val_loss": [9.0]}) == 0.3
+    assert sweep._score({"val_loss": [9.0]}) is None
+
+
+def test_retired_arrays_leave_the_path_free(tmp_path):
+    data_dir = str(tmp_path / "key")
+    arrays = [np.zeros((4, 2)), np.zeros((2, 2)), np.zeros((4, 3)), np.zeros((2, 3))]
+    export_arrays(data_dir, arrays)
+
+    doomed = retire_arrays(data_dir)
+    assert not os.path.exists(data_dir) and os.path.exists(os.path.join(doomed, "done"))
+    assert retire_arrays(data_dir) is None
+    # a later sweep on the same dataset exports it again
+    export_arrays(data_dir, arrays)
+    assert os.path.exists(os.path.join(data_dir, "X_train.npy"))
@@ -0,0 +1,110 @@
+import struct
+import time
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+MAGIC = b"NSW1"
+KEYFRAME = 0
+DELTA = 1
+DTYPE_CODES = {"float16": 1, "int8": 2}
+# magic, kind, dtype, reserved, epoch, value count, scale
+HEADER = struct.Struct("<4sBBHIIf")
+
+
+def dense_layers(model) -> list:
+    return [layer for layer in model.layers if hasattr(layer, "kernel") and getattr(layer, "kernel", None) is not None]
+
+
+def weight_manifest(model) -> Dict[str, Any]:
+    layers = []
+    offset = 0
+    for layer in dense_layers(model):
+        kernel_shape = [int(d) for d in layer.kernel.shape]
+        bias_size = int(layer.bias.shape[0]) if getattr(layer, "bias", None) is not None else 0
+        kernel_size = int(np.prod(kernel_shape))
+        layers.append({
+            "name": layer.name,
+            "kernel_shape": kernel_shape,
+            "kernel_offset": offset,
+            "bias_offset": offset + kernel_size if bias_size else None,
+            "bias_size": bias_size,
+        })
+        offset += kernel_size + bias_size
+    return {"type": "weights_manifest", "layers": layers, "total_values": offset, "header_bytes": HEADER.size}
+
+
+def flatten_weights(model) -> np.ndarray:
+    parts = []
+    for layer in dense_layers(model):
+        parts.append(np.asarray(layer.kernel).ravel())
+        if getattr(layer, "bias", None) is not None:
+            parts.append(np.asarray(layer.bias).ravel())
+    return np.concatenate(parts).astype(np.float32) if parts else np.zeros(0, dtype=np.float32)
+
+
+class WeightSnapshotEncoder:
+
+    def __init__(self, dtype: str = "float16", keyframe_every: int = 20,
+                 every: int = 1, max_rate: float = 5.0):
+        self.dtype = dtype if dtype in DTYPE_CODES else "float16"
+        self.keyframe_every = max(1, keyframe_every)
+        self.every = max(1, every)
+        self.max_rate = max_rate
+        self.reference: Optional[np.ndarray] = None
+        self.frames_since_keyframe = 0
+        self._last = 0.0
+        self.bytes_sent = 0
+
+    def __repr__(self):
+        return f"WeightSnapshotEncoder(dtype={self.dtype!r}, keyframe_every={self.keyframe_every}, every={self.every})"
+
+    def due(self, epoch: int) -> bool:
+        if (epoch + 1) % self.every:
+            return False
+        now = time.monotonic()
+        if self.max_rate > 0 and now - self._last < 1.0 / self.max_rate:
+            return False
+        self._last = now
+        return True
+
+    def _frame(self, kind: int, epoch: int, payload: np.ndarray, scale: float) -> bytes:
+        header = HEADER.pack(MAGIC, kind, DTYPE_CODES[payload.dtype.name], 0, epoch, payload.size, scale)
+        frame = header + payload.astype(payload.dtype.newbyteorder("<"), copy=False).tobytes()
+        self.bytes_sent += len(frame)
+        return frame
+
+    def encode(self, weights: np.ndarray, epoch: int) -> bytes:
+        if self.reference is None or self.reference.shape != weights.shape or self.frames_since_keyframe >= self.keyframe_every:
+            values = weights.astype(np.float16)
+            # the client only ever sees float16 values, so deltas are taken against that
+            self.reference = values.astype(np.float32)
+            self.frames_since_keyframe = 0
+            return self._frame(KEYFRAME, epoch, values, 1.0)
+
+        delta = weights - self.reference
+        self.frames_since_keyframe += 1
+        if self.dtype == "int8":
+            peak = float(np.abs(delta).max()) if delta.size else 0.0
+            # round to float32 so the client, which reads the scale from the header, reconstructs the same values
+            scale = float(np.float32(peak / 127.0)) if peak > 0 else 1.0
+            quantized = np.clip(np.rint(delta / scale), -127, 127).astype(np.int8)
+            self.reference += quantized.astype(np.float32) * scale
+            return self._frame(DELTA, epoch, quantized, scale)
+
+        quantized = delta.astype(np.float16)
+        self.reference += quantized.astype(np.float32)
+        return self._frame(DELTA, epoch, quantized, 1.0)
+
+
+def decode_frame(frame: bytes, reference: Optional[np.ndarray] = None) -> np.ndarray:
+    magic, kind, dtype_code, _, epoch, count, scale = HEADER.unpack_from(frame)
+    if magic != MAGIC:
+        raise ValueError("Not a weight snapshot frame")
+    dtype = np.dtype("<f2") if dtype_code == DTYPE_CODES["float16"] else np.dtype("i1")
+    values = np.frombuffer(frame, dtype=dtype, count=count, offset=HEADER.size).astype(np.float32)
+    if kind == KEYFRAME:
+        return values
+    if reference is None:
+        raise ValueError("Delta frame received before a keyframe")
+    return reference + values * scale